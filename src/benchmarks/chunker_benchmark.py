@@ -0,0 +1,107 @@
+"""
+Micro-benchmark of TextChunker against langchain's text splitters.
+
+Run from the src directory:
+
+    python -m benchmarks.chunker_benchmark --pages 2000 --chunk-size 1024 --overlap-size 20
+
+--lines joins the paragraphs with a single newline, like most PDF pages,
+and --recursive compares the recursive separators against langchain's
+RecursiveCharacterTextSplitter.
+"""
+from langchain_text_splitters import CharacterTextSplitter, RecursiveCharacterTextSplitter
+from helpers.TextChunker import TextChunker
+import argparse
+import random
+import time
+
+
+def build_pages(pages_count: int, paragraph_separator: str = "\n\n", seed: int = 0):
+    rng = random.Random(seed)
+    words = ["retrieval", "augmented", "generation", "vector", "index", "chunk",
+             "embedding", "query", "document", "page", "the", "of", "and", "a"]
+
+    pages = []
+    for _ in range(pages_count):
+        paragraphs = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(5, 120)))
+            for _ in range(rng.randint(3, 12))
+        ]
+        pages.append(paragraph_separator.join(paragraphs))
+
+    return pages
+
+
+def run(splitters: dict, pages: list, repeat: int):
+    """
+    Time the splitters in turns, so load changes during the run hit all
+    of them alike, and print the best and median time of each.
+
+    Returns:
+        dict: label -> (chunks, median time)
+    """
+    timings = {label: [] for label in splitters}
+    results = {}
+
+    for _ in range(repeat):
+        for label, split_text in splitters.items():
+            started_at = time.perf_counter()
+            results[label] = [chunk for page in pages for chunk in split_text(page)]
+            timings[label].append(time.perf_counter() - started_at)
+
+    medians = {}
+    for label, elapsed in timings.items():
+        elapsed.sort()
+        medians[label] = elapsed[len(elapsed) // 2]
+        print(f"{label:<32} best {elapsed[0] * 1000:8.1f} ms  median {medians[label] * 1000:8.1f} ms"
+              f"  {len(results[label]):8d} chunks")
+
+    return {label: (results[label], medians[label]) for label in splitters}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--overlap-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=21)
+    parser.add_argument("--lines", action="store_true")
+    parser.add_argument("--recursive", action="store_true")
+    args = parser.parse_args()
+
+    pages = build_pages(pages_count=args.pages,
+                        paragraph_separator="\n" if args.lines else "\n\n")
+
+    if args.recursive:
+        separators = ["\n\n", "\n", " ", ""]
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.overlap_size,
+            separators=separators,
+            keep_separator=False,
+        )
+    else:
+        separators = ["\n\n"]
+        text_splitter = CharacterTextSplitter(
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.overlap_size,
+            length_function=len,
+        )
+
+    text_chunker = TextChunker(chunk_size=args.chunk_size,
+                               overlap_size=args.overlap_size,
+                               separators=separators)
+
+    baseline = type(text_splitter).__name__
+    results = run({
+        baseline: text_splitter.split_text,
+        "TextChunker": text_chunker.split_text,
+    }, pages, args.repeat)
+
+    expected, baseline_time = results[baseline]
+    actual, chunker_time = results["TextChunker"]
+    print("same chunks:", expected == actual)
+    print(f"speedup: {baseline_time / chunker_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
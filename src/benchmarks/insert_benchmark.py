@@ -0,0 +1,113 @@
+"""
+Benchmark of chunk insert throughput against a real MongoDB: the former
+ordered UpdateOne upserts against the unordered insert_many fast path and
+the unordered upserts kept for partial updates.
+
+Run from the src directory (uses MONGODB_URL from .env unless given):
+
+    python -m benchmarks.insert_benchmark --chunks 50000 --chunk-size 1024
+
+The chunks are written to a temporary collection dropped at the end.
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from bson.objectid import ObjectId
+from helpers.config import get_settings
+from models.db_schemas import DataChunk
+import argparse
+import asyncio
+import time
+
+
+def build_chunks(chunks_count: int, chunk_size: int, assets_count: int):
+    project_id = ObjectId()
+    assets_ids = [ObjectId() for _ in range(assets_count)]
+    per_asset = max(chunks_count // assets_count, 1)
+
+    return [
+        DataChunk(
+            chunk_text="x" * chunk_size,
+            chunk_metadata={"source": "assets/files/benchmark/file.pdf", "page": index // 4},
+            chunk_order=index % per_asset + 1,
+            chunk_project_id=project_id,
+            chunk_asset_id=assets_ids[min(index // per_asset, assets_count - 1)],
+        )
+        for index in range(chunks_count)
+    ]
+
+
+async def ordered_project_upserts(collection, chunks: list, batch_size: int = 100):
+    # ordered upserts, as the former insert_many_chunks did
+    for i in range(0, len(chunks), batch_size):
+        await collection.bulk_write([
+            UpdateOne(
+                {"chunk_project_id": chunk.chunk_project_id,
+                 "chunk_asset_id": chunk.chunk_asset_id,
+                 "chunk_order": chunk.chunk_order},
+                {"$set": chunk.dict(by_alias=True, exclude_none=True)},
+                upsert=True
+            )
+            for chunk in chunks[i:i + batch_size]
+        ])
+
+
+async def unordered_upserts(collection, chunks: list, batch_size: int = 100):
+    for i in range(0, len(chunks), batch_size):
+        await collection.bulk_write([
+            UpdateOne(
+                {"chunk_project_id": chunk.chunk_project_id,
+                 "chunk_asset_id": chunk.chunk_asset_id,
+                 "chunk_order": chunk.chunk_order},
+                {"$set": chunk.dict(by_alias=True, exclude_none=True)},
+                upsert=True
+            )
+            for chunk in chunks[i:i + batch_size]
+        ], ordered=False)
+
+
+async def unordered_inserts(collection, chunks: list, batch_size: int = 1000):
+    # the insert_many_chunks fast path
+    for i in range(0, len(chunks), batch_size):
+        await collection.insert_many(
+            [chunk.dict(by_alias=True, exclude_none=True) for chunk in chunks[i:i + batch_size]],
+            ordered=False,
+        )
+
+
+async def run(label: str, collection, write, chunks: list):
+    for index in DataChunk.get_indexes():
+        await collection.create_index(index["keys"], name=index["name"], unique=index["unique"])
+
+    started_at = time.perf_counter()
+    await write(collection, chunks)
+    elapsed = time.perf_counter() - started_at
+
+    print(f"{label:<28} {elapsed * 1000:10.1f} ms  {len(chunks) / elapsed:10.0f} chunks/s")
+    await collection.drop()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mongodb-url", default=None)
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--assets", type=int, default=10)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    client = AsyncIOMotorClient(args.mongodb_url or settings.MONGODB_URL)
+    collection = client[settings.MONGODB_DATABASE][f"chunks_benchmark_{ObjectId()}"]
+
+    chunks = build_chunks(chunks_count=args.chunks, chunk_size=args.chunk_size,
+                          assets_count=args.assets)
+    try:
+        await run("ordered upserts (before)", collection, ordered_project_upserts, chunks)
+        await run("unordered upserts", collection, unordered_upserts, chunks)
+        await run("unordered insert_many", collection, unordered_inserts, chunks)
+    finally:
+        await collection.drop()
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Micro-benchmark of the chunk read path: BSON decoding of full or projected
+documents, then DataChunk validation, DataChunk.model_construct or
+ChunkRecord views.
+
+Run from the src directory:
+
+    python -m benchmarks.read_benchmark --chunks 100000 --chunk-size 1024
+"""
+from models.db_schemas import DataChunk, ChunkRecord
+from bson.objectid import ObjectId
+import argparse
+import bson
+import time
+
+
+def build_documents(chunks_count: int, chunk_size: int):
+    project_id = ObjectId()
+    asset_id = ObjectId()
+    metadata = {"source": "assets/files/project/file.pdf", "file_path": "assets/files/project/file.pdf",
+                "total_pages": 300, "format": "PDF 1.7", "producer": "producer", "creator": "creator"}
+
+    return [
+        bson.encode({
+            "_id": ObjectId(),
+            "project_id": "project",
+            "chunk_text": "x" * chunk_size,
+            "chunk_metadata": {**metadata, "page": order // 4, "start_index": 0, "end_index": chunk_size},
+            "chunk_order": order,
+            "chunk_project_id": project_id,
+            "chunk_asset_id": asset_id,
+        })
+        for order in range(1, chunks_count + 1)
+    ]
+
+
+def project(document: bytes, fields: tuple):
+    record = bson.decode(document)
+    return bson.encode({key: record[key] for key in ("_id",) + fields})
+
+
+def run(label: str, documents: list, build, repeat: int):
+    best = None
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for document in documents:
+            build(bson.decode(document))
+        elapsed = time.perf_counter() - started_at
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f"{label:<40} {best * 1000:10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = build_documents(chunks_count=args.chunks, chunk_size=args.chunk_size)
+    projected = [project(document, ("chunk_text", "chunk_metadata", "chunk_order"))
+                 for document in documents]
+
+    run("full documents, DataChunk", documents, lambda record: DataChunk(**record), args.repeat)
+    run("full documents, model_construct", documents, lambda record: DataChunk.model_construct(**record), args.repeat)
+    run("full documents, ChunkRecord", documents, ChunkRecord, args.repeat)
+    run("projected documents, ChunkRecord", projected, ChunkRecord, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,11 +15,24 @@ class BaseController:
             self.base_dir,
             "assets/database"
         )
+        self.blob_dir=os.path.join(
+            self.base_dir,
+            "assets/blobs"
+        )
 
 
     def generate_random_string(self,length:int=12):
         return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
 
+    def get_blob_dir(self,file_hash:str):
+        """
+        Directory of the content-addressed blobs, sharded by hash prefix.
+        """
+        blob_dir=os.path.join(self.blob_dir,file_hash[:2])
+        if not os.path.exists(blob_dir):
+            os.makedirs(blob_dir,exist_ok=True)
+        return blob_dir
+
     def get_database_path(self,db_name:str):
         database_path=os.path.join(self.database_dir,db_name)
         if not os.path.exists(database_path):
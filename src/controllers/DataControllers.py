@@ -2,9 +2,16 @@ from .BaseController import BaseController
 from fastapi import UploadFile
 from models import ResponseSignal
 from .ProjectController import ProjectController
+import codecs
 import re
 import os
 
+# archives expanded server-side by the batch upload
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz")
+
+# bytes of the first part of a resumable upload checked against its type
+CONTENT_SNIFF_SIZE = 4096
+
 class DataController(BaseController):
     """
     Controller responsible for handling uploaded file management.
@@ -13,6 +20,8 @@ class DataController(BaseController):
     - Validate uploaded files against allowed types and size limits.
     - Generate unique file paths for project-specific uploads.
     - Clean and normalize file names for safe filesystem storage.
+    - Store uploads once by content hash and link them into projects.
+    - Detect zip/tar archives sent to the batch upload.
     """
     def __init__(self):
         """
@@ -45,7 +54,65 @@ class DataController(BaseController):
             return False,ResponseSignal.FILE_SIZE_EXCEEDED.value
         
         return True,ResponseSignal.SUCCESS.value
+
+    def validate_upload_request(self,content_type:str,file_size:int):
+        """
+        Validate the declared type and size of a resumable upload before any
+        byte of it is received. The declared type is checked against the
+        content of the first part by validate_upload_content.
+
+        Returns:
+            tuple:
+                (bool, str)
+                - Validation status (True if valid, False otherwise).
+                - Response signal indicating validation result.
+        """
+        if content_type not in self.app_settings.FILE_ALLOWED_TYPES:
+            return False,ResponseSignal.FILE_TYPE_NOT_SUPPORTED.value
+
+        if file_size > self.app_settings.FILE_MAX_SIZE* self.size_scale:
+            return False,ResponseSignal.FILE_SIZE_EXCEEDED.value
+
+        return True,ResponseSignal.SUCCESS.value
     
+    def detect_content_type(self,head:bytes):
+        """
+        Detect the type of a file from its first bytes.
+
+        Returns:
+            str or None: "application/pdf", "text/plain" for UTF-8 text
+            without NUL bytes, or None for anything else.
+        """
+        if head.startswith(b"%PDF-"):
+            return "application/pdf"
+
+        if b"\x00" in head:
+            return None
+        try:
+            # the head may end in the middle of a character
+            codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        except UnicodeDecodeError:
+            return None
+
+        return "text/plain"
+
+    def validate_upload_content(self,content_type:str,head:bytes):
+        """
+        Validate the first bytes of a resumable upload against its declared
+        type, which must be one of the allowed types.
+
+        Returns:
+            tuple:
+                (bool, str)
+                - Validation status (True if valid, False otherwise).
+                - Response signal indicating validation result.
+        """
+        detected_type = self.detect_content_type(head=head)
+        if detected_type not in self.app_settings.FILE_ALLOWED_TYPES or detected_type != content_type:
+            return False,ResponseSignal.FILE_TYPE_NOT_SUPPORTED.value
+
+        return True,ResponseSignal.SUCCESS.value
+
     def generate_unique_filepath(self,orig_file_name:str,project_id:str):
         """
         Generate a unique file path for storing an uploaded file.
@@ -103,4 +170,133 @@ class DataController(BaseController):
         # replace spaces with underscore
         cleaned_file_name = cleaned_file_name.replace(" ", "_")
 
-        return cleaned_file_name
\ No newline at end of file
+        return cleaned_file_name
+
+    def is_archive(self, file_name: str):
+        return bool(file_name) and file_name.lower().endswith(ARCHIVE_EXTENSIONS)
+
+    def get_upload_temp_dir(self):
+        """
+        Return the directory, inside the blob store (same device), where
+        uploads are written before they are committed.
+        """
+        temp_dir = os.path.join(self.blob_dir, "tmp")
+        if not os.path.exists(temp_dir):
+            os.makedirs(temp_dir, exist_ok=True)
+
+        return temp_dir
+
+    def get_upload_temp_path(self):
+        """
+        Return a temporary path, inside the blob store, where an upload is
+        written (and hashed) before its content hash is known.
+        """
+        return os.path.join(self.get_upload_temp_dir(), self.generate_random_string(24) + ".part")
+
+    def get_upload_part_path(self, upload_id: str, part_file: str = None):
+        """
+        Return the path of a part of a resumable upload.
+
+        Every attempt to send a part writes its own file, so two requests
+        sending the same part never write to the same bytes: only the one
+        recorded in the session is kept.
+
+        Args:
+            upload_id (str): Identifier of the upload session.
+            part_file (str): Name of an existing part file, or None for a
+                             new one.
+        """
+        if part_file is None:
+            part_file = f"{upload_id}.{self.generate_random_string(12)}.upload"
+
+        return os.path.join(self.get_upload_temp_dir(), part_file)
+
+    def get_stored_upload_parts(self, upload_id: str, upload_parts: list):
+        """
+        Return the leading parts of an upload whose files are on disk with
+        their recorded size: the parts after a missing or short one have to
+        be sent again.
+        """
+        stored_parts = []
+        for part in upload_parts:
+            part_path = self.get_upload_part_path(upload_id=upload_id, part_file=part["part_file"])
+            if not os.path.exists(part_path) or os.path.getsize(part_path) != part["size"]:
+                break
+            stored_parts.append(part)
+
+        return stored_parts
+
+    def get_upload_assembly_path(self, upload_id: str):
+        """
+        Return the path where the parts of a resumable upload are
+        concatenated when it is completed.
+        """
+        return os.path.join(self.get_upload_temp_dir(), upload_id + ".assembly")
+
+    def remove_upload_files(self, upload_id: str):
+        """
+        Remove every part file, and the assembled file, of an upload session.
+        """
+        temp_dir = self.get_upload_temp_dir()
+        for file_name in os.listdir(temp_dir):
+            if file_name.startswith(upload_id + "."):
+                os.remove(os.path.join(temp_dir, file_name))
+
+    def get_blob_path(self, file_hash: str, file_ext: str):
+        """
+        Return the content-addressed path of a blob.
+
+        The extension is kept so the loaders can still detect the file type.
+        """
+        return os.path.join(self.get_blob_dir(file_hash=file_hash), file_hash + file_ext)
+
+    def store_blob(self, temp_path: str, file_hash: str, file_ext: str):
+        """
+        Move an uploaded temporary file into the blob store, or drop it when
+        the same content is already stored.
+
+        Returns:
+            str: Path of the blob.
+        """
+        blob_path = self.get_blob_path(file_hash=file_hash, file_ext=file_ext)
+
+        if os.path.exists(blob_path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, blob_path)
+
+        return blob_path
+
+    def link_blob(self, blob_path: str, file_path: str):
+        """
+        Expose a blob at a project file path without copying it: a hard
+        link, or a symbolic link when the blob store is on another device.
+        """
+        try:
+            os.link(blob_path, file_path)
+        except OSError:
+            os.symlink(blob_path, file_path)
+
+    def store_upload(self, temp_path: str, file_hash: str, file_path: str):
+        """
+        Commit a fully received upload: store it in the blob store and link
+        it at its project file path.
+        """
+        blob_path = self.store_blob(
+            temp_path=temp_path,
+            file_hash=file_hash,
+            file_ext=os.path.splitext(file_path)[-1],
+        )
+        self.link_blob(blob_path=blob_path, file_path=file_path)
+
+    def discard_upload(self, temp_path: str, file_path: str):
+        """
+        Undo a store_upload whose commit failed: remove the assembled file
+        and the project file path. The parts are kept, so the commit can
+        be retried.
+        """
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        if os.path.lexists(file_path):
+            os.remove(file_path)
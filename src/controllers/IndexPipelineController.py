@@ -0,0 +1,213 @@
+from .BaseController import BaseController
+from .NLPController import NLPController
+from models.db_schemas import Project
+import asyncio
+import logging
+
+
+class IndexPipelineController(BaseController):
+    """
+    Controller responsible for pushing a project's chunks into the vector DB.
+
+    The push runs as three concurrent stages connected by bounded queues:
+    - read: stream chunk batches from Mongo.
+    - embed: turn each batch into vectors through the embedding client.
+    - upsert: write the vectors into the project collection.
+
+    Each stage has its own number of workers, and a full queue blocks the
+    stage feeding it, so the total time approaches the slowest stage while
+    memory stays bounded by the queue sizes.
+
+    Pushes are incremental: each chunk is upserted to a point id derived
+    from its _id and marked as indexed, so a push only embeds the chunks
+    not indexed yet and deletes the points of chunks that were removed.
+    """
+
+    def __init__(self, nlp_controller: NLPController, chunk_model):
+        """
+        Initialize the pipeline.
+
+        Args:
+            nlp_controller (NLPController): Controller used to embed and upsert chunks.
+            chunk_model (ChunkModel): Model used to stream the project chunks.
+        """
+        super().__init__()
+        self.nlp_controller = nlp_controller
+        self.chunk_model = chunk_model
+
+        self.read_batch_size = self.app_settings.INDEX_READ_BATCH_SIZE
+        self.queue_size = self.app_settings.INDEX_QUEUE_SIZE
+        self.embedding_workers = self.app_settings.INDEX_EMBEDDING_WORKERS
+        self.upsert_workers = self.app_settings.INDEX_UPSERT_WORKERS
+
+        self.progress = {"read": 0, "embedded": 0, "upserted": 0}
+        self.logger = logging.getLogger(__name__)
+
+    async def index_project(self, project: Project, do_reset: bool = False,
+                            checkpoint: dict = None, on_checkpoint=None):
+        """
+        Push the new chunks of a project into the vector DB, and delete the
+        points of the chunks that no longer exist.
+
+        Args:
+            project (Project): Project whose chunks will be indexed.
+            do_reset (bool): Drop the project collection before indexing.
+            checkpoint (dict, optional): Position returned by a previous run
+                through on_checkpoint, to resume after the chunks it covers.
+            on_checkpoint (callable, optional): Coroutine called with
+                (checkpoint, progress) each time every batch up to a point
+                has been upserted.
+
+        Returns:
+            int or None: Number of upserted chunks, or None if a stage failed.
+        """
+        self.progress = {"read": 0, "embedded": 0, "upserted": 0}
+
+        if not checkpoint or "last_asset_id" not in checkpoint:
+            # no checkpoint, or one written before chunks were keyed per
+            # asset: scan from the start, indexed chunks are skipped anyway
+            checkpoint = {"last_asset_id": None, "last_chunk_order": 0}
+
+        # the collection is created (or reset) once, before any upsert
+        is_created = await self.nlp_controller.prepare_vector_db_collection(
+            project=project,
+            do_reset=do_reset,
+        )
+
+        if is_created:
+            # a new (or reset) collection has none of the chunks
+            await self.chunk_model.reset_chunks_indexed(project_id=project.id)
+            checkpoint = {"last_asset_id": None, "last_chunk_order": 0}
+        else:
+            await self.delete_stale_points(project=project)
+
+        embed_queue = asyncio.Queue(maxsize=self.queue_size)
+        upsert_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        # batches finish out of order with several upserters, so the checkpoint
+        # only moves over the longest run of consecutive finished batches
+        batches_positions = {}
+        finished_batches = set()
+        next_checkpoint_batch = 0
+
+        async def mark_batch_upserted(batch_no):
+            nonlocal next_checkpoint_batch
+            finished_batches.add(batch_no)
+
+            new_checkpoint = None
+            while next_checkpoint_batch in finished_batches:
+                finished_batches.remove(next_checkpoint_batch)
+                new_checkpoint = batches_positions.pop(next_checkpoint_batch)
+                next_checkpoint_batch += 1
+
+            if new_checkpoint and on_checkpoint:
+                await on_checkpoint(new_checkpoint, dict(self.progress))
+
+        async def read_stage():
+            batch_no = 0
+            # only the fields embedded and upserted are read, as lean records
+            async for page_chunks in self.chunk_model.iter_project_chunks(project_id=project.id,
+                                                                          batch_size=self.read_batch_size,
+                                                                          projection={"chunk_text": 1, "chunk_metadata": 1},
+                                                                          after_asset_id=checkpoint["last_asset_id"],
+                                                                          after_chunk_order=checkpoint["last_chunk_order"],
+                                                                          unindexed_only=True):
+                batches_positions[batch_no] = {
+                    "last_asset_id": page_chunks[-1].chunk_asset_id,
+                    "last_chunk_order": page_chunks[-1].chunk_order,
+                }
+
+                await embed_queue.put((batch_no, page_chunks))
+                self.progress["read"] += len(page_chunks)
+                batch_no += 1
+
+        async def embed_stage():
+            while True:
+                item = await embed_queue.get()
+                if item is None:
+                    break
+
+                batch_no, page_chunks = item
+                vectors = await self.nlp_controller.embed_chunks(chunks=page_chunks)
+                if not vectors:
+                    raise Exception("Error while embedding chunks")
+
+                await upsert_queue.put((batch_no, page_chunks, vectors))
+                self.progress["embedded"] += len(page_chunks)
+
+        async def upsert_stage():
+            while True:
+                item = await upsert_queue.get()
+                if item is None:
+                    break
+
+                batch_no, page_chunks, vectors = item
+                is_inserted = await self.nlp_controller.insert_into_vector_db(
+                    project=project,
+                    chunks=page_chunks,
+                    vectors=vectors,
+                )
+                if not is_inserted:
+                    raise Exception("Error while inserting chunks into vector db")
+
+                await self.chunk_model.mark_chunks_indexed(chunk_ids=[chunk.id for chunk in page_chunks])
+
+                self.progress["upserted"] += len(page_chunks)
+                await mark_batch_upserted(batch_no)
+
+        reader = asyncio.create_task(read_stage())
+        embedders = [asyncio.create_task(embed_stage()) for _ in range(self.embedding_workers)]
+        upserters = [asyncio.create_task(upsert_stage()) for _ in range(self.upsert_workers)]
+
+        async def drain_stages():
+            # close every stage once the one feeding it is done
+            await reader
+            for _ in embedders:
+                await embed_queue.put(None)
+
+            await asyncio.gather(*embedders)
+            for _ in upserters:
+                await upsert_queue.put(None)
+
+            await asyncio.gather(*upserters)
+
+        supervisor = asyncio.create_task(drain_stages())
+        tasks = [supervisor, reader, *embedders, *upserters]
+
+        # stop at the first failing stage instead of waiting on a blocked queue
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            # the caller cancelled the push (e.g. a cancelled job), stop every stage
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        failed = [task for task in done if not task.cancelled() and task.exception()]
+        if failed:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+            self.logger.error(f"Error while indexing project {project.project_id}: {failed[0].exception()}")
+            return None
+
+        return self.progress["upserted"]
+
+    async def delete_stale_points(self, project: Project):
+        """
+        Delete the points whose chunks no longer exist: the points of assets
+        without chunks, and the previous points of re-chunked assets (the
+        assets with chunks not indexed yet).
+        """
+        asset_ids = await self.chunk_model.get_project_asset_ids(project_id=project.id)
+        await self.nlp_controller.delete_points_outside_assets(project=project, asset_ids=asset_ids)
+
+        changed_asset_ids = await self.chunk_model.get_project_asset_ids(project_id=project.id,
+                                                                         unindexed_only=True)
+        for asset_id in changed_asset_ids:
+            chunk_ids = await self.chunk_model.get_asset_chunk_ids(asset_id=asset_id)
+            await self.nlp_controller.delete_stale_asset_points(project=project,
+                                                                asset_id=asset_id,
+                                                                chunk_ids=chunk_ids)
@@ -0,0 +1,317 @@
+from .BaseController import BaseController
+from .NLPController import NLPController
+from .ProcessController import ProcessController
+from .IndexPipelineController import IndexPipelineController
+from models.JobModel import JobModel
+from models.ProjectModel import ProjectModel
+from models.AssetModel import AssetModel
+from models.ChunkModel import ChunkModel
+from models.db_schemas import Job
+from models import JobStatusEnum, JobTypeEnum, AssetTypeEnum
+from concurrent.futures import Executor
+import asyncio
+import logging
+import os
+import socket
+
+
+class JobController(BaseController):
+    """
+    Controller responsible for running ingestion work in the background.
+
+    Main responsibilities:
+    - Persist process/index requests as jobs in Mongo and return immediately.
+    - Run the jobs on an in-process pool of asyncio workers.
+    - Record progress and a checkpoint so a restarted app resumes the
+      unfinished jobs where they stopped.
+    - Cancel pending or running jobs on request.
+
+    Several workers and nodes can share the jobs collection: a running job
+    is leased by the process that claimed it and the lease is renewed
+    while it runs. Only the jobs whose lease expired (their process
+    stopped) are taken over by the others.
+    """
+
+    def __init__(self, db_client, process_pool: Executor, nlp_controller: NLPController,
+                 project_model: ProjectModel, asset_model: AssetModel, chunk_model: ChunkModel):
+        """
+        Initialize the JobController.
+
+        Args:
+            db_client: Mongo database client.
+            process_pool (Executor): Pool used by process jobs to parse files.
+            nlp_controller (NLPController): Controller used by index jobs.
+            project_model (ProjectModel): App-scoped project model, so the
+                jobs read projects through the project cache.
+            asset_model (AssetModel): App-scoped asset model.
+            chunk_model (ChunkModel): App-scoped chunk model.
+        """
+        super().__init__()
+        self.db_client = db_client
+        self.process_pool = process_pool
+        self.nlp_controller = nlp_controller
+        self.project_model = project_model
+        self.asset_model = asset_model
+        self.chunk_model = chunk_model
+
+        self.workers_count = self.app_settings.JOB_WORKERS
+        self.lease_ttl = self.app_settings.JOB_LEASE_TTL
+        self.queue = asyncio.Queue()
+        self.workers = []
+        self.heartbeat = None
+        self.running_tasks = {}
+
+        # stable across restarts of the same container / process slot
+        self.owner_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.job_model = None
+        self.logger = logging.getLogger(__name__)
+
+    async def start(self):
+        """
+        Start the worker pool and resume the jobs left by a previous run.
+        """
+        self.job_model = await JobModel.create_instance(db_client=self.db_client)
+
+        self.workers = [
+            asyncio.create_task(self.worker())
+            for _ in range(self.workers_count)
+        ]
+
+        # jobs of a stopped process are run again from their last checkpoint
+        await self.job_model.requeue_running_jobs(owner_id=self.owner_id)
+        for job in await self.job_model.get_pending_jobs():
+            await self.queue.put(job.id)
+
+        self.heartbeat = asyncio.create_task(self.renew_leases())
+
+    async def stop(self):
+        tasks = [*self.workers, self.heartbeat] if self.heartbeat else list(self.workers)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.workers = []
+        self.heartbeat = None
+
+    async def renew_leases(self):
+        """
+        Renew the leases of the running jobs, and take over the jobs whose
+        owner stopped renewing them.
+
+        A running job that is no longer ours (cancelled through another
+        node, or taken over after a missed renewal) is stopped here.
+        """
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            try:
+                job_ids = list(self.running_tasks.keys())
+                owned_ids = set(await self.job_model.renew_job_leases(job_ids=job_ids,
+                                                                      owner_id=self.owner_id,
+                                                                      lease_ttl=self.lease_ttl))
+                for job_id in job_ids:
+                    task = self.running_tasks.get(job_id)
+                    if job_id not in owned_ids and task:
+                        self.logger.warning(f"Job {job_id} is no longer owned by this process, stopping it")
+                        task.cancel()
+
+                for job_id in await self.job_model.requeue_running_jobs():
+                    await self.queue.put(job_id)
+            except Exception as e:
+                self.logger.error(f"Error while renewing job leases: {e}")
+
+    async def submit(self, project, job_type: str, job_request: dict):
+        """
+        Create a pending job and queue it.
+
+        Returns:
+            Job: The created job record.
+        """
+        job = await self.job_model.create_job(
+            job=Job(
+                job_project_id=project.id,
+                project_id=project.project_id,
+                job_type=job_type,
+                job_status=JobStatusEnum.PENDING.value,
+                job_request=job_request,
+            )
+        )
+
+        await self.queue.put(job.id)
+        return job
+
+    async def get_job(self, job_id: str):
+        return await self.job_model.get_job(job_id=job_id)
+
+    async def cancel(self, job_id: str):
+        """
+        Cancel a pending or running job.
+
+        Returns:
+            Job or None: The cancelled job, or None if it can not be cancelled.
+        """
+        job = await self.job_model.cancel_job(job_id=job_id)
+        if job is None:
+            return None
+
+        task = self.running_tasks.get(job.id)
+        if task:
+            task.cancel()
+
+        return job
+
+    async def worker(self):
+        while True:
+            job_id = await self.queue.get()
+
+            job = await self.job_model.claim_job(job_id=job_id,
+                                                 owner_id=self.owner_id,
+                                                 lease_ttl=self.lease_ttl)
+            if job is None:
+                # cancelled before it started, or claimed by another worker
+                continue
+
+            task = asyncio.create_task(self.run_job(job=job))
+            self.running_tasks[job.id] = task
+
+            try:
+                await task
+                await self.job_model.finish_job(job_id=job.id,
+                                                job_status=JobStatusEnum.COMPLETED.value,
+                                                owner_id=self.owner_id)
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    # the app is shutting down: leave the job running so the
+                    # next start resumes it from its checkpoint
+                    task.cancel()
+                    raise
+                # otherwise the job itself was cancelled through cancel()
+            except Exception as e:
+                self.logger.error(f"Error while running job {job.id}: {e}")
+                await self.job_model.finish_job(job_id=job.id,
+                                                job_status=JobStatusEnum.FAILED.value,
+                                                job_error=str(e),
+                                                owner_id=self.owner_id)
+            finally:
+                self.running_tasks.pop(job.id, None)
+
+    async def run_job(self, job: Job):
+        if job.job_type == JobTypeEnum.PROCESS.value:
+            return await self.run_process_job(job=job)
+
+        if job.job_type == JobTypeEnum.INDEX.value:
+            return await self.run_index_job(job=job)
+
+        raise Exception(f"Unsupported job type: {job.job_type}")
+
+    async def run_process_job(self, job: Job):
+
+        project = await self.project_model.get_project_or_create_one(project_id=job.project_id)
+
+        file_id = job.job_request.get("file_id")
+        project_assets = []
+
+        if file_id:
+            asset_record = await self.asset_model.get_asset_record(
+                asset_project_id=project.id,
+                asset_name=file_id,
+                lean=True,
+            )
+            if asset_record is None:
+                raise Exception(f"File {file_id} not found in project")
+
+            project_assets = [asset_record]
+        else:
+            async for project_files in self.asset_model.iter_project_assets(
+                asset_project_id=project.id,
+                asset_type=AssetTypeEnum.FILE_.value,
+                lean=True,
+            ):
+                project_assets.extend(project_files)
+
+            if len(project_assets) == 0:
+                raise Exception("No files found in project")
+
+        # files stored before a restart are skipped on resume
+        processed_assets = [str(asset_id) for asset_id in job.job_checkpoint.get("processed_assets", [])]
+        progress = dict(job.job_progress)
+        progress["files_total"] = len(project_assets)
+
+        # the reset also clears every asset fingerprint, so a resumed reset
+        # job still processes the assets it had not stored yet
+        do_reset = not processed_assets and bool(job.job_request.get("do_reset"))
+        if do_reset:
+            await self.chunk_model.delete_chunks_by_project_id(project_id=project.id)
+
+        process_controller = ProcessController(project_id=job.project_id)
+        project_files_ids, asset_configs, skipped_files = await process_controller.select_changed_assets(
+            assets=[
+                asset for asset in project_assets
+                if str(asset.id) not in processed_assets
+            ],
+            asset_model=self.asset_model,
+            chunk_size=job.job_request.get("chunk_size"),
+            overlap_size=job.job_request.get("overlap_size"),
+            process_pool=self.process_pool,
+            do_reset=do_reset,
+        )
+        progress["files_skipped"] = skipped_files
+
+        await self.job_model.update_job(job_id=job.id, fields={"job_progress": progress})
+
+        async def on_file_processed(asset_id, inserted_chunks):
+            processed_assets.append(str(asset_id))
+            progress["files_processed"] += 1
+            progress["chunks"] += inserted_chunks
+
+            await self.job_model.update_job(job_id=job.id, fields={
+                "job_progress": progress,
+                "job_checkpoint": {"processed_assets": processed_assets},
+            })
+
+        process_result = await process_controller.process_files(
+            project=project,
+            project_files_ids=project_files_ids,
+            chunk_model=self.chunk_model,
+            chunk_size=job.job_request.get("chunk_size"),
+            overlap_size=job.job_request.get("overlap_size"),
+            process_pool=self.process_pool,
+            on_file_processed=on_file_processed,
+            asset_model=self.asset_model,
+            asset_configs=asset_configs,
+        )
+
+        if process_result is None:
+            raise Exception("File processing produced no chunks")
+
+    async def run_index_job(self, job: Job):
+
+        project = await self.project_model.get_project_or_create_one(project_id=job.project_id)
+
+        # counters of a resumed job continue from the last checkpoint
+        checkpoint = job.job_checkpoint or None
+        base_progress = dict(job.job_progress)
+
+        async def on_checkpoint(new_checkpoint, pipeline_progress):
+            progress = dict(base_progress)
+            progress["embedded"] = base_progress["embedded"] + pipeline_progress["embedded"]
+            progress["upserted"] = base_progress["upserted"] + pipeline_progress["upserted"]
+
+            await self.job_model.update_job(job_id=job.id, fields={
+                "job_progress": progress,
+                "job_checkpoint": new_checkpoint,
+            })
+
+        index_pipeline = IndexPipelineController(
+            nlp_controller=self.nlp_controller,
+            chunk_model=self.chunk_model,
+        )
+
+        inserted_items_count = await index_pipeline.index_project(
+            project=project,
+            do_reset=bool(job.job_request.get("do_reset")) and checkpoint is None,
+            checkpoint=checkpoint,
+            on_checkpoint=on_checkpoint,
+        )
+
+        if inserted_items_count is None:
+            raise Exception("Error while inserting into vector db")
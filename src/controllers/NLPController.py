@@ -1,8 +1,10 @@
 from .BaseController import BaseController
 from models.db_schemas import Project, DataChunk
 from stores.llm.LLMEnums import DocumentTypeEnum
+from helpers.BM25Encoder import BM25Encoder
 from typing import List
 import json
+import uuid
 
 class NLPController(BaseController):
 
@@ -15,65 +17,178 @@ class NLPController(BaseController):
         self.embedding_client = embedding_client
         self.template_parser = template_parser
 
+        # keyword side of the hybrid search, computed locally
+        self.sparse_encoder = BM25Encoder() if self.app_settings.VECTOR_DB_HYBRID_SEARCH else None
+        # collection_name -> running BM25 length statistics of its indexed
+        # chunks, kept by this process from the chunks it indexes
+        self.sparse_stats = {}
+
     def create_collection_name(self, project_id: str):
         return f"collection_{project_id}".strip()
     
-    def reset_vector_db_collection(self, project: Project):
+    async def reset_vector_db_collection(self, project: Project):
         collection_name = self.create_collection_name(project_id=project.project_id)
-        return self.vectordb_client.delete_collection(collection_name=collection_name)
+        self.sparse_stats.pop(collection_name, None)
+        return await self.vectordb_client.delete_collection(collection_name=collection_name)
     
-    def get_vector_db_collection_info(self, project: Project):
+    async def get_vector_db_collection_info(self, project: Project):
         collection_name = self.create_collection_name(project_id=project.project_id)
-        collection_info = self.vectordb_client.get_collection_info(collection_name=collection_name)
+        collection_info = await self.vectordb_client.get_collection_info(collection_name=collection_name)
 
         return json.loads(
             json.dumps(collection_info, default=lambda x: x.__dict__)
         )
     
-    def index_into_vector_db(self, project: Project, chunks: List[DataChunk],
-                                   chunks_ids: List[int], 
+    async def index_into_vector_db(self, project: Project, chunks: List[DataChunk],
                                    do_reset: bool = False):
         
-        # step1: get collection name
-        collection_name = self.create_collection_name(project_id=project.project_id)
+        # step1: embed the chunks texts
+        vectors = await self.embed_chunks(chunks=chunks)
 
-        # step2: manage items
-        texts = [ c.chunk_text for c in chunks ]
-        metadata = [ c.chunk_metadata for c in  chunks]
-        vectors = []
-
-        for text in texts:
-            print("###!!!###")
-            print("TEXT LENGTH:", len(text))
-            print("###!!!###")
+        if not vectors:
+            return False
 
-            vector = self.embedding_client.embed_text(
-                document_content=text,
-                document_type=DocumentTypeEnum.DOCUMENT.value
-            )
+        # step2: create collection if not exists
+        _ = await self.prepare_vector_db_collection(project=project, do_reset=do_reset)
 
-            vectors.append(vector)
+        # step3: insert into vector db
+        return await self.insert_into_vector_db(
+            project=project,
+            chunks=chunks,
+            vectors=vectors,
+        )
 
+    async def prepare_vector_db_collection(self, project: Project, do_reset: bool = False):
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        if do_reset:
+            self.sparse_stats.pop(collection_name, None)
 
-        # step3: create collection if not exists
-        _ = self.vectordb_client.create_collection(
+        return await self.vectordb_client.create_collection(
             collection_name=collection_name,
             embedding_size=self.embedding_client.embedding_size,
             do_reset=do_reset,
         )
 
-        # step4: insert into vector db
-        _ = self.vectordb_client.insert_many(
-            collection_name=collection_name,
+    async def embed_chunks(self, chunks: List[DataChunk]):
+        texts = [ c.chunk_text for c in chunks ]
+
+        # one (or a few) provider calls for the whole page instead of one per chunk
+        vectors = await self.embedding_client.aembed_texts(
             texts=texts,
-            metadata=metadata,
+            document_type=DocumentTypeEnum.DOCUMENT.value
+        )
+
+        if not vectors or len(vectors) != len(texts):
+            return None
+
+        return vectors
+
+    def get_point_id(self, chunk_id):
+        """
+        The vector db point id of a chunk: a UUID derived from the chunk
+        _id, so the same chunk is always upserted to the same point.
+        """
+        return str(uuid.uuid5(uuid.NAMESPACE_OID, str(chunk_id)))
+
+    async def insert_into_vector_db(self, project: Project, chunks: List[DataChunk],
+                                    vectors: List):
+        collection_name = self.create_collection_name(project_id=project.project_id)
+
+        return await self.vectordb_client.insert_many(
+            collection_name=collection_name,
+            texts=[ c.chunk_text for c in chunks ],
+            metadata=[ c.chunk_metadata for c in chunks ],
             vectors=vectors,
-            record_ids=chunks_ids,
+            record_ids=[ self.get_point_id(c.id) for c in chunks ],
+            payloads=[ self.get_point_payload(c) for c in chunks ],
+            sparse_vectors=self.encode_sparse_documents(texts=[ c.chunk_text for c in chunks ],
+                                                        collection_name=collection_name),
+        )
+
+    def encode_sparse_documents(self, texts: List[str], collection_name: str):
+        if self.sparse_encoder is None:
+            return None
+        return self.sparse_encoder.encode_documents(
+            texts, stats=self.sparse_stats.setdefault(collection_name, {})
+        )
+
+    def encode_sparse_query(self, text: str):
+        if self.sparse_encoder is None:
+            return None
+        return self.sparse_encoder.encode_query(text)
+
+    def get_point_payload(self, chunk: DataChunk):
+        """
+        Structured payload fields of a chunk's point, indexed by the vector
+        db and usable in search filters.
+        """
+        payload = {
+            "chunk_id": str(chunk.id),
+            "asset_id": str(chunk.chunk_asset_id),
+            "chunk_order": chunk.chunk_order,
+        }
+
+        page = (chunk.chunk_metadata or {}).get("page")
+        if page is not None:
+            payload["page"] = page
+
+        return payload
+
+    def get_search_filters(self, file_ids: List[str] = None, page_from: int = None,
+                           page_to: int = None, metadata: dict = None):
+        """
+        Build the vector db filters of a search, evaluated by the vector db
+        itself on the indexed payload fields.
+
+        Returns:
+            dict or None: {payload field: value, [values] or range dict}.
+        """
+        filters = {}
+
+        if file_ids:
+            filters["asset_id"] = list(file_ids)
+
+        page_range = {}
+        if page_from is not None:
+            page_range["gte"] = page_from
+        if page_to is not None:
+            page_range["lte"] = page_to
+        if page_range:
+            filters["page"] = page_range
+
+        for key, value in (metadata or {}).items():
+            filters[f"metadata.{key}"] = value
+
+        return filters or None
+
+    async def delete_points_outside_assets(self, project: Project, asset_ids: List):
+        """
+        Delete the points of assets that no longer have chunks, and the
+        points written before they carried an asset_id.
+        """
+        collection_name = self.create_collection_name(project_id=project.project_id)
+
+        return await self.vectordb_client.delete_records_outside(
+            collection_name=collection_name,
+            field_name="asset_id",
+            field_values=[ str(asset_id) for asset_id in asset_ids ],
         )
 
-        return True
+    async def delete_stale_asset_points(self, project: Project, asset_id, chunk_ids: List):
+        """
+        Delete the points of an asset except the ones of its current chunks.
+        """
+        collection_name = self.create_collection_name(project_id=project.project_id)
 
-    def search_vector_db_collection(self, project: Project, text: str, limit: int = 10):
+        return await self.vectordb_client.delete_stale_records(
+            collection_name=collection_name,
+            field_name="asset_id",
+            field_value=str(asset_id),
+            record_ids=[ self.get_point_id(chunk_id) for chunk_id in chunk_ids ],
+        )
+
+    async def search_vector_db_collection(self, project: Project, text: str, limit: int = 10,
+                                          filters: dict = None):
 
         # step1: get collection name
         collection_name = self.create_collection_name(project_id=project.project_id)
@@ -85,17 +200,19 @@ class NLPController(BaseController):
         print("###!!!###")
         ##
     
-        vector = self.embedding_client.embed_text(document_content=text, 
-                                                 document_type=DocumentTypeEnum.QUERY.value)
+        vector = await self.embedding_client.aembed_text(document_content=text, 
+                                                        document_type=DocumentTypeEnum.QUERY.value)
 
         if not vector or len(vector) == 0:
             return False
 
         # step3: do semantic search
-        results = self.vectordb_client.search_by_vector(
+        results = await self.vectordb_client.search_by_vector(
             collection_name=collection_name,
             vector=vector,
-            limit=limit
+            limit=limit,
+            filters=filters,
+            sparse_vector=self.encode_sparse_query(text=text),
         )
 
         if not results:
@@ -103,15 +220,46 @@ class NLPController(BaseController):
 
         return results
     
-    def answer_rag_question(self, project: Project, query: str, limit: int = 10):
+    async def search_vector_db_collection_batch(self, project: Project, texts: List[str],
+                                                limits: List[int], filters: List[dict] = None):
+        """
+        Search several queries at once: the queries are embedded in one
+        batch and searched in one vector db request.
+
+        Returns:
+            list or False: The results of each query in order, False if the
+                           queries could not be embedded.
+        """
+        collection_name = self.create_collection_name(project_id=project.project_id)
+
+        vectors = await self.embedding_client.aembed_texts(texts=texts,
+                                                           document_type=DocumentTypeEnum.QUERY.value)
+
+        if not vectors or len(vectors) != len(texts):
+            return False
+
+        return await self.vectordb_client.search_by_vectors(
+            collection_name=collection_name,
+            vectors=vectors,
+            limits=limits,
+            filters=filters,
+            sparse_vectors=(
+                [ self.encode_sparse_query(text=text) for text in texts ]
+                if self.sparse_encoder is not None else None
+            ),
+        )
+
+    async def answer_rag_question(self, project: Project, query: str, limit: int = 10,
+                                  filters: dict = None):
         
         answer, full_prompt, chat_history = None, None, None
 
         # step1: retrieve related documents
-        retrieved_documents = self.search_vector_db_collection(
+        retrieved_documents = await self.search_vector_db_collection(
             project=project,
             text=query,
             limit=limit,
+            filters=filters,
         )
 
         if not retrieved_documents or len(retrieved_documents) == 0:
@@ -143,7 +291,7 @@ class NLPController(BaseController):
         full_prompt = "\n\n".join([ documents_prompts,  footer_prompt])
 
         # step4: Retrieve the Answer
-        answer = self.generation_client.generate_text(
+        answer = await self.generation_client.agenerate_text(
             prompt=full_prompt,
             chat_history=chat_history
         )
@@ -1,10 +1,17 @@
 from .BaseController import BaseController
 from .ProjectController import ProjectController
-from langchain_community.document_loaders import TextLoader
-from langchain_community.document_loaders import PyMuPDFLoader
+from .process_workers import (get_file_loader, chunk_file_content, process_file_window,
+                              get_pdf_page_count, extract_pdf_window, chunk_pages,
+                              hash_file, process_cached_window,
+                              SPLITTER_VERSION, PAGE_CACHE_SUFFIX)
 from models import ProcessingEnum
-from langchain_text_splitters import CharacterTextSplitter
+from models.db_schemas import DataChunk, Project, Asset
+from concurrent.futures import Executor
+from typing import List
+import asyncio
+import logging
 import os
+import uuid
 
 
 
@@ -32,6 +39,7 @@ class ProcessController(BaseController):
         super().__init__()
         self.project_id = project_id
         self.project_path = ProjectController().get_project_path(project_id=project_id)
+        self.logger = logging.getLogger(__name__)
 
     def get_file_extension(self,file_id:str):
         """
@@ -62,23 +70,12 @@ class ProcessController(BaseController):
                 otherwise None.
         """
 
-        file_ext = self.get_file_extension(file_id=file_id)
         file_path = os.path.join(
             self.project_path,
             file_id
         )
 
-        if not os.path.exists(file_path):
-            return None
-
-        if file_ext == ProcessingEnum.TXT.value:
-            return TextLoader(file_path,encoding="utf-8")
-        
-        if file_ext == ProcessingEnum.PDF.value:
-            return PyMuPDFLoader(file_path)
-        
-        print(f"Unsupported file type: {file_ext}")
-        return None
+        return get_file_loader(file_path=file_path)
     
     def get_file_content(self, file_id:str):
         """
@@ -120,29 +117,446 @@ class ProcessController(BaseController):
             list: List of chunked document objects with metadata preserved.
         """
         
-        text_splitter = CharacterTextSplitter(
+        return chunk_file_content(
+            file_content=file_content,
             chunk_size=chunk_size,
-            chunk_overlap=overlap_size,
-            length_function=len,
+            overlap_size=overlap_size
         )
-        # print("#########")
-        # print("file_content: ",file_content)
-        # print("#########")
-        
-        file_content_texts =[
-            rec.page_content
-            for rec in file_content
-        ]
-        
 
-        file_content_metadata =[
-            rec.metadata
-            for rec in file_content
-        ]
-        
-        chunks = text_splitter.create_documents(
-            file_content_texts,
-            metadatas=file_content_metadata
+    def get_page_cache_path(self, asset_hash: str):
+        """
+        Return the path of the extracted-pages sidecar cache of a content
+        hash, next to its blob so every project holding the same content
+        shares it, or None when the cache is disabled or the hash is unknown.
+        """
+        if not asset_hash or not self.app_settings.PROCESS_PAGE_CACHE_ENABLED:
+            return None
+
+        return os.path.join(self.get_blob_dir(file_hash=asset_hash),
+                            f"{asset_hash}.{PAGE_CACHE_SUFFIX}")
+
+    async def iter_file_chunks(self, file_path: str, chunk_size: int, overlap_size: int,
+                               process_pool: Executor=None, asset_hash: str=None):
+        """
+        Stream the chunks of one file, one window at a time.
+
+        The extracted pages are kept in a compressed sidecar cache keyed by
+        the file content hash, so chunking the same content again (e.g. with
+        another chunk_size, or in another project) reads the cached pages
+        instead of parsing the file. A changed file has another hash and
+        gets a new cache.
+
+        Yields:
+            list: (chunk_text, chunk_metadata) pairs of the next window.
+        """
+        loop = asyncio.get_running_loop()
+        cache_path = self.get_page_cache_path(asset_hash=asset_hash)
+
+        if cache_path and os.path.exists(cache_path):
+            offset = 0
+            carry_text = ""
+            while offset is not None:
+                window_chunks, carry_text, offset = await loop.run_in_executor(
+                    process_pool, process_cached_window,
+                    cache_path, offset, chunk_size, overlap_size, carry_text,
+                    self.get_chunker_options(),
+                )
+                yield window_chunks
+            return
+
+        # written under a temporary name and renamed once complete, so an
+        # interrupted extraction never leaves a partial cache behind
+        write_path = f"{cache_path}.{uuid.uuid4().hex}.tmp" if cache_path else None
+
+        try:
+            async for window_chunks in self.iter_extracted_chunks(file_path=file_path,
+                                                                  chunk_size=chunk_size,
+                                                                  overlap_size=overlap_size,
+                                                                  process_pool=process_pool,
+                                                                  cache_path=write_path):
+                yield window_chunks
+
+            if write_path:
+                os.replace(write_path, cache_path)
+        finally:
+            if write_path and os.path.exists(write_path):
+                os.remove(write_path)
+
+    async def iter_extracted_chunks(self, file_path: str, chunk_size: int, overlap_size: int,
+                                    process_pool: Executor=None, cache_path: str=None):
+        """
+        Extract and chunk one file, one window at a time.
+
+        Only one window of pages (PDF) or bytes (TXT) is loaded at a time,
+        and the chunk overlap is carried from one window to the next.
+        PDFs with at least PROCESS_PDF_PARALLEL_MIN_PAGES pages are handed
+        to `iter_parallel_pdf_chunks` instead.
+
+        Yields:
+            list: (chunk_text, chunk_metadata) pairs of the next window.
+        """
+        loop = asyncio.get_running_loop()
+
+        if self.get_file_extension(file_id=file_path) == ProcessingEnum.PDF.value \
+                and os.path.exists(file_path):
+            total_pages = await loop.run_in_executor(process_pool, get_pdf_page_count, file_path)
+
+            if total_pages >= self.app_settings.PROCESS_PDF_PARALLEL_MIN_PAGES:
+                async for window_chunks in self.iter_parallel_pdf_chunks(
+                    file_path=file_path,
+                    total_pages=total_pages,
+                    chunk_size=chunk_size,
+                    overlap_size=overlap_size,
+                    process_pool=process_pool,
+                    cache_path=cache_path,
+                ):
+                    yield window_chunks
+                return
+
+        cursor = 0
+        carry_text = ""
+
+        while cursor is not None:
+            window = await loop.run_in_executor(
+                process_pool, process_file_window,
+                file_path, cursor, chunk_size, overlap_size, carry_text,
+                self.app_settings.PROCESS_PAGES_PER_WINDOW,
+                self.app_settings.PROCESS_TEXT_BYTES_PER_WINDOW,
+                cache_path,
+                self.get_chunker_options(),
             )
+            if window is None:
+                raise Exception(f"File {file_path} is missing or not supported")
+
+            window_chunks, carry_text, cursor = window
+            yield window_chunks
+
+    async def iter_parallel_pdf_chunks(self, file_path: str, total_pages: int,
+                                       chunk_size: int, overlap_size: int,
+                                       process_pool: Executor=None, cache_path: str=None):
+        """
+        Extract a large PDF as PROCESS_PDF_PARALLEL_RANGES page ranges at a
+        time in parallel workers, then chunk the pages in order.
+
+        Each round extracts the next PROCESS_PDF_PARALLEL_RANGES windows of
+        PROCESS_PAGES_PER_WINDOW pages concurrently, so memory stays bounded
+        by one round. Chunking runs after the round is reassembled in page
+        order, which keeps the carried overlap and the page metadata
+        identical to the sequential path.
+
+        Yields:
+            list: (chunk_text, chunk_metadata) pairs of the next page range.
+        """
+        loop = asyncio.get_running_loop()
+        pages_per_window = self.app_settings.PROCESS_PAGES_PER_WINDOW
+        ranges_per_round = max(1, self.app_settings.PROCESS_PDF_PARALLEL_RANGES)
+
+        carry_text = ""
+        for round_start in range(0, total_pages, pages_per_window * ranges_per_round):
+            page_ranges = [
+                (start_page, min(start_page + pages_per_window, total_pages))
+                for start_page in range(round_start,
+                                        min(round_start + pages_per_window * ranges_per_round, total_pages),
+                                        pages_per_window)
+            ]
+
+            extracted_ranges = await asyncio.gather(*[
+                loop.run_in_executor(process_pool, extract_pdf_window,
+                                     file_path, start_page, end_page)
+                for start_page, end_page in page_ranges
+            ])
+
+            for pages, _ in extracted_ranges:
+                window_chunks, carry_text = await loop.run_in_executor(
+                    process_pool, chunk_pages,
+                    pages, chunk_size, overlap_size, carry_text, cache_path,
+                    self.get_chunker_options(),
+                )
+                yield window_chunks
+
+    async def iter_copied_chunks(self, chunk_model, source_asset_id):
+        """
+        Stream the stored chunks of another asset with the same content and
+        processing fingerprint, instead of chunking the file again.
+
+        Yields:
+            list: (chunk_text, chunk_metadata) pairs of the next batch.
+        """
+        async for chunks in chunk_model.iter_asset_chunks(
+            asset_id=source_asset_id,
+            batch_size=self.app_settings.CHUNK_INSERT_BATCH_SIZE,
+            projection={"chunk_text": 1, "chunk_metadata": 1},
+        ):
+            yield [
+                (chunk.chunk_text, chunk.chunk_metadata)
+                for chunk in chunks
+            ]
+
+    async def store_file_chunks(self, project: Project, asset_id, file_id: str, chunk_model,
+                                chunk_size: int, overlap_size: int, process_pool: Executor=None,
+                                asset_hash: str=None, source_asset_id=None):
+        """
+        Stream one file through the pool and store its chunks in batches
+        of CHUNK_INSERT_BATCH_SIZE.
+
+        When `source_asset_id` is given, the chunks of that asset (same
+        content, same settings, possibly in another project) are copied
+        instead.
+
+        Returns:
+            int: Number of stored chunks.
+        """
+        file_path = os.path.join(self.project_path, file_id)
+
+        # chunks left by a previous or interrupted run are removed first,
+        # so the new chunks are stored with plain inserts
+        await chunk_model.delete_chunks_by_asset_id(asset_id=asset_id)
+
+        if source_asset_id is not None:
+            file_chunks = self.iter_copied_chunks(chunk_model=chunk_model,
+                                                  source_asset_id=source_asset_id)
+        else:
+            file_chunks = self.iter_file_chunks(file_path=file_path,
+                                                chunk_size=chunk_size,
+                                                overlap_size=overlap_size,
+                                                process_pool=process_pool,
+                                                asset_hash=asset_hash)
+
+        chunk_order = 0
+        pending_records = []
+        inserted_chunks = 0
+
+        async for window_chunks in file_chunks:
+            for chunk_text, chunk_metadata in window_chunks:
+                # shared pages and copied chunks may name another project's file
+                for key in ("source", "file_path"):
+                    if key in chunk_metadata:
+                        chunk_metadata[key] = file_path
+
+                chunk_order += 1
+                pending_records.append(DataChunk(
+                    chunk_text=chunk_text,
+                    chunk_metadata=chunk_metadata,
+                    chunk_order=chunk_order,
+                    chunk_project_id=project.id,
+                    chunk_asset_id=asset_id
+                ))
+
+            if len(pending_records) >= self.app_settings.CHUNK_INSERT_BATCH_SIZE:
+                inserted_chunks += await chunk_model.insert_many_chunks(chunks=pending_records)
+                pending_records = []
+
+        if pending_records:
+            inserted_chunks += await chunk_model.insert_many_chunks(chunks=pending_records)
+
+        if inserted_chunks == 0 and source_asset_id is not None:
+            # the source chunks were removed in the meantime
+            return await self.store_file_chunks(project=project,
+                                                asset_id=asset_id,
+                                                file_id=file_id,
+                                                chunk_model=chunk_model,
+                                                chunk_size=chunk_size,
+                                                overlap_size=overlap_size,
+                                                process_pool=process_pool,
+                                                asset_hash=asset_hash)
+
+        return inserted_chunks
+
+    def get_chunker_options(self):
+        """
+        Picklable TextChunker options passed to the pool workers.
+        """
+        return {
+            "separators": self.app_settings.PROCESS_CHUNK_SEPARATORS,
+            "tokenizer": self.app_settings.PROCESS_CHUNK_TOKENIZER or None,
+        }
+
+    def get_asset_config(self, asset_hash: str, chunk_size: int, overlap_size: int):
+        """
+        Build the processing fingerprint stored on an asset once its chunks
+        are stored.
+        """
+        return {
+            "asset_hash": asset_hash,
+            "chunk_size": chunk_size,
+            "overlap_size": overlap_size,
+            "splitter_version": SPLITTER_VERSION,
+            **self.get_chunker_options(),
+        }
+
+    async def select_changed_assets(self, assets: List[Asset], asset_model,
+                                    chunk_size: int=100, overlap_size: int=20,
+                                    process_pool: Executor=None, do_reset: bool=False):
+        """
+        Keep only the assets whose content or processing settings changed
+        since their chunks were stored.
+
+        An asset is skipped when its content hash and the requested
+        chunk_size, overlap_size and splitter version match the fingerprint
+        recorded by the last processing. Assets uploaded without a hash are
+        hashed once in `process_pool`.
+
+        Args:
+            assets (list): Asset records of the project.
+            asset_model (AssetModel): Model used to record missing hashes.
+            chunk_size (int, optional): Requested chunk size.
+            overlap_size (int, optional): Requested overlap.
+            process_pool (Executor, optional): Pool used to hash files.
+            do_reset (bool, optional): Process every asset.
+
+        Returns:
+            tuple: (project_files_ids, asset_configs, skipped_files) where
+                asset_configs maps each asset id to process to the
+                fingerprint to record once it is stored.
+        """
+        loop = asyncio.get_running_loop()
+
+        project_files_ids = {}
+        asset_configs = {}
+        skipped_files = 0
+
+        for asset in assets:
+            asset_hash = asset.asset_hash
+            file_path = os.path.join(self.project_path, asset.asset_name)
+
+            if asset_hash is None and os.path.exists(file_path):
+                asset_hash = await loop.run_in_executor(process_pool, hash_file, file_path)
+                await asset_model.update_asset_hash(asset_id=asset.id, asset_hash=asset_hash)
+
+            asset_config = self.get_asset_config(asset_hash=asset_hash,
+                                                 chunk_size=chunk_size,
+                                                 overlap_size=overlap_size)
+
+            if not do_reset and asset_hash is not None and asset.asset_config == asset_config:
+                skipped_files += 1
+                continue
+
+            project_files_ids[asset.id] = asset.asset_name
+            asset_configs[asset.id] = asset_config
+
+        return project_files_ids, asset_configs, skipped_files
+
+    async def process_files(self, project: Project, project_files_ids: dict, chunk_model,
+                            chunk_size: int=100, overlap_size: int=20,
+                            process_pool: Executor=None, on_file_processed=None,
+                            asset_model=None, asset_configs: dict=None):
+        """
+        Chunk the given project files and store the chunks in the database.
+
+        Files are streamed through `process_pool` (at most
+        PROCESS_POOL_WORKERS files at a time) with `store_file_chunks`, so
+        memory stays bounded by the window size and not by the file size.
+        Large PDFs are additionally split into page ranges parsed in parallel.
+
+        A file that takes longer than PROCESS_FILE_TIMEOUT seconds or fails
+        is skipped and the chunks already stored for it are removed. On a
+        timeout, a RecyclingProcessPool gets new workers, since the tasks
+        of the file keep running in the old ones.
+
+        Args:
+            project (Project): Project that owns the files.
+            project_files_ids (dict): Mapping of asset id to file id.
+            chunk_model (ChunkModel): Model used to store the chunks.
+            chunk_size (int, optional): Maximum size of each chunk.
+            overlap_size (int, optional): Overlap between chunks.
+            process_pool (Executor, optional): Pool running the CPU-bound
+                work. Defaults to the event loop's thread pool.
+            on_file_processed (callable, optional): Coroutine called with
+                (asset_id, inserted_chunks) after each file is stored.
+            asset_model (AssetModel, optional): Model used to record the
+                processing fingerprint of each stored file.
+            asset_configs (dict, optional): Fingerprints built by
+                `select_changed_assets`, keyed by asset id. Their content
+                hash also keys the extracted-pages cache, and the chunks of
+                an asset with the same fingerprint are copied instead of
+                chunking the file again.
+
+        Returns:
+            tuple or None:
+                (inserted_chunks, processed_files), or None if a file
+                produced no chunks.
+        """
+        # only process as many files as there are workers, so the timeout
+        # measures the processing time and not the time spent queued
+        semaphore = asyncio.Semaphore(self.app_settings.PROCESS_POOL_WORKERS)
+
+        async def process_one_file(asset_id, file_id):
+            asset_config = (asset_configs or {}).get(asset_id)
+            asset_hash = asset_config.get("asset_hash") if asset_config else None
+
+            async with semaphore:
+                # pool the work of this file starts on, see RecyclingProcessPool
+                pool_generation = getattr(process_pool, "generation", None)
+                try:
+                    # the same content processed with the same settings in
+                    # any project is reused instead of chunked again
+                    source_asset = None
+                    if asset_model and asset_hash:
+                        source_asset = await asset_model.get_processed_asset(
+                            asset_config=asset_config,
+                            exclude_asset_id=asset_id,
+                            lean=True,
+                        )
+
+                    inserted_chunks = await asyncio.wait_for(
+                        self.store_file_chunks(project=project,
+                                               asset_id=asset_id,
+                                               file_id=file_id,
+                                               chunk_model=chunk_model,
+                                               chunk_size=chunk_size,
+                                               overlap_size=overlap_size,
+                                               process_pool=process_pool,
+                                               asset_hash=asset_hash,
+                                               source_asset_id=source_asset.id if source_asset else None),
+                        timeout=self.app_settings.PROCESS_FILE_TIMEOUT,
+                    )
+                except asyncio.TimeoutError:
+                    self.logger.error(f"Timeout while processing file {file_id}")
+                    inserted_chunks = None
+                    if pool_generation is not None:
+                        # the abandoned tasks still hold their workers
+                        process_pool.recycle(generation=pool_generation)
+                except Exception as e:
+                    self.logger.error(f"Error while processing file {file_id}: {e}")
+                    inserted_chunks = None
+
+                if inserted_chunks is None:
+                    # drop the windows stored before the failure
+                    await chunk_model.delete_chunks_by_asset_id(asset_id=asset_id)
+
+            return asset_id, file_id, inserted_chunks
+
+        tasks = [
+            asyncio.create_task(process_one_file(asset_id, file_id))
+            for asset_id, file_id in project_files_ids.items()
+        ]
+
+        no_records = 0
+        no_files = 0
+
+        try:
+            for next_file in asyncio.as_completed(tasks):
+                asset_id, file_id, inserted_chunks = await next_file
+
+                if inserted_chunks is None:
+                    self.logger.error(f"Error while processing file {file_id}")
+                    continue
+
+                if inserted_chunks == 0:
+                    return None
+
+                no_records += inserted_chunks
+                no_files += 1
+
+                if asset_model and asset_configs and asset_id in asset_configs:
+                    await asset_model.update_asset_config(asset_id=asset_id,
+                                                          asset_config=asset_configs[asset_id])
+
+                if on_file_processed:
+                    await on_file_processed(asset_id, inserted_chunks)
+        finally:
+            # stop waiting on the remaining files on failure or cancellation
+            for task in tasks:
+                task.cancel()
 
-        return chunks
\ No newline at end of file
+        return no_records, no_files
@@ -2,3 +2,5 @@ from .DataControllers import DataController
 from .ProjectController import ProjectController
 from .ProcessController import ProcessController
 from .NLPController import NLPController
+from .IndexPipelineController import IndexPipelineController
+from .JobController import JobController
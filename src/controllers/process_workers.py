@@ -0,0 +1,409 @@
+"""
+Module-level file processing functions.
+
+They run inside the ProcessPoolExecutor workers, so they must stay picklable
+(plain functions, plain arguments) and must not depend on controller state.
+"""
+from langchain_community.document_loaders import TextLoader
+from langchain_community.document_loaders import PyMuPDFLoader
+from langchain_core.documents import Document
+from models import ProcessingEnum, ResponseSignal
+from helpers.TextChunker import TextChunker
+import fitz
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import tarfile
+import uuid
+import zipfile
+import zlib
+
+# bump when the extraction or chunking output changes, so assets processed
+# by an older version are chunked again
+SPLITTER_VERSION = "native-v1"
+
+# suffix of the extracted-pages sidecar cache; bump the version when the
+# extraction output changes
+PAGE_CACHE_SUFFIX = "pages-v1.jsonl.gz"
+
+
+def get_file_loader(file_path: str):
+    """
+    Return the loader matching the file extension, or None if the file
+    is missing or its type is not supported.
+    """
+    if not os.path.exists(file_path):
+        return None
+
+    file_ext = os.path.splitext(file_path)[-1]
+
+    if file_ext == ProcessingEnum.TXT.value:
+        return TextLoader(file_path,encoding="utf-8")
+
+    if file_ext == ProcessingEnum.PDF.value:
+        return PyMuPDFLoader(file_path)
+
+    print(f"Unsupported file type: {file_ext}")
+    return None
+
+
+def chunk_file_content(file_content: list, chunk_size: int=100, overlap_size: int=20):
+    text_chunker = TextChunker(chunk_size=chunk_size, overlap_size=overlap_size)
+
+    return [
+        Document(page_content=chunk_text, metadata=dict(rec.metadata))
+        for rec in file_content
+        for chunk_text in text_chunker.split_text(rec.page_content)
+    ]
+
+
+def hash_file(file_path: str, block_size: int = 1048576):
+    """
+    Return the sha256 of a file, read in blocks.
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(block_size):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
+
+def concat_files(file_paths: list, out_path: str, block_size: int = 1048576):
+    """
+    Write the files of `file_paths`, in order, to `out_path`, hashing the
+    content on the way.
+
+    Returns:
+        tuple: (file_size, file_hash) of the written file.
+    """
+    file_hash = hashlib.sha256()
+    file_size = 0
+    with open(out_path, "wb") as out:
+        for file_path in file_paths:
+            with open(file_path, "rb") as f:
+                while block := f.read(block_size):
+                    file_size += len(block)
+                    file_hash.update(block)
+                    out.write(block)
+
+    return file_size, file_hash.hexdigest()
+
+
+def iter_archive_members(archive_path: str):
+    """
+    Yield the regular files of a zip or tar archive as
+    (member_name, declared_size, open_member) without extracting them.
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                yield info.filename, info.file_size, lambda info=info: archive.open(info)
+        return
+
+    with tarfile.open(archive_path, "r:*") as archive:
+        for member in archive:
+            # links and devices are never extracted
+            if not member.isfile():
+                continue
+            yield member.name, member.size, lambda member=member: archive.extractfile(member)
+
+
+def copy_archive_member(source, temp_path: str, max_size: int, block_size: int = 1048576):
+    """
+    Copy an archive member to `temp_path`, hashing it on the way.
+
+    The declared size of a member can not be trusted, so the copy stops as
+    soon as more than `max_size` bytes were read.
+
+    Returns:
+        tuple or None: (file_size, file_hash), or None if the member is too large.
+    """
+    file_hash = hashlib.sha256()
+    file_size = 0
+    with open(temp_path, "wb") as f:
+        while block := source.read(block_size):
+            file_size += len(block)
+            if file_size > max_size:
+                return None
+            file_hash.update(block)
+            f.write(block)
+
+    return file_size, file_hash.hexdigest()
+
+
+def expand_archive(archive_path: str, temp_dir: str, allowed_types: list,
+                   max_file_size: int, max_files: int):
+    """
+    Expand the supported files of a zip/tar archive into `temp_dir`.
+
+    Members are checked against the allowed types and the max file size
+    before they are read, and at most `max_files` of them are expanded.
+
+    Returns:
+        list: one dict per member:
+            {"file_name", "temp_path", "file_size", "file_hash"} when expanded,
+            {"file_name", "signal"} when rejected.
+    """
+    members = []
+    expanded_files = 0
+    temp_path = None
+
+    try:
+        for member_name, member_size, open_member in iter_archive_members(archive_path):
+            file_name = os.path.basename(member_name)
+            if not file_name:
+                continue
+
+            if expanded_files >= max_files:
+                members.append({"file_name": member_name,
+                                "signal": ResponseSignal.BATCH_TOO_MANY_FILES.value})
+                break
+
+            if mimetypes.guess_type(file_name)[0] not in allowed_types:
+                members.append({"file_name": member_name,
+                                "signal": ResponseSignal.FILE_TYPE_NOT_SUPPORTED.value})
+                continue
+
+            if member_size > max_file_size:
+                members.append({"file_name": member_name,
+                                "signal": ResponseSignal.FILE_SIZE_EXCEEDED.value})
+                continue
+
+            temp_path = os.path.join(temp_dir, uuid.uuid4().hex + ".part")
+            with open_member() as source:
+                copied = copy_archive_member(source=source, temp_path=temp_path,
+                                             max_size=max_file_size)
+
+            if copied is None:
+                os.remove(temp_path)
+                members.append({"file_name": member_name,
+                                "signal": ResponseSignal.FILE_SIZE_EXCEEDED.value})
+                continue
+
+            file_size, file_hash = copied
+            expanded_files += 1
+            members.append({
+                "file_name": member_name,
+                "temp_path": temp_path,
+                "file_size": file_size,
+                "file_hash": file_hash,
+            })
+    except Exception:
+        # a corrupt archive leaves no expanded file behind
+        temp_paths = [member["temp_path"] for member in members if "temp_path" in member]
+        for path in temp_paths + [temp_path]:
+            if path and os.path.exists(path):
+                os.remove(path)
+        raise
+
+    return members
+
+
+def extract_pdf_window(file_path: str, start_page: int, end_page: int):
+    """
+    Extract the pages [start_page, end_page) of a PDF.
+
+    Returns:
+        tuple: ([(page_text, page_metadata), ...], total_pages)
+    """
+    with fitz.open(file_path) as document:
+        total_pages = document.page_count
+        document_metadata = {
+            key: value
+            for key, value in (document.metadata or {}).items()
+            if isinstance(value, (str, int))
+        }
+        document_metadata.update({
+            "source": file_path,
+            "file_path": file_path,
+            "total_pages": total_pages,
+        })
+
+        pages = []
+        for page_no in range(start_page, min(end_page, total_pages)):
+            pages.append((
+                document[page_no].get_text().strip(),
+                {**document_metadata, "page": page_no},
+            ))
+
+    return pages, total_pages
+
+
+def get_pdf_page_count(file_path: str):
+    with fitz.open(file_path) as document:
+        return document.page_count
+
+
+def extract_text_window(file_path: str, offset: int, window_bytes: int):
+    """
+    Read about `window_bytes` of a text file starting at `offset`, extended
+    to the end of the current line so no character or word is split.
+
+    Returns:
+        tuple: ([(text, metadata)], next_offset or None at the end of file)
+    """
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        data = f.read(window_bytes)
+        if data and not data.endswith(b"\n"):
+            data += f.readline()
+
+        next_offset = f.tell()
+        at_end = f.read(1) == b""
+
+    text = data.decode("utf-8")
+    return [(text, {"source": file_path})], (None if at_end else next_offset)
+
+
+def extract_file_window(file_path: str, cursor: int,
+                        pages_per_window: int, text_bytes_per_window: int):
+    """
+    Extract the next window of a file.
+
+    The cursor is a page number for PDFs and a byte offset for TXT files.
+
+    Returns:
+        tuple or None:
+            (pages, next_cursor) where next_cursor is None after the last
+            window, or None if the file is missing or not supported.
+    """
+    if not os.path.exists(file_path):
+        return None
+
+    file_ext = os.path.splitext(file_path)[-1]
+
+    if file_ext == ProcessingEnum.PDF.value:
+        end_page = cursor + pages_per_window
+        pages, total_pages = extract_pdf_window(file_path=file_path,
+                                                start_page=cursor,
+                                                end_page=end_page)
+        return pages, (end_page if end_page < total_pages else None)
+
+    if file_ext == ProcessingEnum.TXT.value:
+        return extract_text_window(file_path=file_path,
+                                   offset=cursor,
+                                   window_bytes=text_bytes_per_window)
+
+    print(f"Unsupported file type: {file_ext}")
+    return None
+
+
+def append_page_cache(cache_path: str, pages: list):
+    """
+    Append a window of extracted pages to the sidecar cache, as one gzip
+    member of JSON lines, so windows can be read back one at a time.
+    """
+    data = "".join(
+        json.dumps({"text": page_text, "metadata": page_metadata}, ensure_ascii=False) + "\n"
+        for page_text, page_metadata in pages
+    ).encode("utf-8")
+
+    with open(cache_path, "ab") as f:
+        f.write(gzip.compress(data))
+
+
+def read_page_cache_window(cache_path: str, offset: int, block_size: int = 1048576):
+    """
+    Read the window (gzip member) of the sidecar cache starting at `offset`.
+
+    Returns:
+        tuple: ([(page_text, page_metadata), ...], next_offset or None after the last window)
+    """
+    decompressor = zlib.decompressobj(wbits=31)
+    data = []
+    read_bytes = 0
+
+    with open(cache_path, "rb") as f:
+        cache_size = os.fstat(f.fileno()).st_size
+        f.seek(offset)
+        while not decompressor.eof:
+            block = f.read(block_size)
+            if not block:
+                raise Exception(f"Truncated page cache {cache_path}")
+            data.append(decompressor.decompress(block))
+            read_bytes += len(block)
+
+    next_offset = offset + read_bytes - len(decompressor.unused_data)
+
+    pages = [
+        (record["text"], record["metadata"])
+        for record in map(json.loads, b"".join(data).decode("utf-8").splitlines())
+    ]
+
+    return pages, (next_offset if next_offset < cache_size else None)
+
+
+def chunk_pages(pages: list, chunk_size: int, overlap_size: int, carry_text: str = "",
+                cache_path: str = None, chunker_options: dict = None):
+    """
+    Chunk a sequence of pages with TextChunker, carrying the overlap across
+    page boundaries.
+
+    The pages are first appended to the sidecar cache when `cache_path`
+    is given.
+
+    Returns:
+        tuple: ([(chunk_text, chunk_metadata), ...], carry_text for the next pages)
+    """
+    if cache_path:
+        append_page_cache(cache_path=cache_path, pages=pages)
+
+    text_chunker = TextChunker.from_options(chunk_size=chunk_size,
+                                            overlap_size=overlap_size,
+                                            chunker_options=chunker_options)
+
+    chunks = list(text_chunker.iter_page_chunks(pages, carry_text=carry_text))
+    return chunks, text_chunker.carry_text
+
+
+def process_file_window(file_path: str, cursor: int, chunk_size: int, overlap_size: int,
+                        carry_text: str, pages_per_window: int, text_bytes_per_window: int,
+                        cache_path: str = None, chunker_options: dict = None):
+    """
+    Extract and chunk one window of a file, appending the extracted pages
+    to the sidecar cache when `cache_path` is given.
+
+    Returns:
+        tuple or None:
+            (chunks, carry_text, next_cursor), or None if the file can not
+            be loaded.
+    """
+    window = extract_file_window(file_path=file_path,
+                                 cursor=cursor,
+                                 pages_per_window=pages_per_window,
+                                 text_bytes_per_window=text_bytes_per_window)
+    if window is None:
+        return None
+
+    pages, next_cursor = window
+    chunks, carry_text = chunk_pages(pages=pages,
+                                     chunk_size=chunk_size,
+                                     overlap_size=overlap_size,
+                                     carry_text=carry_text,
+                                     cache_path=cache_path,
+                                     chunker_options=chunker_options)
+
+    return chunks, carry_text, next_cursor
+
+
+def process_cached_window(cache_path: str, offset: int, chunk_size: int,
+                          overlap_size: int, carry_text: str, chunker_options: dict = None):
+    """
+    Chunk one window of pages read back from the sidecar cache.
+
+    Returns:
+        tuple: (chunks, carry_text, next_offset)
+    """
+    pages, next_offset = read_page_cache_window(cache_path=cache_path, offset=offset)
+    chunks, carry_text = chunk_pages(pages=pages,
+                                     chunk_size=chunk_size,
+                                     overlap_size=overlap_size,
+                                     carry_text=carry_text,
+                                     chunker_options=chunker_options)
+
+    return chunks, carry_text, next_offset
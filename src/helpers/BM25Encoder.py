@@ -0,0 +1,93 @@
+from collections import Counter
+import re
+import zlib
+
+# words, and identifiers such as part numbers or error codes kept whole
+# ("ab-1234/x", "0x80070005", "e.404")
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./:]\w+)*")
+TOKEN_SEPARATORS = re.compile(r"[-./:]")
+
+
+class BM25Encoder:
+    """
+    Encode texts into BM25 sparse vectors without any external model.
+
+    Terms are mapped to sparse indices with a stable hash instead of a
+    stored vocabulary, so every worker encodes the same term to the same
+    index. Document vectors hold the BM25 term frequency part; the IDF
+    part is applied by the vector db from its collection statistics
+    (Qdrant's IDF modifier), so it follows the indexed chunks. The average
+    document length of the length normalization is a running statistic of
+    the indexed collection, see encode_documents.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            k1 (float): Term frequency saturation.
+            b (float): Document length normalization.
+        """
+        self.k1 = k1
+        self.b = b
+
+    def get_tokens(self, text: str):
+        tokens = []
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            tokens.append(token)
+            if TOKEN_SEPARATORS.search(token):
+                # "ab-1234" also matches a query on "1234"
+                tokens.extend(TOKEN_SEPARATORS.split(token))
+        return tokens
+
+    def get_term_index(self, token: str):
+        return zlib.crc32(token.encode("utf-8"))
+
+    def encode_tokens(self, tokens: list, avg_length: float):
+        """
+        Returns:
+            dict: {"indices": [...], "values": [...]} BM25 term weights.
+        """
+        length_norm = self.k1 * (1 - self.b + self.b * len(tokens) / avg_length)
+
+        weights = {}
+        for token, tf in Counter(tokens).items():
+            index = self.get_term_index(token)
+            # hash collisions add up, like the counts of a single term
+            weights[index] = weights.get(index, 0.0) + tf * (self.k1 + 1) / (tf + length_norm)
+
+        return {"indices": list(weights.keys()), "values": list(weights.values())}
+
+    def encode_documents(self, texts: list, stats: dict = None):
+        """
+        Encode documents, normalizing their length by the average length of
+        the collection they are indexed into.
+
+        Args:
+            texts (list): Document texts.
+            stats (dict): Running {"documents": ..., "tokens": ...} counts of
+                          the collection, updated in place with `texts`.
+                          Without it, `texts` are normalized by their own
+                          average length.
+
+        Returns:
+            list: One BM25 sparse vector per text.
+        """
+        documents_tokens = [self.get_tokens(text) for text in texts]
+
+        if stats is None:
+            stats = {}
+        stats["documents"] = stats.get("documents", 0) + len(documents_tokens)
+        stats["tokens"] = stats.get("tokens", 0) + sum(len(tokens) for tokens in documents_tokens)
+        avg_length = max(stats["tokens"] / stats["documents"], 1.0) if stats["documents"] else 1.0
+
+        return [self.encode_tokens(tokens=tokens, avg_length=avg_length)
+                for tokens in documents_tokens]
+
+    def encode_query(self, text: str):
+        """
+        Returns:
+            dict: {"indices": [...], "values": [...]} with a weight of 1 per
+                  distinct query term.
+        """
+        indices = sorted({self.get_term_index(token) for token in self.get_tokens(text)})
+        return {"indices": indices, "values": [1.0] * len(indices)}
@@ -0,0 +1,96 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+import logging
+import threading
+
+
+class RecyclingProcessPool(Executor):
+    """
+    Process pool whose workers can be replaced when a task times out.
+
+    A task abandoned by asyncio.wait_for keeps running in its worker
+    process, so every timeout would leave one worker less for the other
+    files. `recycle` sends the new tasks to new workers instead, and the
+    workers of the retired pool are terminated after `retire_timeout`
+    seconds: the tasks of the other files still running there by then
+    have outlived their own timeout too.
+
+    A recycle is requested with the generation seen when the timed-out
+    work started, so a burst of timeouts from the same pool recycles it
+    once, and at most about two pools run at the same time.
+    """
+
+    def __init__(self, max_workers: int, retire_timeout: float):
+        """
+        Args:
+            max_workers (int): Number of worker processes.
+            retire_timeout (float): Seconds the retired workers get to
+                                    finish their tasks before they are
+                                    terminated.
+        """
+        self.max_workers = max_workers
+        self.retire_timeout = retire_timeout
+        self.logger = logging.getLogger(__name__)
+
+        self.lock = threading.Lock()
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        self.generation = 0
+        # retired executor -> (its worker processes, timer terminating them)
+        self.retired = {}
+
+    def submit(self, fn, /, *args, **kwargs):
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def recycle(self, generation: int):
+        """
+        Replace the workers of pool `generation`, unless it was already
+        replaced.
+
+        Returns:
+            bool: True if the pool was recycled.
+        """
+        with self.lock:
+            if generation != self.generation:
+                return False
+
+            retired_executor = self.executor
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self.generation += 1
+
+            # shutdown drops the executor's references to its processes
+            workers = list((retired_executor._processes or {}).values())
+            timer = threading.Timer(self.retire_timeout, self.terminate,
+                                    args=(retired_executor, workers))
+            timer.daemon = True
+            self.retired[retired_executor] = (workers, timer)
+
+        # the tasks already submitted there still run, no new task is sent
+        retired_executor.shutdown(wait=False)
+        timer.start()
+
+        self.logger.warning(f"Process pool recycled after a timeout (generation {self.generation})")
+        return True
+
+    def terminate(self, executor: ProcessPoolExecutor, workers: list):
+        """
+        Stop the workers of a retired pool, ending the tasks they still
+        run: their futures fail with BrokenProcessPool.
+        """
+        with self.lock:
+            self.retired.pop(executor, None)
+
+        # ProcessPoolExecutor has no public way to stop running tasks
+        # before Python 3.14
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        with self.lock:
+            retired = list(self.retired.items())
+            self.retired.clear()
+
+        for executor, (workers, timer) in retired:
+            timer.cancel()
+            self.terminate(executor, workers)
+
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
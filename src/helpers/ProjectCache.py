@@ -0,0 +1,129 @@
+from collections import OrderedDict
+import asyncio
+import time
+
+# result of a load whose caller was cancelled, its waiters load the key again
+RELOAD = object()
+
+
+class ProjectCache:
+    """
+    In-process LRU cache of project_id -> Project with a time to live.
+
+    Concurrent loads of the same missing project are single-flighted: the
+    first caller loads it and the others await the same result, so they do
+    not race to create the project.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300):
+        """
+        Args:
+            max_entries (int): Max number of cached projects, the least
+                               recently used are evicted first.
+            ttl (float): Seconds a project stays cached.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        # project_id -> (project, expires_at), in least recently used order
+        self.entries = OrderedDict()
+        # project_id -> future of the load in progress
+        self.loading = {}
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value):
+        self.entries[key] = (value, time.monotonic() + self.ttl)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: str):
+        if self.entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+
+    async def get_or_load(self, key: str, loader):
+        """
+        Return the cached value of `key`, or load it with `await loader()`
+        and cache it (write-through). Only one load per key runs at a time.
+        """
+        while True:
+            # a key being loaded is not cached yet: wait for the running load
+            future = self.loading.get(key)
+            if future is None:
+                break
+
+            self.coalesced += 1
+            value = await asyncio.shield(future)
+            if value is not RELOAD:
+                return value
+            # the loading caller was cancelled, not this one: load it again
+
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        future = asyncio.get_running_loop().create_future()
+        self.loading[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            # the waiters are woken up to load the key themselves, the
+            # first of them becomes the loading caller
+            future.set_result(RELOAD)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # the waiters get the exception, do not log it as never retrieved
+            future.exception()
+            raise
+        else:
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self.loading.pop(key, None)
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -0,0 +1,399 @@
+from functools import lru_cache
+from itertools import accumulate, compress, repeat
+from operator import add, itemgetter
+import re
+
+
+@lru_cache(maxsize=None)
+def get_token_length_function(encoding_name: str):
+    """
+    Return a length function counting tiktoken tokens instead of characters.
+    """
+    try:
+        import tiktoken
+    except ImportError as e:
+        raise Exception("tiktoken is required for token based chunk lengths") from e
+
+    encoding = tiktoken.get_encoding(encoding_name)
+
+    def token_length(text: str):
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return token_length
+
+
+@lru_cache(maxsize=None)
+def get_separator_pattern(separator: str):
+    """
+    Return the compiled pattern of a literal separator: searching and
+    splitting with it is faster than str.find and str.split on texts
+    holding many partial matches (e.g. "\\n" lines for a "\\n\\n" separator).
+    """
+    return re.compile(re.escape(separator))
+
+
+class TextChunker:
+    """
+    Split text into chunks of at most `chunk_size` (measured with
+    `length_function`) overlapping by up to `overlap_size`.
+
+    With a single separator the chunks are the same as the ones of
+    langchain's CharacterTextSplitter with the same settings. With several
+    separators, a split that is still too long is split again with the
+    next separator, like RecursiveCharacterTextSplitter.
+
+    The text is split into (start, end) spans of the original text, the
+    length of each split is computed once, and every chunk carries the
+    character offsets of the text it covers. With the default settings (one
+    separator, character lengths) the chunks are merged straight from the
+    split sizes, see merge_text.
+    """
+
+    def __init__(self, chunk_size: int, overlap_size: int, separators: list = None,
+                 length_function=None, strip_whitespace: bool = True):
+        """
+        Args:
+            chunk_size (int): Maximum length of a chunk.
+            overlap_size (int): Maximum overlap between consecutive chunks.
+            separators (list, optional): Separators tried in order.
+                                         Default is ["\\n\\n"].
+            length_function (callable, optional): Length of a text.
+                                                  Default is len.
+            strip_whitespace (bool, optional): Strip the chunks.
+        """
+        self.chunk_size = chunk_size
+        self.overlap_size = overlap_size
+        self.separators = list(separators or ["\n\n"])
+        self.length_function = length_function or len
+        self.strip_whitespace = strip_whitespace
+
+        # tail of the last chunk, carried to the next page by iter_page_chunks
+        self.carry_text = ""
+
+    @classmethod
+    def from_options(cls, chunk_size: int, overlap_size: int, chunker_options: dict = None):
+        """
+        Build a chunker from picklable options:
+        {"separators": [...], "tokenizer": "<tiktoken encoding>" or None}
+        """
+        options = dict(chunker_options or {})
+        tokenizer = options.pop("tokenizer", None)
+        if tokenizer:
+            options["length_function"] = get_token_length_function(tokenizer)
+
+        return cls(chunk_size=chunk_size, overlap_size=overlap_size, **options)
+
+    def split_text(self, text: str):
+        return list(map(itemgetter(0), self.get_text_chunks(text)))
+
+    def get_text_chunks(self, text: str):
+        """
+        Returns:
+            list: (chunk_text, start_index, end_index) in `text`.
+        """
+        chunks = []
+        if text:
+            if len(self.separators) == 1 and self.length_function is len:
+                # the default settings: no separator to pick
+                self.merge_text(text, 0, len(text), self.separators[0], chunks)
+            else:
+                self.split_span_chunks(text, 0, len(text), self.separators, chunks)
+
+        return chunks
+
+    def iter_page_chunks(self, pages, carry_text: str = ""):
+        """
+        Chunk a stream of pages, carrying the overlap across page boundaries:
+        the tail of the last chunk of a page is prepended to the next page.
+
+        The chunk metadata is the page metadata plus the character offsets
+        of the chunk in the page text (start_index, end_index). After the
+        generator is exhausted, `self.carry_text` holds the carry for the
+        next pages.
+
+        Yields:
+            tuple: (chunk_text, chunk_metadata)
+        """
+        self.carry_text = carry_text
+
+        for page_text, page_metadata in pages:
+            if not page_text.strip():
+                continue
+
+            prefix_size = 0
+            if self.carry_text:
+                # joined with a single newline so the carry stays in the first split
+                page_text = self.carry_text + "\n" + page_text
+                prefix_size = len(self.carry_text) + 1
+
+            last_chunk_text = None
+            for chunk_text, start_index, end_index in self.get_text_chunks(page_text):
+                yield chunk_text, {
+                    **page_metadata,
+                    "start_index": max(0, start_index - prefix_size),
+                    "end_index": max(0, end_index - prefix_size),
+                }
+                last_chunk_text = chunk_text
+
+            if last_chunk_text is not None:
+                self.carry_text = self.get_overlap_text(last_chunk_text)
+
+    def get_overlap_text(self, text: str):
+        """
+        Return the tail of a chunk carried over to the next page, without
+        starting in the middle of a word.
+        """
+        if self.overlap_size <= 0 or not text:
+            return ""
+
+        tail = text[-self.overlap_size:]
+        if len(text) > self.overlap_size:
+            for index, char in enumerate(tail):
+                if char.isspace():
+                    tail = tail[index + 1:]
+                    break
+
+        return tail.strip()
+
+    def split_spans(self, text: str, start: int, end: int, separator: str):
+        """
+        Split text[start:end] on a literal separator, dropping empty splits.
+
+        The split, the offsets and the lengths are computed with builtins
+        (the separator pattern, map, accumulate, compress) rather than a
+        Python loop.
+
+        Returns:
+            tuple: (starts, sizes, lengths, contiguous) where starts/sizes
+                are the character offset and size of each split, lengths
+                their length_function values, and contiguous tells that
+                no empty split was dropped between two splits.
+        """
+        segment = text if start == 0 and end == len(text) else text[start:end]
+        if separator:
+            parts = get_separator_pattern(separator).split(segment)
+        else:
+            parts = list(segment)
+
+        sizes = list(map(len, parts))
+        starts = list(accumulate(map(add, sizes, repeat(len(separator))), initial=start))
+        starts.pop()
+
+        if 0 in sizes:
+            kept_indexes = list(compress(range(len(parts)), sizes))
+            contiguous = not kept_indexes or \
+                kept_indexes[-1] - kept_indexes[0] + 1 == len(kept_indexes)
+
+            parts = list(compress(parts, sizes))
+            starts = list(compress(starts, sizes))
+            sizes = list(compress(sizes, sizes))
+        else:
+            contiguous = True
+
+        if self.length_function is len:
+            lengths = sizes
+        else:
+            lengths = list(map(self.length_function, parts))
+
+        return starts, sizes, lengths, contiguous
+
+    def split_span_chunks(self, text: str, start: int, end: int, separators: list, chunks: list):
+        """
+        Chunk text[start:end] into `chunks`, splitting again with the next
+        separators the splits that are still longer than chunk_size.
+        """
+        separator = separators[-1]
+        next_separators = []
+        # the last separator is used whether it is found or not
+        for index, candidate in enumerate(separators[:-1]):
+            if candidate == "":
+                separator = candidate
+                break
+            if get_separator_pattern(candidate).search(text, start, end):
+                separator = candidate
+                next_separators = separators[index + 1:]
+                break
+
+        if not next_separators and self.length_function is len:
+            self.merge_text(text, start, end, separator, chunks)
+            return
+
+        splits = self.split_spans(text, start, end, separator)
+
+        if not next_separators:
+            self.merge_spans(text, splits, 0, len(splits[2]), separator, chunks)
+            return
+
+        starts, sizes, lengths, _ = splits
+
+        # runs of short splits are merged, longer splits are split again
+        first = 0
+        for index, split_length in enumerate(lengths):
+            if split_length < self.chunk_size:
+                continue
+
+            if index > first:
+                self.merge_spans(text, splits, first, index, separator, chunks)
+
+            self.split_span_chunks(text, starts[index], starts[index] + sizes[index],
+                                   next_separators, chunks)
+            first = index + 1
+
+        if len(lengths) > first:
+            self.merge_spans(text, splits, first, len(lengths), separator, chunks)
+
+    def merge_text(self, text: str, start: int, end: int, separator: str, chunks: list):
+        """
+        Chunk text[start:end] on a single separator with character lengths,
+        the default settings, without building the split spans first.
+
+        A text that holds no separator, or that fits in one chunk, needs
+        no merge and becomes a single chunk. Otherwise the offsets are
+        tracked while merging, since consecutive splits are one separator
+        apart. Texts with empty splits (repeated separators) go through
+        split_spans and merge_spans.
+        """
+        segment = text if start == 0 and end == len(text) else text[start:end]
+        parts = get_separator_pattern(separator).split(segment) if separator else list(segment)
+
+        if "" in parts:
+            splits = self.split_spans(text, start, end, separator)
+            self.merge_spans(text, splits, 0, len(splits[2]), separator, chunks)
+            return
+
+        if len(parts) == 1 or end - start <= self.chunk_size:
+            self.append_chunk(text, start, end, chunks)
+            return
+
+        sizes = list(map(len, parts))
+        chunk_size = self.chunk_size
+        separator_size = len(separator)
+        overlap_limit = self.overlap_size + separator_size
+
+        # (start, end) of each chunk. `window` is the size of the current
+        # chunk plus one separator (0 when empty), so adding a split is a
+        # single comparison; the splits are one separator apart, so the
+        # offsets follow from the sizes.
+        bounds = []
+        first = 0
+        first_start = start
+        split_start = start
+        window = 0
+
+        for split_size in sizes:
+            if window and window + split_size > chunk_size:
+                bounds.append((first_start, split_start - separator_size))
+
+                # keep up to overlap_size of the chunk for the next one
+                while window > overlap_limit or (window and window + split_size > chunk_size):
+                    dropped_size = sizes[first] + separator_size
+                    window -= dropped_size
+                    first_start += dropped_size
+                    first += 1
+
+            window += split_size + separator_size
+            split_start += split_size + separator_size
+
+        if window:
+            bounds.append((first_start, split_start - separator_size))
+
+        # append_chunk, inlined: this loop runs for every chunk of every page
+        strip_whitespace = self.strip_whitespace
+        for start_index, end_index in bounds:
+            chunk_text = text[start_index:end_index]
+
+            if strip_whitespace:
+                stripped_text = chunk_text.strip()
+                if stripped_text and len(stripped_text) != len(chunk_text):
+                    leading_size = chunk_text.find(stripped_text)
+                    start_index += leading_size
+                    end_index -= len(chunk_text) - leading_size - len(stripped_text)
+                chunk_text = stripped_text
+
+            if chunk_text:
+                # the splits are never empty, so end_index > start_index
+                chunks.append((chunk_text, start_index, end_index))
+
+    def append_chunk(self, text: str, start_index: int, end_index: int, chunks: list):
+        chunk_text = text[start_index:end_index]
+
+        if self.strip_whitespace:
+            stripped_text = chunk_text.strip()
+            if stripped_text and len(stripped_text) != len(chunk_text):
+                leading_size = chunk_text.find(stripped_text)
+                start_index += leading_size
+                end_index -= len(chunk_text) - leading_size - len(stripped_text)
+            chunk_text = stripped_text
+
+        if chunk_text:
+            chunks.append((chunk_text, start_index, max(start_index, end_index)))
+
+    def merge_spans(self, text: str, splits: tuple, low: int, high: int,
+                    separator: str, chunks: list):
+        """
+        Merge the consecutive splits low..high into chunks, keeping up to
+        `overlap_size` of the previous chunk at the start of the next one.
+
+        The splits of a chunk are always a window first..last of the splits,
+        so only the windows are collected here and joined at the end.
+        """
+        lengths = splits[2]
+        chunk_size = self.chunk_size
+        overlap_size = self.overlap_size
+        separator_length = self.length_function(separator)
+
+        windows = []
+        first = low
+        total = 0
+
+        for last in range(low, high):
+            split_length = lengths[last]
+
+            if total + split_length + (separator_length if last > first else 0) > chunk_size:
+                if last > first:
+                    windows.append((first, last))
+
+                    while total > overlap_size or (
+                        total + split_length + (separator_length if last > first else 0) > chunk_size
+                        and total > 0
+                    ):
+                        total -= lengths[first] + (separator_length if last - first > 1 else 0)
+                        first += 1
+
+            total += split_length + (separator_length if last > first else 0)
+
+        if high > first:
+            windows.append((first, high))
+
+        self.join_windows(text, splits, windows, separator, chunks)
+
+    def join_windows(self, text: str, splits: tuple, windows: list,
+                     separator: str, chunks: list):
+        starts, sizes, _, contiguous = splits
+        separator_size = len(separator)
+        strip_whitespace = self.strip_whitespace
+
+        for first, last in windows:
+            start_index = starts[first]
+            end_index = starts[last - 1] + sizes[last - 1]
+
+            if contiguous or all(starts[index + 1] - starts[index] - sizes[index] == separator_size
+                                 for index in range(first, last - 1)):
+                # the splits are separated by exactly one separator: one slice
+                chunk_text = text[start_index:end_index]
+            else:
+                chunk_text = separator.join(
+                    text[starts[index]:starts[index] + sizes[index]]
+                    for index in range(first, last)
+                )
+
+            if strip_whitespace:
+                stripped_text = chunk_text.strip()
+                if stripped_text and len(stripped_text) != len(chunk_text):
+                    leading_size = chunk_text.find(stripped_text)
+                    start_index += leading_size
+                    end_index -= len(chunk_text) - leading_size - len(stripped_text)
+                chunk_text = stripped_text
+
+            if chunk_text:
+                chunks.append((chunk_text, start_index, max(start_index, end_index)))
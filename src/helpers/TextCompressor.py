@@ -0,0 +1,72 @@
+from functools import lru_cache
+import zlib
+
+# codecs of stored texts ("" keeps the text as a plain string)
+TEXT_CODECS = ("", "zlib", "zstd")
+
+
+@lru_cache(maxsize=None)
+def get_zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise Exception("zstandard is required for zstd compressed chunk texts") from e
+
+    return zstandard.ZstdCompressor(level=3), zstandard.ZstdDecompressor()
+
+
+class TextCompressor:
+    """
+    Compress texts stored in the database.
+
+    Texts shorter than `min_size` bytes, or that do not get smaller, are
+    kept as plain strings, so they stay readable without any codec.
+    """
+
+    def __init__(self, codec: str = "", min_size: int = 512):
+        """
+        Args:
+            codec (str): One of TEXT_CODECS, "" disables compression.
+            min_size (int): Min UTF-8 size in bytes of a compressed text.
+        """
+        if codec not in TEXT_CODECS:
+            raise Exception(f"Unknown text codec: {codec}")
+
+        if codec == "zstd":
+            # fail at startup rather than on the first stored chunk
+            get_zstd()
+
+        self.codec = codec
+        self.min_size = min_size
+
+    def compress(self, text: str):
+        """
+        Returns:
+            tuple: (bytes, codec) of the compressed text, or (text, "")
+                   when it is stored uncompressed.
+        """
+        if not self.codec:
+            return text, ""
+
+        data = text.encode("utf-8")
+        if len(data) < self.min_size:
+            return text, ""
+
+        if self.codec == "zstd":
+            payload = get_zstd()[0].compress(data)
+        else:
+            payload = zlib.compress(data)
+
+        if len(payload) >= len(data):
+            return text, ""
+
+        return payload, self.codec
+
+    @staticmethod
+    def decompress(payload: bytes, codec: str):
+        if codec == "zstd":
+            return get_zstd()[1].decompress(payload).decode("utf-8")
+        if codec == "zlib":
+            return zlib.decompress(payload).decode("utf-8")
+
+        raise Exception(f"Unknown text codec: {codec}")
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from functools import lru_cache
 
 class Settings(BaseSettings):
     APP_NAME: str
@@ -9,10 +10,32 @@ class Settings(BaseSettings):
     FILE_ALLOWED_TYPES: list[str]
     FILE_MAX_SIZE: int
     FILE_DEFAULT_CHUNK_SIZE: int
+    UPLOAD_BATCH_MAX_FILES: int = 1000
+    UPLOAD_BATCH_CONCURRENCY: int = 8
+    UPLOAD_ARCHIVE_MAX_SIZE: int = 1024
+    UPLOAD_SESSION_TTL: int = 86400
+
+    # PROCESSING CONFIGURATION
+    PROCESS_POOL_WORKERS: int = 4
+    PROCESS_FILE_TIMEOUT: int = 600
+    PROCESS_PAGES_PER_WINDOW: int = 32
+    PROCESS_TEXT_BYTES_PER_WINDOW: int = 1048576
+    CHUNK_INSERT_BATCH_SIZE: int = 500
+    PROCESS_PDF_PARALLEL_MIN_PAGES: int = 200
+    PROCESS_PDF_PARALLEL_RANGES: int = 4
+    PROCESS_PAGE_CACHE_ENABLED: bool = True
+    PROCESS_CHUNK_SEPARATORS: list[str] = ["\n\n"]
+    PROCESS_CHUNK_TOKENIZER: str = ""
+    CHUNK_TEXT_COMPRESSION: str = ""
+    CHUNK_TEXT_COMPRESSION_MIN_SIZE: int = 512
 
     # mongodb configuration
     MONGODB_URL: str
     MONGODB_DATABASE: str
+
+    # project cache (PROJECT_CACHE_TTL=0 disables it)
+    PROJECT_CACHE_MAX_ENTRIES: int = 10000
+    PROJECT_CACHE_TTL: int = 300
     # MONGODB_COLLECTION: str
 
     # LLM CONFIGURATION
@@ -32,10 +55,32 @@ class Settings(BaseSettings):
     GENERATION_DEFAULT_MAX_TOKENS: int = None
     GENERATION_DEFAULT_TEMPREATURE: float = None
 
+    # ========== Embedding cache config ============
+    EMBEDDING_CACHE_DB_NAME: str = None
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 500000
+
     # ========== VectorDB config ============
     VECTOR_DB_BACKEND : str
-    VECTOR_DB_PATH : str
+    VECTOR_DB_PATH : str = ""
     VECTOR_DB_DISTANCE_METHOD : str = None
+    VECTOR_DB_URL : str = ""
+    VECTOR_DB_API_KEY : str = ""
+    VECTOR_DB_PREFER_GRPC : bool = True
+    VECTOR_DB_GRPC_PORT : int = 6334
+    VECTOR_DB_TIMEOUT : int = 30
+    VECTOR_DB_SEARCH_BATCH_MAX_QUERIES : int = 100
+    VECTOR_DB_HYBRID_SEARCH : bool = True
+    VECTOR_DB_HYBRID_PREFETCH_FACTOR : int = 4
+
+    # ========== Index pipeline config ============
+    INDEX_READ_BATCH_SIZE : int = 50
+    INDEX_QUEUE_SIZE : int = 4
+    INDEX_EMBEDDING_WORKERS : int = 4
+    INDEX_UPSERT_WORKERS : int = 1
+
+    # ========== Jobs config ============
+    JOB_WORKERS : int = 2
+    JOB_LEASE_TTL : int = 60
 
     # ========== Template config ============
     PRIMARY_LANG : str = None
@@ -46,6 +91,8 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
         extra = "ignore"
 
+# .env is read and validated once per process
+@lru_cache
 def get_settings() -> Settings:
     return Settings()
     
\ No newline at end of file
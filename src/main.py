@@ -1,10 +1,21 @@
 from fastapi import FastAPI 
-from routes import base,data,nlp
+from routes import base,data,nlp,jobs
 from motor.motor_asyncio import AsyncIOMotorClient
 from helpers.config import get_settings
 from stores.llm.LLMProviderFactory import LLMProviderFactory
 from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
 from stores.llm.templates.template_parser import TemplateParser
+from stores.llm.cache import EmbeddingCache, CachedLLMProvider
+from helpers.ProjectCache import ProjectCache
+from helpers.ProcessPool import RecyclingProcessPool
+from controllers.BaseController import BaseController
+from controllers.DataControllers import DataController
+from controllers.NLPController import NLPController
+from controllers.JobController import JobController
+from models.ProjectModel import ProjectModel
+from models.AssetModel import AssetModel
+from models.ChunkModel import ChunkModel
+from models.UploadSessionModel import UploadSessionModel
 
 app = FastAPI()
 
@@ -13,6 +24,21 @@ async def startup_span():
     app.mongodb_conn = AsyncIOMotorClient(settings.MONGODB_URL)
     app.db_client = app.mongodb_conn[settings.MONGODB_DATABASE]
 
+    # Project Cache
+    app.project_cache = None
+    if settings.PROJECT_CACHE_TTL > 0:
+        app.project_cache = ProjectCache(
+            max_entries=settings.PROJECT_CACHE_MAX_ENTRIES,
+            ttl=settings.PROJECT_CACHE_TTL,
+        )
+
+    # app-scoped models, their indexes are created once here
+    app.project_model = await ProjectModel.create_instance(db_client=app.db_client,
+                                                           project_cache=app.project_cache)
+    app.asset_model = await AssetModel.create_instance(db_client=app.db_client)
+    app.chunk_model = await ChunkModel.create_instance(db_client=app.db_client)
+    app.upload_session_model = await UploadSessionModel.create_instance(db_client=app.db_client)
+
     llm_provider_factory = LLMProviderFactory(settings)
     vectordb_provider_factory = VectorDBProviderFactory(settings)
 
@@ -24,16 +50,60 @@ async def startup_span():
     app.embedding_client.set_embedding_model(embedding_model_id=settings.EMBEDIDING_MODEL_ID,
                                             embedding_size=settings.EMBEDIDING_MODEL_SIZE)
 
+    # Embedding Cache
+    app.embedding_cache = None
+    if settings.EMBEDDING_CACHE_DB_NAME:
+        app.embedding_cache = EmbeddingCache(
+            db_path=BaseController().get_database_path(db_name=settings.EMBEDDING_CACHE_DB_NAME),
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+        )
+        app.embedding_client = CachedLLMProvider(
+            provider=app.embedding_client,
+            provider_name=settings.EMBEDDING_BACKEND,
+            cache=app.embedding_cache,
+        )
+
     app.vectordb_client= vectordb_provider_factory.create(
         provider=settings.VECTOR_DB_BACKEND
     )
-    app.vectordb_client.connect()
+    await app.vectordb_client.connect()
 
     app.template_parser = TemplateParser(language=settings.PRIMARY_LANG, default_language=settings.DEFAULT_LANG)
 
+    # CPU-bound file parsing and chunking. The workers are replaced when a
+    # file times out, since its abandoned tasks keep running in them
+    app.process_pool = RecyclingProcessPool(
+        max_workers=settings.PROCESS_POOL_WORKERS,
+        retire_timeout=settings.PROCESS_FILE_TIMEOUT,
+    )
+
+    # app-scoped controllers
+    app.data_controller = DataController()
+    app.nlp_controller = NLPController(
+        vectordb_client=app.vectordb_client,
+        generation_client=app.generation_client,
+        embedding_client=app.embedding_client,
+        template_parser=app.template_parser,
+    )
+
+    # Background jobs
+    app.job_controller = JobController(
+        db_client=app.db_client,
+        process_pool=app.process_pool,
+        nlp_controller=app.nlp_controller,
+        project_model=app.project_model,
+        asset_model=app.asset_model,
+        chunk_model=app.chunk_model,
+    )
+    await app.job_controller.start()
+
 async def shutdown_span():
+    await app.job_controller.stop()
+    app.process_pool.shutdown(cancel_futures=True)
     app.mongodb_conn.close()
-    app.vectordb_client.disconnect()
+    await app.vectordb_client.disconnect()
+    if app.embedding_cache:
+        app.embedding_cache.close()
 
 
 # app.router.lifespan.on_startup.append(startup_span)
@@ -45,5 +115,6 @@ app.on_event("shutdown")(shutdown_span)
 app.include_router(base.base_router)
 app.include_router(data.data_router)
 app.include_router(nlp.nlp_router)
+app.include_router(jobs.jobs_router)
 
 
@@ -0,0 +1,78 @@
+"""
+Rewrite the chunks stored before the compact chunk schema: the project_id
+string is dropped, the metadata shared by the chunks of an asset is moved
+to the chunks_metadata collection, and texts are compressed according to
+CHUNK_TEXT_COMPRESSION.
+
+Run from the src directory (uses MONGODB_URL from .env unless given):
+
+    python -m migrations.compact_chunks --batch-size 1000
+
+Only documents without chunk_metadata_id are rewritten, in _id order, so
+the migration can be stopped and run again at any time, also while the
+application is running.
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne
+from helpers.config import get_settings
+from models.ChunkModel import ChunkModel
+from models.db_schemas import DataChunk
+import argparse
+import asyncio
+import time
+
+
+async def compact_chunks(chunk_model: ChunkModel, batch_size: int, dry_run: bool = False):
+    collection = chunk_model.collection
+    migrated_chunks = 0
+    last_id = None
+
+    while True:
+        query = {"chunk_metadata_id": {"$exists": False}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        records = await collection.find(query).sort("_id", 1).limit(batch_size).to_list(length=None)
+        if not records:
+            break
+
+        last_id = records[-1]["_id"]
+        chunks = [DataChunk(**record) for record in records]
+        documents, metadata_documents = chunk_model.to_documents(chunks)
+
+        if not dry_run:
+            await chunk_model.insert_chunks_metadata(metadata_documents)
+            await collection.bulk_write([
+                ReplaceOne({"_id": document["_id"]}, document)
+                for document in documents
+            ], ordered=False)
+
+        migrated_chunks += len(documents)
+        print(f"{migrated_chunks} chunks {'to migrate' if dry_run else 'migrated'}")
+
+    return migrated_chunks
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mongodb-url", default=None)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="count the chunks to migrate without writing them")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    client = AsyncIOMotorClient(args.mongodb_url or settings.MONGODB_URL)
+    try:
+        chunk_model = await ChunkModel.create_instance(db_client=client[settings.MONGODB_DATABASE])
+
+        started_at = time.perf_counter()
+        migrated_chunks = await compact_chunks(chunk_model, batch_size=args.batch_size,
+                                               dry_run=args.dry_run)
+        print(f"done: {migrated_chunks} chunks in {time.perf_counter() - started_at:.1f} s")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
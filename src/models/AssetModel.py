@@ -1,6 +1,7 @@
 from .BaseDataModel import BaseDataModel
-from .db_schemas import Asset
+from .db_schemas import Asset,AssetRecord
 from .enums.DataBaseEnum import DataBaseEnum
+from bson.objectid import ObjectId
 import pymongo
 
 
@@ -16,40 +17,117 @@ class AssetModel(BaseDataModel):
         return instance
         
     async def init_collection(self):
-        all_collection = await self.db_client.list_collection_names()
-        if DataBaseEnum.COLLECTION_ASSET_NAME.value not in all_collection:
-            self.collection = self.db_client[DataBaseEnum.COLLECTION_ASSET_NAME.value]
-            indexes = Asset.get_indexes()
-            for index in indexes:
-                # keys are already tuples: [("field", direction)]
-                await self.collection.create_index(
-                    index["keys"],
-                    name=index["name"],
-                    unique=index["unique"]
-                )
+        await self.init_indexes(
+            collection_name=DataBaseEnum.COLLECTION_ASSET_NAME.value,
+            indexes=Asset.get_indexes(),
+        )
 
     async def create_asset(self,asset:Asset):
         result = await self.collection.insert_one(asset.dict(by_alias=True,exclude_none=True))
         asset.id = result.inserted_id
         return asset
 
-    async def get_all_projects(self,asset_project_id:str,asset_type:str):
+    async def create_assets(self,assets:list):
+        """
+        Inserts several assets with a single bulk insert.
+        """
+        if not assets:
+            return assets
+
+        result = await self.collection.insert_many([
+            asset.dict(by_alias=True,exclude_none=True)
+            for asset in assets
+        ])
+        for asset,inserted_id in zip(assets,result.inserted_ids):
+            asset.id = inserted_id
+
+        return assets
+
+    def to_assets(self,records:list,lean:bool=False):
+        """
+        Build Asset models, or AssetRecord views without validation when
+        `lean` is set.
+        """
+        if lean:
+            return [AssetRecord(record) for record in records]
+        return [Asset(**record) for record in records]
+
+    async def get_all_projects(self,asset_project_id:str,asset_type:str,lean:bool=False):
         records=  await self.collection.find({
                 "asset_project_id":ObjectId(asset_project_id) if isinstance(asset_project_id,str) else asset_project_id,
                 "asset_type":asset_type,
             }).to_list(length=None)
 
-        return [
-            Asset(**record) for record in records
-        ]
+        return self.to_assets(records,lean=lean)
+
+
+    async def iter_project_assets(self,asset_project_id:str,asset_type:str,batch_size:int=100,
+                                  projection:dict=None,lean:bool=False):
+        """
+        Streams the assets of a project in batches, using keyset pagination on _id.
+
+        If a projection is given, only those fields are fetched and the
+        partial records are returned as AssetRecord views, like with `lean`.
+        """
+        asset_project_id = ObjectId(asset_project_id) if isinstance(asset_project_id,str) else asset_project_id
+
+        last_id = None
+        while True:
+            query = {
+                "asset_project_id":asset_project_id,
+                "asset_type":asset_type,
+            }
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+
+            records = await self.collection.find(query,projection=projection).sort(
+                "_id", pymongo.ASCENDING
+            ).limit(batch_size).to_list(length=None)
+
+            if not records:
+                break
+
+            last_id = records[-1]["_id"]
+            yield self.to_assets(records,lean=lean or projection is not None)
+
+            if len(records) < batch_size:
+                break
+
+    async def update_asset_hash(self,asset_id:ObjectId,asset_hash:str):
+        await self.collection.update_one(
+            {"_id":asset_id},
+            {"$set":{"asset_hash":asset_hash}}
+        )
+
+    async def update_asset_config(self,asset_id:ObjectId,asset_config:dict):
+        await self.collection.update_one(
+            {"_id":asset_id},
+            {"$set":{"asset_config":asset_config}}
+        )
+
+    async def get_processed_asset(self,asset_config:dict,exclude_asset_id:ObjectId=None,lean:bool=False):
+        """
+        Returns an asset of any project whose chunks were stored with the
+        same processing fingerprint (same content and settings), or None.
+        """
+        query = {
+            f"asset_config.{key}":value
+            for key,value in asset_config.items()
+        }
+        if exclude_asset_id is not None:
+            query["_id"] = {"$ne":exclude_asset_id}
+
+        record = await self.collection.find_one(query)
+        if record:
+            return self.to_assets([record],lean=lean)[0]
+        return None
 
-    
-    async def get_asset_record(self,asset_project_id:str,asset_name:str):
+    async def get_asset_record(self,asset_project_id:str,asset_name:str,lean:bool=False):
         record = await self.collection.find_one({
             "asset_project_id":ObjectId(asset_project_id) if isinstance(asset_project_id,str) else asset_project_id,
             "asset_name":asset_name,
         })
         
         if record:
-            return Asset(**record)
+            return self.to_assets([record],lean=lean)[0]
         return None
\ No newline at end of file
@@ -1,7 +1,48 @@
 from helpers.config import get_settings,Settings
+from pymongo.errors import OperationFailure
+import logging
+
+logger = logging.getLogger(__name__)
 
 class BaseDataModel:
+    # (database, collection) pairs whose indexes were already created by
+    # this process, so later instances skip the bootstrap
+    initialized_collections = set()
+
     def __init__(self,db_client:object):
         self.app_settings = get_settings()
         self.db_client = db_client
 
+    async def init_indexes(self,collection_name:str,indexes:list,dropped_indexes:list=None):
+        """
+        Create the indexes of a collection once per process.
+
+        create_index is idempotent, so the indexes are created on existing
+        collections too (indexes added after the collection was created).
+        `dropped_indexes` are names of replaced indexes removed first.
+        """
+        key = (self.db_client.name,collection_name)
+        if key in BaseDataModel.initialized_collections:
+            return
+
+        collection = self.db_client[collection_name]
+        for index_name in dropped_indexes or []:
+            try:
+                await collection.drop_index(index_name)
+            except OperationFailure:
+                # already dropped, or never created
+                pass
+
+        for index in indexes:
+            try:
+                # keys are already tuples: [("field", direction)]
+                await collection.create_index(
+                    index["keys"],
+                    name=index["name"],
+                    unique=index["unique"]
+                )
+            except OperationFailure as e:
+                # an existing index with the same name but other options
+                logger.warning(f"Index {index['name']} of {collection_name} not created: {e}")
+
+        BaseDataModel.initialized_collections.add(key)
@@ -1,16 +1,33 @@
 from .BaseDataModel import BaseDataModel
-from .db_schemas import DataChunk
+from .db_schemas import DataChunk,ChunkMetadata,ChunkRecord
 from .enums.DataBaseEnum import DataBaseEnum
-from pymongo import InsertOne
+from helpers.TextCompressor import TextCompressor
 from bson.objectid import ObjectId
 import pymongo
-from pymongo import UpdateOne
+from pymongo import UpdateOne, ReplaceOne
+import hashlib
+import json
+
+# chunk_metadata keys kept on each chunk, the other keys are shared by the
+# chunks of the asset and stored once in the chunks_metadata collection
+CHUNK_OWN_METADATA_KEYS = ("page", "start_index", "end_index")
 
 
 class ChunkModel(BaseDataModel):
+    # metadata_id -> shared metadata, see get_chunks_metadata
+    metadata_cache = {}
+    metadata_cache_max_entries = 100000
+
     def __init__(self,db_client):
         super().__init__(db_client=db_client)
         self.collection = self.db_client[DataBaseEnum.COLLECTION_CHUNK_NAME.value]
+        self.metadata_collection = self.db_client[DataBaseEnum.COLLECTION_CHUNK_METADATA_NAME.value]
+        # asset fingerprints describe the stored chunks, see clear_asset_configs
+        self.asset_collection = self.db_client[DataBaseEnum.COLLECTION_ASSET_NAME.value]
+        self.text_compressor = TextCompressor(
+            codec=self.app_settings.CHUNK_TEXT_COMPRESSION,
+            min_size=self.app_settings.CHUNK_TEXT_COMPRESSION_MIN_SIZE,
+        )
 
     @classmethod
     async def create_instance(cls,db_client:object):
@@ -19,68 +36,387 @@ class ChunkModel(BaseDataModel):
         return instance
         
     async def init_collection(self):
-        all_collection = await self.db_client.list_collection_names()
-        if DataBaseEnum.COLLECTION_CHUNK_NAME.value not in all_collection:
-            self.collection = self.db_client[DataBaseEnum.COLLECTION_CHUNK_NAME.value]
-            indexes = DataChunk.get_indexes()
-            for index in indexes:
-                # keys are already tuples: [("field", direction)]
-                await self.collection.create_index(
-                    index["keys"],
-                    name=index["name"],
-                    unique=index["unique"]
-                )
+        await self.init_indexes(
+            collection_name=DataBaseEnum.COLLECTION_CHUNK_NAME.value,
+            indexes=DataChunk.get_indexes(),
+            dropped_indexes=DataChunk.get_dropped_indexes(),
+        )
+        await self.init_indexes(
+            collection_name=DataBaseEnum.COLLECTION_CHUNK_METADATA_NAME.value,
+            indexes=ChunkMetadata.get_indexes(),
+        )
 
 
     async def create_chunk(self,chunk:DataChunk):
-        result = await self.collection.insert_one(chunk.dict(by_alias=True,exclude_none=True))
-        chunk.id = result.inserted_id
+        await self.insert_many_chunks(chunks=[chunk])
         return chunk
 
     async def get_chunk(self, chunk_id: str):
         record = await self.collection.find_one({
-            "id": ObjectId(chunk_id)
-            #"_id": ObjectId(chunk_id)
-
+            "_id": ObjectId(chunk_id)
         })
         if record is None:
             return None
 
+        await self.hydrate_records([record])
         return DataChunk(**record)
 
+    def get_metadata_id(self, asset_id: ObjectId, shared_metadata: dict):
+        content = json.dumps(shared_metadata, sort_keys=True, default=str)
+        return hashlib.blake2b(asset_id.binary + content.encode("utf-8"), digest_size=12).hexdigest()
 
-    async def insert_many_chunks(self, chunks: list[DataChunk], batch_size: int = 100):
+    def to_documents(self, chunks: list[DataChunk]):
         """
-        Inserts multiple chunks in batches.
-        Uses upsert to avoid duplicate key errors on (chunk_project_id, chunk_order)
+        Build the compact documents stored for the chunks.
+
+        The metadata shared by the chunks of an asset is moved to
+        ChunkMetadata documents referenced by chunk_metadata_id; only the
+        per-chunk keys (CHUNK_OWN_METADATA_KEYS) stay in chunk_metadata.
+        Long texts are compressed into chunk_text_z when
+        CHUNK_TEXT_COMPRESSION is set.
+
+        Returns:
+            tuple: (chunk documents, {metadata_id: ChunkMetadata document})
+        """
+        documents = []
+        metadata_documents = {}
+
+        for chunk in chunks:
+            shared_metadata = {}
+            own_metadata = {}
+            for key, value in chunk.chunk_metadata.items():
+                if key in CHUNK_OWN_METADATA_KEYS:
+                    own_metadata[key] = value
+                else:
+                    shared_metadata[key] = value
+
+            metadata_id = self.get_metadata_id(chunk.chunk_asset_id, shared_metadata)
+            if metadata_id not in metadata_documents:
+                metadata_documents[metadata_id] = ChunkMetadata(
+                    _id=metadata_id,
+                    metadata_project_id=chunk.chunk_project_id,
+                    metadata_asset_id=chunk.chunk_asset_id,
+                    metadata=shared_metadata,
+                ).dict(exclude={"id"})
+
+            document = {
+                "chunk_project_id": chunk.chunk_project_id,
+                "chunk_asset_id": chunk.chunk_asset_id,
+                "chunk_order": chunk.chunk_order,
+                "chunk_metadata_id": metadata_id,
+                "chunk_indexed": chunk.chunk_indexed,
+            }
+            if chunk.id is not None:
+                document["_id"] = chunk.id
+            if own_metadata:
+                document["chunk_metadata"] = own_metadata
+
+            text, codec = self.text_compressor.compress(chunk.chunk_text)
+            if codec:
+                document["chunk_text_z"] = text
+                document["chunk_codec"] = codec
+            else:
+                document["chunk_text"] = text
+
+            documents.append(document)
+
+        return documents, metadata_documents
+
+    async def insert_chunks_metadata(self, metadata_documents: dict):
+        """
+        Store the ChunkMetadata documents that are not stored yet.
+        """
+        if not metadata_documents:
+            return
+
+        # same id, same content: existing documents are left as they are.
+        # the _id comes from the upsert filter
+        await self.metadata_collection.bulk_write([
+            UpdateOne({"_id": metadata_id}, {"$setOnInsert": document}, upsert=True)
+            for metadata_id, document in metadata_documents.items()
+        ], ordered=False)
+
+    async def insert_many_chunks(self, chunks: list[DataChunk], batch_size: int = 1000):
+        """
+        Inserts multiple chunks in batches with plain unordered inserts.
+
+        The chunks of the asset must have been deleted first: a chunk
+        already stored at the same (project, asset, order) is a duplicate
+        key error. Use upsert_chunks to update stored chunks in place.
         """
         for i in range(0, len(chunks), batch_size):
             batch = chunks[i:i + batch_size]
 
+            if batch:
+                documents, metadata_documents = self.to_documents(batch)
+                # the metadata is stored first so no stored chunk references
+                # a missing metadata document
+                await self.insert_chunks_metadata(metadata_documents)
+                result = await self.collection.insert_many(documents, ordered=False)
+
+                for chunk, chunk_id in zip(batch, result.inserted_ids):
+                    chunk.id = chunk_id
+
+        return len(chunks)
+
+    async def upsert_chunks(self, chunks: list[DataChunk], batch_size: int = 100):
+        """
+        Inserts or replaces chunks keyed on (chunk_project_id, chunk_asset_id,
+        chunk_order), for partial updates of an asset's stored chunks.
+        """
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i:i + batch_size]
+
+            documents, metadata_documents = self.to_documents(batch)
             operations = [
-                UpdateOne(
-                    {"chunk_project_id": chunk.chunk_project_id, "chunk_order": chunk.chunk_order},
-                    {"$set": chunk.dict(by_alias=True, exclude_none=True)},
+                ReplaceOne(
+                    {
+                        "chunk_project_id": document["chunk_project_id"],
+                        "chunk_asset_id": document["chunk_asset_id"],
+                        "chunk_order": document["chunk_order"],
+                    },
+                    document,
                     upsert=True
                 )
-                for chunk in batch
+                for document in documents
             ]
 
             if operations:
-                await self.collection.bulk_write(operations)
+                await self.insert_chunks_metadata(metadata_documents)
+                await self.collection.bulk_write(operations, ordered=False)
 
         return len(chunks)
 
 
+    async def clear_asset_configs(self, query: dict):
+        """
+        Unset the processing fingerprint of the matching assets.
+
+        Called before their chunks are deleted, so an asset whose chunks
+        are gone (failed, timed out or interrupted run, reset) is never
+        skipped as unchanged by the next processing.
+        """
+        await self.asset_collection.update_many(
+            {**query, "asset_config": {"$ne": None}},
+            {"$unset": {"asset_config": ""}},
+        )
+
     async def delete_chunks_by_project_id(self, project_id: ObjectId):
+        await self.clear_asset_configs({"asset_project_id": project_id})
         result = await self.collection.delete_many({
             "chunk_project_id": project_id
         })
+        await self.metadata_collection.delete_many({
+            "metadata_project_id": project_id
+        })
         return result.deleted_count
 
-    async def get_project_chunks(self,project_id:ObjectId,page_no:int=1,page_size:int=50):
+    async def delete_chunks_by_asset_id(self, asset_id: ObjectId):
+        await self.clear_asset_configs({"_id": asset_id})
+        result = await self.collection.delete_many({
+            "chunk_asset_id": asset_id
+        })
+        await self.metadata_collection.delete_many({
+            "metadata_asset_id": asset_id
+        })
+        return result.deleted_count
+
+    async def mark_chunks_indexed(self, chunk_ids: list):
+        result = await self.collection.update_many(
+            {"_id": {"$in": chunk_ids}},
+            {"$set": {"chunk_indexed": True}},
+        )
+        return result.modified_count
+
+    async def reset_chunks_indexed(self, project_id: ObjectId):
+        """
+        Mark every chunk of a project as not indexed, e.g. after its vector
+        db collection was dropped.
+        """
+        result = await self.collection.update_many(
+            {"chunk_project_id": project_id, "chunk_indexed": True},
+            {"$set": {"chunk_indexed": False}},
+        )
+        return result.modified_count
+
+    async def get_project_asset_ids(self, project_id: ObjectId, unindexed_only: bool = False):
+        """
+        Returns the ids of the assets that have chunks in the project, or
+        chunks not indexed yet with `unindexed_only`.
+        """
+        query = {"chunk_project_id": project_id}
+        if unindexed_only:
+            query["chunk_indexed"] = {"$ne": True}
+
+        return await self.collection.distinct("chunk_asset_id", query)
+
+    async def get_asset_chunk_ids(self, asset_id: ObjectId):
+        return [
+            chunk.id
+            async for chunks in self.iter_asset_chunks(asset_id=asset_id, batch_size=5000,
+                                                       projection={"_id": 1})
+            for chunk in chunks
+        ]
+
+    async def get_chunks_metadata(self, metadata_ids: set):
+        """
+        Returns {metadata_id: metadata} of the given ids, read through a
+        process wide cache: the ids are content hashes, so a cached
+        metadata never goes stale.
+        """
+        cache = ChunkModel.metadata_cache
+        missing_ids = [metadata_id for metadata_id in metadata_ids if metadata_id not in cache]
+
+        if missing_ids:
+            if len(cache) + len(missing_ids) > self.metadata_cache_max_entries:
+                cache.clear()
+
+            async for record in self.metadata_collection.find({"_id": {"$in": missing_ids}}):
+                cache[record["_id"]] = record["metadata"]
+
+        return {metadata_id: cache.get(metadata_id) for metadata_id in metadata_ids}
+
+    async def hydrate_records(self, records: list):
+        """
+        Turn compact chunk documents back into the DataChunk fields, in
+        place: the shared metadata is merged into chunk_metadata and
+        compressed texts are decompressed. Documents stored before the
+        compact schema are left as they are.
+        """
+        metadata_ids = {rec["chunk_metadata_id"] for rec in records if "chunk_metadata_id" in rec}
+        chunks_metadata = await self.get_chunks_metadata(metadata_ids) if metadata_ids else {}
+
+        for rec in records:
+            metadata_id = rec.pop("chunk_metadata_id", None)
+            if metadata_id is not None:
+                rec["chunk_metadata"] = {
+                    **(chunks_metadata.get(metadata_id) or {}),
+                    **rec.get("chunk_metadata", {}),
+                }
+
+            if "chunk_text_z" in rec:
+                rec["chunk_text"] = TextCompressor.decompress(rec.pop("chunk_text_z"),
+                                                              rec.pop("chunk_codec"))
+
+        return records
+
+    def get_stored_projection(self, projection: dict):
+        """
+        Map a projection on the DataChunk fields to the stored fields.
+        """
+        if projection is None:
+            return None
+
+        projection = dict(projection)
+        if projection.get("chunk_text"):
+            projection.update({"chunk_text_z": 1, "chunk_codec": 1})
+        if projection.get("chunk_metadata"):
+            projection["chunk_metadata_id"] = 1
+        return projection
+
+    def to_chunks(self, records: list, lean: bool = False):
+        """
+        Build DataChunk models, or ChunkRecord views without validation
+        when `lean` is set.
+        """
+        if lean:
+            return [ChunkRecord(rec) for rec in records]
+        return [DataChunk(**rec) for rec in records]
+
+    async def get_project_chunks(self,project_id:ObjectId,page_no:int=1,page_size:int=50,
+                                 projection:dict=None,lean:bool=False):
+        """
+        If a projection is given, only those fields are fetched and the
+        partial records are returned as ChunkRecord views, like with `lean`.
+        """
         records = await self.collection.find({
             "chunk_project_id": project_id
-        }).skip((page_no - 1) * page_size).limit(page_size).to_list(length=None)
+        }, projection=self.get_stored_projection(projection)).skip((page_no - 1) * page_size).limit(page_size).to_list(length=None)
+
+        await self.hydrate_records(records)
+        return self.to_chunks(records, lean=lean or projection is not None)
+
+    async def iter_asset_chunks(self, asset_id: ObjectId, batch_size: int = 500,
+                                projection: dict = None, lean: bool = False):
+        """
+        Streams the chunks of one asset in batches ordered by chunk_order,
+        using keyset pagination on the (chunk_asset_id, chunk_order) index.
+
+        If a projection is given, only those fields are fetched and the
+        partial records are returned as ChunkRecord views, like with `lean`.
+        """
+        if projection is not None:
+            # the keyset field is always needed to fetch the next batch
+            projection = self.get_stored_projection({**projection, "chunk_order": 1})
+
+        last_chunk_order = 0
+        while True:
+            records = await self.collection.find(
+                {
+                    "chunk_asset_id": asset_id,
+                    "chunk_order": {"$gt": last_chunk_order},
+                },
+                projection=projection,
+            ).sort("chunk_order", pymongo.ASCENDING).limit(batch_size).to_list(length=None)
+
+            if not records:
+                break
+
+            last_chunk_order = records[-1]["chunk_order"]
+            await self.hydrate_records(records)
+            yield self.to_chunks(records, lean=lean or projection is not None)
+
+            if len(records) < batch_size:
+                break
+
+    async def iter_project_chunks(self, project_id: ObjectId, batch_size: int = 50,
+                                  projection: dict = None, after_asset_id: ObjectId = None,
+                                  after_chunk_order: int = 0, lean: bool = False,
+                                  unindexed_only: bool = False):
+        """
+        Streams the chunks of a project in batches ordered by
+        (chunk_asset_id, chunk_order).
+
+        Uses keyset pagination on the (chunk_project_id, chunk_asset_id,
+        chunk_order) index: every batch continues after the last chunk seen,
+        so each read is a bounded index range scan instead of a skip over
+        all previous pages.
+
+        If a projection is given, only those fields are fetched and the
+        partial records are returned as ChunkRecord views, like with `lean`.
+        `after_asset_id` and `after_chunk_order` resume the stream after a
+        known position. `unindexed_only` skips the chunks already in the
+        vector db.
+        """
+        if projection is not None:
+            # the keyset fields are always needed to fetch the next batch
+            projection = self.get_stored_projection({**projection, "chunk_asset_id": 1, "chunk_order": 1})
+
+        last_asset_id = after_asset_id
+        last_chunk_order = after_chunk_order
+        while True:
+            query = {"chunk_project_id": project_id}
+            if unindexed_only:
+                query["chunk_indexed"] = {"$ne": True}
+            if last_asset_id is not None:
+                query["$or"] = [
+                    {"chunk_asset_id": last_asset_id, "chunk_order": {"$gt": last_chunk_order}},
+                    {"chunk_asset_id": {"$gt": last_asset_id}},
+                ]
+
+            records = await self.collection.find(query, projection=projection).sort([
+                ("chunk_asset_id", pymongo.ASCENDING),
+                ("chunk_order", pymongo.ASCENDING),
+            ]).limit(batch_size).to_list(length=None)
+
+            if not records:
+                break
+
+            last_asset_id = records[-1]["chunk_asset_id"]
+            last_chunk_order = records[-1]["chunk_order"]
+
+            await self.hydrate_records(records)
+            yield self.to_chunks(records, lean=lean or projection is not None)
 
-        return [DataChunk(**rec) for rec in records]
\ No newline at end of file
+            if len(records) < batch_size:
+                break
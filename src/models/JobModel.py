@@ -0,0 +1,185 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemas import Job
+from .enums.DataBaseEnum import DataBaseEnum
+from .enums.JobStatusEnum import JobStatusEnum
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from datetime import datetime, timedelta
+import pymongo
+
+
+class JobModel(BaseDataModel):
+    def __init__(self,db_client:object):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DataBaseEnum.COLLECTION_JOB_NAME.value]
+
+    @classmethod
+    async def create_instance(cls,db_client:object):
+        instance = cls(db_client)
+        await instance.init_collection()
+        return instance
+
+    async def init_collection(self):
+        await self.init_indexes(
+            collection_name=DataBaseEnum.COLLECTION_JOB_NAME.value,
+            indexes=Job.get_indexes(),
+        )
+
+    def to_object_id(self,job_id):
+        if isinstance(job_id,ObjectId):
+            return job_id
+        try:
+            return ObjectId(job_id)
+        except (InvalidId,TypeError):
+            return None
+
+    async def create_job(self,job:Job):
+        result = await self.collection.insert_one(job.dict(by_alias=True,exclude_none=True))
+        job.id = result.inserted_id
+        return job
+
+    async def get_job(self,job_id:str):
+        job_id = self.to_object_id(job_id)
+        if job_id is None:
+            return None
+
+        record = await self.collection.find_one({"_id":job_id})
+        if record is None:
+            return None
+
+        return Job(**record)
+
+    async def claim_job(self,job_id:ObjectId,owner_id:str,lease_ttl:int):
+        """
+        Atomically moves a pending job to running, owned by `owner_id` for
+        `lease_ttl` seconds unless the lease is renewed.
+        Returns None if the job was already claimed or cancelled.
+        """
+        now = datetime.utcnow()
+        record = await self.collection.find_one_and_update(
+            {"_id":job_id, "job_status":JobStatusEnum.PENDING.value},
+            {"$set":{
+                "job_status":JobStatusEnum.RUNNING.value,
+                "job_owner":owner_id,
+                "job_lease_expires_at":now + timedelta(seconds=lease_ttl),
+                "job_updated_at":now,
+            }},
+            return_document=ReturnDocument.AFTER,
+        )
+        if record is None:
+            return None
+
+        return Job(**record)
+
+    async def update_job(self,job_id:ObjectId,fields:dict):
+        await self.collection.update_one(
+            {"_id":job_id},
+            {"$set":{**fields,"job_updated_at":datetime.utcnow()}}
+        )
+
+    async def renew_job_leases(self,job_ids:list,owner_id:str,lease_ttl:int):
+        """
+        Extends the lease of the running jobs still owned by `owner_id`.
+
+        Returns:
+            list: Ids of the jobs still owned, the others were cancelled or
+                  taken over after their lease expired.
+        """
+        if not job_ids:
+            return []
+
+        query = {"_id":{"$in":job_ids},
+                 "job_status":JobStatusEnum.RUNNING.value,
+                 "job_owner":owner_id}
+
+        await self.collection.update_many(
+            query,
+            {"$set":{"job_lease_expires_at":datetime.utcnow() + timedelta(seconds=lease_ttl)}}
+        )
+
+        records = await self.collection.find(query, projection={"_id":1}).to_list(length=None)
+        return [record["_id"] for record in records]
+
+    async def finish_job(self,job_id:ObjectId,job_status:str,job_error:str=None,owner_id:str=None):
+        """
+        Sets the final status of a running job.
+        A job cancelled in the meantime keeps its cancelled status, and a job
+        taken over by another owner is left to it.
+        """
+        query = {"_id":job_id, "job_status":JobStatusEnum.RUNNING.value}
+        if owner_id is not None:
+            query["job_owner"] = owner_id
+
+        await self.collection.update_one(
+            query,
+            {"$set":{
+                "job_status":job_status,
+                "job_error":job_error,
+                "job_updated_at":datetime.utcnow(),
+            }}
+        )
+
+    async def cancel_job(self,job_id:str):
+        job_id = self.to_object_id(job_id)
+        if job_id is None:
+            return None
+
+        record = await self.collection.find_one_and_update(
+            {"_id":job_id, "job_status":{"$in":[
+                JobStatusEnum.PENDING.value,
+                JobStatusEnum.RUNNING.value,
+            ]}},
+            {"$set":{
+                "job_status":JobStatusEnum.CANCELLED.value,
+                "job_updated_at":datetime.utcnow(),
+            }},
+            return_document=ReturnDocument.AFTER,
+        )
+        if record is None:
+            return None
+
+        return Job(**record)
+
+    async def get_pending_jobs(self):
+        records = await self.collection.find({
+            "job_status":JobStatusEnum.PENDING.value,
+        }).sort("job_created_at",pymongo.ASCENDING).to_list(length=None)
+
+        return [Job(**record) for record in records]
+
+    async def requeue_running_jobs(self,owner_id:str=None):
+        """
+        Moves back to pending the running jobs whose owner stopped: the ones
+        whose lease expired (or that have none), and the ones of `owner_id`
+        when given (a restarted process with the same owner id). Jobs of
+        live workers keep running.
+
+        Returns:
+            list: Ids of the requeued jobs.
+        """
+        requeued_ids = []
+        while True:
+            now = datetime.utcnow()
+            stopped_owner_conditions = [
+                {"job_lease_expires_at":None},
+                {"job_lease_expires_at":{"$lt":now}},
+            ]
+            if owner_id is not None:
+                stopped_owner_conditions.append({"job_owner":owner_id})
+
+            # one job at a time, so each requeued job is queued by one caller
+            record = await self.collection.find_one_and_update(
+                {"job_status":JobStatusEnum.RUNNING.value, "$or":stopped_owner_conditions},
+                {"$set":{
+                    "job_status":JobStatusEnum.PENDING.value,
+                    "job_owner":None,
+                    "job_lease_expires_at":None,
+                    "job_updated_at":now,
+                }},
+                return_document=ReturnDocument.AFTER,
+            )
+            if record is None:
+                return requeued_ids
+
+            requeued_ids.append(record["_id"])
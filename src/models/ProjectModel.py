@@ -1,32 +1,28 @@
 from .BaseDataModel import BaseDataModel
-from .db_schemas import Project
+from .db_schemas import Project,ProjectRecord
 from .enums.DataBaseEnum import DataBaseEnum
+from helpers.ProjectCache import ProjectCache
+from pymongo import ReturnDocument
 import pymongo
 
 
 class ProjectModel(BaseDataModel):
-    def __init__(self,db_client:object):
+    def __init__(self,db_client:object,project_cache:ProjectCache=None):
         super().__init__(db_client=db_client)
         self.collection = self.db_client[DataBaseEnum.COLLECTION_PROJECT_NAME.value]
+        self.project_cache = project_cache
 
     @classmethod
-    async def create_instance(cls,db_client:object):
-        instance = cls(db_client)
+    async def create_instance(cls,db_client:object,project_cache:ProjectCache=None):
+        instance = cls(db_client,project_cache=project_cache)
         await instance.init_collection()
         return instance
         
     async def init_collection(self):
-        all_collection = await self.db_client.list_collection_names()
-        if DataBaseEnum.COLLECTION_PROJECT_NAME.value not in all_collection:
-            self.collection = self.db_client[DataBaseEnum.COLLECTION_PROJECT_NAME.value]
-            indexes = Project.get_indexes()
-            for index in indexes:
-                # keys are already tuples: [("field", direction)]
-                await self.collection.create_index(
-                    index["keys"],
-                    name=index["name"],
-                    unique=index["unique"]
-                )
+        await self.init_indexes(
+            collection_name=DataBaseEnum.COLLECTION_PROJECT_NAME.value,
+            indexes=Project.get_indexes(),
+        )
 
     async def create_project(self,project:Project):
         result = await self.collection.insert_one(project.dict(by_alias=True,exclude_none=True))
@@ -35,30 +31,45 @@ class ProjectModel(BaseDataModel):
 
     # get project or create one
     async def get_project_or_create_one(self, project_id: str):
+        # served from the project cache when it is enabled. A project
+        # document is never changed or deleted after it was created (resets
+        # only drop its chunks and vectors), so cached projects are not
+        # invalidated
+        if self.project_cache is not None:
+            return await self.project_cache.get_or_load(
+                project_id,
+                lambda: self.find_project_or_create_one(project_id=project_id),
+            )
 
-        # get project from DB
-        record = await self.collection.find_one({
-            "project_id": project_id
-        })
+        return await self.find_project_or_create_one(project_id=project_id)
 
-        # if project is not found create new project
-        if record is None:
-            # create new project
-            project = Project(project_id=project_id)
-            project = await self.create_project(project=project)
+    async def find_project_or_create_one(self, project_id: str):
+        # validate the project id before touching the DB
+        project = Project(project_id=project_id)
 
-            return project
-        
-        print("Record",record)
-        temp_project= Project(**record)
-        print("###")
-        print("temp_project",temp_project)
-        print("###")
-        return temp_project
+        # get the project, or create it in the same atomic operation so
+        # concurrent first requests do not race to insert it
+        record = await self.collection.find_one_and_update(
+            {"project_id": project_id},
+            {"$setOnInsert": project.dict(by_alias=True,exclude_none=True)},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
+        return Project(**record)
 
 
     # get all projects
-    async def get_all_projects(self, page:int =1, page_size: int=10 ):
+    def to_projects(self, records: list, lean: bool = False):
+        """
+        Build Project models, or ProjectRecord views without validation
+        when `lean` is set.
+        """
+        if lean:
+            return [ProjectRecord(record) for record in records]
+        return [Project(**record) for record in records]
+
+    async def get_all_projects(self, page:int =1, page_size: int=10, lean: bool = False):
         # Calculate total count of documents
         total_documents  = await self.collection.count_documents({})
 
@@ -69,12 +80,31 @@ class ProjectModel(BaseDataModel):
         skip = (page - 1) * page_size
 
         # get cursor from DB to Collect Documents
-        cursor = await self.collection.find({}).skip(skip).limit(page_size)
-        projects = []
-        async for document in cursor:
-            projects.append(
-                Project(**document)
-            )
+        cursor = self.collection.find({}).skip(skip).limit(page_size)
+        documents = await cursor.to_list(length=None)
+
+        return self.to_projects(documents, lean=lean),total_pages
+
+    async def iter_all_projects(self, batch_size: int = 100, lean: bool = False):
+        """
+        Streams all projects in batches, using keyset pagination on _id
+        instead of skip/limit pages.
+        """
+        last_id = None
+        while True:
+            query = {}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+
+            records = await self.collection.find(query).sort(
+                "_id", pymongo.ASCENDING
+            ).limit(batch_size).to_list(length=None)
+
+            if not records:
+                break
+
+            last_id = records[-1]["_id"]
+            yield self.to_projects(records, lean=lean)
 
-        return projects,total_pages
-        
\ No newline at end of file
+            if len(records) < batch_size:
+                break
@@ -0,0 +1,140 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemas import UploadSession
+from .enums.DataBaseEnum import DataBaseEnum
+from .enums.UploadStatusEnum import UploadStatusEnum
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from datetime import datetime
+
+
+class UploadSessionModel(BaseDataModel):
+    def __init__(self,db_client:object):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DataBaseEnum.COLLECTION_UPLOAD_NAME.value]
+
+    @classmethod
+    async def create_instance(cls,db_client:object):
+        instance = cls(db_client)
+        await instance.init_collection()
+        return instance
+
+    async def init_collection(self):
+        await self.init_indexes(
+            collection_name=DataBaseEnum.COLLECTION_UPLOAD_NAME.value,
+            indexes=UploadSession.get_indexes(),
+        )
+
+    def to_object_id(self,upload_id):
+        if isinstance(upload_id,ObjectId):
+            return upload_id
+        try:
+            return ObjectId(upload_id)
+        except (InvalidId,TypeError):
+            return None
+
+    async def create_upload_session(self,upload_session:UploadSession):
+        result = await self.collection.insert_one(upload_session.dict(by_alias=True,exclude_none=True))
+        upload_session.id = result.inserted_id
+        return upload_session
+
+    async def get_upload_session(self,upload_id:str):
+        upload_id = self.to_object_id(upload_id)
+        if upload_id is None:
+            return None
+
+        record = await self.collection.find_one({"_id":upload_id})
+        if record is None:
+            return None
+
+        return UploadSession(**record)
+
+    async def add_upload_part(self,upload_id:ObjectId,part_no:int,offset:int,size:int,
+                              part_file:str):
+        """
+        Atomically records a part written at `offset` to its own `part_file`.
+        Returns None if another part was recorded at that offset in the
+        meantime or the session is no longer uploading: the caller drops
+        its part file.
+        """
+        record = await self.collection.find_one_and_update(
+            {
+                "_id":upload_id,
+                "upload_status":UploadStatusEnum.UPLOADING.value,
+                "upload_received_size":offset,
+            },
+            {
+                "$inc":{"upload_received_size":size},
+                "$push":{"upload_parts":{"part_no":part_no,"offset":offset,"size":size,
+                                         "part_file":part_file}},
+                "$set":{"upload_updated_at":datetime.utcnow()},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        if record is None:
+            return None
+
+        return UploadSession(**record)
+
+    async def reset_upload_parts(self,upload_id:ObjectId,from_status:str,upload_parts:list):
+        """
+        Atomically moves a session from `from_status` back to uploading with
+        only `upload_parts` received, so the next parts are sent again.
+        Returns None if the session was not in `from_status`.
+        """
+        record = await self.collection.find_one_and_update(
+            {"_id":upload_id, "upload_status":from_status},
+            {"$set":{
+                "upload_status":UploadStatusEnum.UPLOADING.value,
+                "upload_parts":upload_parts,
+                "upload_received_size":sum(part["size"] for part in upload_parts),
+                "upload_updated_at":datetime.utcnow(),
+            }},
+            return_document=ReturnDocument.AFTER,
+        )
+        if record is None:
+            return None
+
+        return UploadSession(**record)
+
+    async def set_upload_status(self,upload_id:ObjectId,from_status:str,to_status:str,
+                                asset_id:ObjectId=None):
+        """
+        Atomically moves a session from `from_status` to `to_status`.
+        Returns None if the session was not in `from_status`.
+        """
+        fields = {
+            "upload_status":to_status,
+            "upload_updated_at":datetime.utcnow(),
+        }
+        if asset_id is not None:
+            fields["upload_asset_id"] = asset_id
+
+        record = await self.collection.find_one_and_update(
+            {"_id":upload_id, "upload_status":from_status},
+            {"$set":fields},
+            return_document=ReturnDocument.AFTER,
+        )
+        if record is None:
+            return None
+
+        return UploadSession(**record)
+
+    async def delete_stale_upload_sessions(self,updated_before:datetime):
+        """
+        Deletes the sessions not updated since `updated_before`, whatever
+        their status. A session getting a part in the meantime is kept.
+        Returns the ids of the deleted sessions, whose files are removed
+        by the caller.
+        """
+        deleted_ids = []
+        cursor = self.collection.find({"upload_updated_at":{"$lt":updated_before}},{"_id":1})
+        async for record in cursor:
+            result = await self.collection.delete_one({
+                "_id":record["_id"],
+                "upload_updated_at":{"$lt":updated_before},
+            })
+            if result.deleted_count:
+                deleted_ids.append(record["_id"])
+
+        return deleted_ids
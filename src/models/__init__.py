@@ -2,3 +2,6 @@ from .enums.AssetTypeEnum import AssetTypeEnum
 from .enums.DataBaseEnum import DataBaseEnum
 from .enums.ProcessingEnum import ProcessingEnum
 from .enums.Response_Enums import ResponseSignal
+from .enums.JobStatusEnum import JobStatusEnum
+from .enums.JobTypeEnum import JobTypeEnum
+from .enums.UploadStatusEnum import UploadStatusEnum
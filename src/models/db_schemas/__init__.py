@@ -1,4 +1,7 @@
 from .project import Project
 from .data_chunks import DataChunk,RetrieveDocument
+from .chunk_metadata import ChunkMetadata
 from .asset import Asset
- 
\ No newline at end of file
+from .job import Job
+from .upload_session import UploadSession
+from .records import MongoRecord,ProjectRecord,AssetRecord,ChunkRecord
@@ -13,6 +13,10 @@ class Asset(BaseModel):
     asset_name: str = Field(..., min_length=1)
     asset_size: int = Field(gt=0,default=None)
     asset_pushed_at: datetime = Field(default=datetime.now())
+    # sha256 of the file content, recorded at upload
+    asset_hash: Optional[str] = Field(default=None)
+    # processing fingerprint of the stored chunks (content hash, chunk_size,
+    # overlap_size, splitter version), used to skip unchanged assets
     asset_config: dict = Field(default=None)
 
     @classmethod
@@ -41,5 +45,19 @@ class Asset(BaseModel):
                     ("asset_project_id", pymongo.ASCENDING)
                     ],
                 "unique": True
+            },
+            {
+                "name": "asset_config_hash_idx",
+                "keys": [("asset_config.asset_hash", pymongo.ASCENDING)],
+                "unique": False
+            },
+            {
+                "name": "asset_project_id_type_idx",
+                "keys": [
+                    ("asset_project_id", pymongo.ASCENDING),
+                    ("asset_type", pymongo.ASCENDING),
+                    ("_id", pymongo.ASCENDING)
+                    ],
+                "unique": False
             }
         ]
@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field, ConfigDict
+from bson.objectid import ObjectId
+import pymongo
+
+class ChunkMetadata(BaseModel):
+    """
+    Metadata shared by the chunks of an asset (source, file_path,
+    document properties...), stored once and referenced by the chunks
+    through chunk_metadata_id.
+
+    The id is a hash of the asset id and the metadata, so the same
+    metadata of the same asset is always stored under the same id.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    id: str = Field(..., alias="_id", min_length=1)
+    metadata_project_id: ObjectId
+    metadata_asset_id: ObjectId
+    metadata: dict
+
+    @classmethod
+    def get_indexes(cls):
+        """
+        Returns indexes in a consistent format:
+        [
+            {
+                "name": "index_name",
+                "keys": [("field_name", pymongo.ASCENDING), ...],
+                "unique": True/False
+            },
+            ...
+        ]
+        """
+        return [
+            {
+                "name": "metadata_project_id_idx",
+                "keys": [("metadata_project_id", pymongo.ASCENDING)],
+                "unique": False
+            },
+            {
+                "name": "metadata_asset_id_idx",
+                "keys": [("metadata_asset_id", pymongo.ASCENDING)],
+                "unique": False
+            },
+        ]
@@ -4,15 +4,18 @@ from bson.objectid import ObjectId
 import pymongo
 
 class DataChunk(BaseModel):
+    # stored in a compact form by ChunkModel (shared metadata in
+    # chunks_metadata, optionally compressed text) and read back as is
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     id: Optional[ObjectId] = Field(None,alias="_id")
-    project_id: str = Field(..., min_length=1)
     chunk_text: str = Field(..., min_length=1)
     chunk_metadata: dict
     chunk_order: int = Field(..., gt=0)
     chunk_project_id: ObjectId
     chunk_asset_id: ObjectId
+    # set once the chunk is upserted into the project's vector db collection
+    chunk_indexed: bool = False
 
 
     # Build for make the read from DB more Efficient and Fast
@@ -31,10 +34,31 @@ class DataChunk(BaseModel):
         """
         return [
             {
-                "name": "chunk_project_id_order_idx",
-                "keys": [("chunk_project_id", pymongo.ASCENDING), ("chunk_order", pymongo.ASCENDING)],
+                # chunk_order restarts at 1 for each asset
+                "name": "chunk_project_asset_order_unique_idx",
+                "keys": [
+                    ("chunk_project_id", pymongo.ASCENDING),
+                    ("chunk_asset_id", pymongo.ASCENDING),
+                    ("chunk_order", pymongo.ASCENDING)
+                    ],
                 "unique": True
             },
+            {
+                "name": "chunk_asset_id_order_idx",
+                "keys": [("chunk_asset_id", pymongo.ASCENDING), ("chunk_order", pymongo.ASCENDING)],
+                "unique": False
+            },
+            {
+                # delta index pushes read the chunks not indexed yet
+                "name": "chunk_project_indexed_asset_order_idx",
+                "keys": [
+                    ("chunk_project_id", pymongo.ASCENDING),
+                    ("chunk_indexed", pymongo.ASCENDING),
+                    ("chunk_asset_id", pymongo.ASCENDING),
+                    ("chunk_order", pymongo.ASCENDING)
+                    ],
+                "unique": False
+            },
             {
                 "name": "chunk_project_id_idx",
                 "keys": [("chunk_project_id", pymongo.ASCENDING)],
@@ -42,6 +66,17 @@ class DataChunk(BaseModel):
             }
         ]
 
+    @classmethod
+    def get_dropped_indexes(cls):
+        """
+        Returns the names of replaced indexes, dropped on startup.
+        """
+        return [
+            # keyed on (project, order) only: the chunks of a second asset
+            # collided with the first asset's chunks
+            "chunk_project_id_order_idx",
+        ]
+
 
 class RetrieveDocument(BaseModel):
     """
@@ -50,9 +85,12 @@ class RetrieveDocument(BaseModel):
     Args:
         text (str): The text of the document.
         score (float): The score of the document.
+        metadata (dict): The chunk metadata of the document.
+        file_id (str): The id of the asset the document comes from.
     
     """
     text: str
     score: float
-    # metadata: dict
+    metadata: Optional[dict] = None
+    file_id: Optional[str] = None
 
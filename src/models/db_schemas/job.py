@@ -0,0 +1,62 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional
+from bson.objectid import ObjectId
+import pymongo
+from datetime import datetime
+
+class Job(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    id: Optional[ObjectId] = Field(None,alias="_id")
+    job_project_id: ObjectId
+    project_id: str = Field(..., min_length=1)
+    job_type: str = Field(..., min_length=1)
+    job_status: str = Field(..., min_length=1)
+    job_request: dict = Field(default_factory=dict)
+    job_progress: dict = Field(default_factory=lambda: {
+        "files_total": 0,
+        "files_processed": 0,
+        "files_skipped": 0,
+        "chunks": 0,
+        "embedded": 0,
+        "upserted": 0,
+    })
+    # last durable position, used to resume the job after a restart
+    job_checkpoint: dict = Field(default_factory=dict)
+    job_error: Optional[str] = None
+    # process running the job, and until when it owns it without a heartbeat
+    job_owner: Optional[str] = None
+    job_lease_expires_at: Optional[datetime] = None
+    job_created_at: datetime = Field(default_factory=datetime.utcnow)
+    job_updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    @classmethod
+    def get_indexes(cls):
+        """
+        Returns indexes in a consistent format:
+        [
+            {
+                "name": "index_name",
+                "keys": [("field_name", pymongo.ASCENDING), ...],
+                "unique": True/False
+            },
+            ...
+        ]
+        """
+        return [
+            {
+                "name": "job_project_id_idx",
+                "keys": [("job_project_id", pymongo.ASCENDING)],
+                "unique": False
+            },
+            {
+                "name": "job_status_idx",
+                "keys": [("job_status", pymongo.ASCENDING)],
+                "unique": False
+            },
+            {
+                "name": "job_status_lease_idx",
+                "keys": [("job_status", pymongo.ASCENDING), ("job_lease_expires_at", pymongo.ASCENDING)],
+                "unique": False
+            }
+        ]
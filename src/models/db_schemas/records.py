@@ -0,0 +1,56 @@
+class MongoRecord:
+    """
+    Read-only view of a document read from our own database, built
+    without validation.
+
+    Fields are exposed with the same attribute names as the pydantic
+    schemas (`_id` as `id`). Fields missing from the document, such as the
+    ones left out by a projection, are None. Building a record is several
+    times cheaper than validating the schema, so it is meant for reading
+    many trusted documents at once.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class ProjectRecord(MongoRecord):
+    __slots__ = ("id", "project_id")
+
+    def __init__(self, record: dict):
+        get = record.get
+        self.id = get("_id")
+        self.project_id = get("project_id")
+
+
+class AssetRecord(MongoRecord):
+    __slots__ = ("id", "asset_project_id", "asset_type", "asset_name", "asset_size",
+                 "asset_pushed_at", "asset_hash", "asset_config")
+
+    def __init__(self, record: dict):
+        get = record.get
+        self.id = get("_id")
+        self.asset_project_id = get("asset_project_id")
+        self.asset_type = get("asset_type")
+        self.asset_name = get("asset_name")
+        self.asset_size = get("asset_size")
+        self.asset_pushed_at = get("asset_pushed_at")
+        self.asset_hash = get("asset_hash")
+        self.asset_config = get("asset_config")
+
+
+class ChunkRecord(MongoRecord):
+    __slots__ = ("id", "chunk_text", "chunk_metadata", "chunk_order",
+                 "chunk_project_id", "chunk_asset_id", "chunk_indexed")
+
+    def __init__(self, record: dict):
+        get = record.get
+        self.id = get("_id")
+        self.chunk_text = get("chunk_text")
+        self.chunk_metadata = get("chunk_metadata")
+        self.chunk_order = get("chunk_order")
+        self.chunk_project_id = get("chunk_project_id")
+        self.chunk_asset_id = get("chunk_asset_id")
+        self.chunk_indexed = get("chunk_indexed")
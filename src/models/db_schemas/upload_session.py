@@ -0,0 +1,55 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional
+from bson.objectid import ObjectId
+import pymongo
+from datetime import datetime
+
+class UploadSession(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    id: Optional[ObjectId] = Field(None,alias="_id")
+    upload_project_id: ObjectId
+    project_id: str = Field(..., min_length=1)
+    upload_file_name: str = Field(..., min_length=1)
+    upload_content_type: str = Field(..., min_length=1)
+    upload_total_size: int = Field(gt=0)
+    # bytes stored so far: the offset of the next part
+    upload_received_size: int = Field(default=0, ge=0)
+    # [{"part_no": 1, "offset": 0, "size": ..., "part_file": ...}, ...] in
+    # offset order, each part stored in its own file
+    upload_parts: list = Field(default_factory=list)
+    upload_status: str = Field(..., min_length=1)
+    upload_asset_id: Optional[ObjectId] = None
+    upload_created_at: datetime = Field(default_factory=datetime.utcnow)
+    upload_updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    @classmethod
+    def get_indexes(cls):
+        """
+        Returns indexes in a consistent format:
+        [
+            {
+                "name": "index_name",
+                "keys": [("field_name", pymongo.ASCENDING), ...],
+                "unique": True/False
+            },
+            ...
+        ]
+        """
+        return [
+            {
+                "name": "upload_project_id_idx",
+                "keys": [("upload_project_id", pymongo.ASCENDING)],
+                "unique": False
+            },
+            {
+                "name": "upload_status_idx",
+                "keys": [("upload_status", pymongo.ASCENDING)],
+                "unique": False
+            },
+            {
+                "name": "upload_updated_at_idx",
+                "keys": [("upload_updated_at", pymongo.ASCENDING)],
+                "unique": False
+            },
+        ]
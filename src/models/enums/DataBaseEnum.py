@@ -3,5 +3,8 @@ from enum import Enum
 class DataBaseEnum(Enum):
     COLLECTION_PROJECT_NAME ="projects"
     COLLECTION_CHUNK_NAME ="chunks"
+    COLLECTION_CHUNK_METADATA_NAME ="chunks_metadata"
     COLLECTION_ASSET_NAME ="assets"
+    COLLECTION_JOB_NAME ="jobs"
+    COLLECTION_UPLOAD_NAME ="uploads"
     
\ No newline at end of file
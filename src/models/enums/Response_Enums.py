@@ -29,6 +29,33 @@ class ResponseSignal(Enum):
 
     SEARCH_VECTORDB_SUCCESSFULLY = "SEARCH_VECTORDB_SUCCESSFULLY"
     SEARCH_VECTORDB_FAILED = "SEARCH_VECTORDB_FAILED"
+    SEARCH_BATCH_TOO_MANY_QUERIES = "SEARCH_BATCH_TOO_MANY_QUERIES"
 
     ANSWER_RAG_FAILED = "ANSWER_RAG_FAILED"
-    ANSWER_RAG_SUCCESSFULLY = "ANSWER_RAG_SUCCESSFULLY"
\ No newline at end of file
+    ANSWER_RAG_SUCCESSFULLY = "ANSWER_RAG_SUCCESSFULLY"
+
+    EMBEDDING_CACHE_INFO_RETRIEVED_SUCCESSFULLY = "EMBEDDING_CACHE_INFO_RETRIEVED_SUCCESSFULLY"
+    EMBEDDING_CACHE_DISABLED = "EMBEDDING_CACHE_DISABLED"
+
+    JOB_SUBMITTED_SUCCESSFULLY = "JOB_SUBMITTED_SUCCESSFULLY"
+    JOB_RETRIEVED_SUCCESSFULLY = "JOB_RETRIEVED_SUCCESSFULLY"
+    JOB_NOT_FOUND = "JOB_NOT_FOUND"
+    JOB_CANCELLED_SUCCESSFULLY = "JOB_CANCELLED_SUCCESSFULLY"
+    JOB_CANCEL_FAILED = "JOB_CANCEL_FAILED"
+
+    UPLOAD_SESSION_CREATED_SUCCESSFULLY = "UPLOAD_SESSION_CREATED_SUCCESSFULLY"
+    UPLOAD_SESSION_RETRIEVED_SUCCESSFULLY = "UPLOAD_SESSION_RETRIEVED_SUCCESSFULLY"
+    UPLOAD_SESSION_NOT_FOUND = "UPLOAD_SESSION_NOT_FOUND"
+    UPLOAD_SESSION_ALREADY_COMPLETED = "UPLOAD_SESSION_ALREADY_COMPLETED"
+    UPLOAD_PART_STORED_SUCCESSFULLY = "UPLOAD_PART_STORED_SUCCESSFULLY"
+    UPLOAD_PART_OFFSET_MISMATCH = "UPLOAD_PART_OFFSET_MISMATCH"
+    UPLOAD_INCOMPLETE = "UPLOAD_INCOMPLETE"
+    UPLOAD_SIZE_MISMATCH = "UPLOAD_SIZE_MISMATCH"
+
+    BATCH_UPLOAD_COMPLETED = "BATCH_UPLOAD_COMPLETED"
+    BATCH_UPLOAD_FAILED = "BATCH_UPLOAD_FAILED"
+    BATCH_TOO_MANY_FILES = "BATCH_TOO_MANY_FILES"
+    ARCHIVE_NOT_READ = "ARCHIVE_NOT_READ"
+
+    PROJECT_CACHE_DISABLED = "PROJECT_CACHE_DISABLED"
+    PROJECT_CACHE_INFO_RETRIEVED_SUCCESSFULLY = "PROJECT_CACHE_INFO_RETRIEVED_SUCCESSFULLY"
@@ -0,0 +1,8 @@
+from enum import Enum
+
+class UploadStatusEnum(Enum):
+    UPLOADING = "uploading"
+    COMMITTING = "committing"
+    COMPLETED = "completed"
+    # the commit failed and its files could not be cleaned up
+    FAILED = "failed"
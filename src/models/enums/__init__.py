@@ -2,3 +2,6 @@ from .AssetTypeEnum import AssetTypeEnum
 from .DataBaseEnum import DataBaseEnum
 from .ProcessingEnum import ProcessingEnum
 from .Response_Enums import ResponseSignal
+from .JobStatusEnum import JobStatusEnum
+from .JobTypeEnum import JobTypeEnum
+from .UploadStatusEnum import UploadStatusEnum
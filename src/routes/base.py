@@ -1,6 +1,8 @@
-from fastapi import FastAPI, APIRouter, Depends
+from fastapi import FastAPI, APIRouter, Depends, Request, status
+from fastapi.responses import JSONResponse
 import os
 from helpers.config import get_settings,Settings
+from models import ResponseSignal
 
 
 base_router =APIRouter(
@@ -17,3 +19,24 @@ async def welcome(app_settings: Settings =Depends(get_settings)):
         "app_version": app_version,
         "message": "Welcome to the RAG API"
     }
+
+
+@base_router.get("/project/cache/info")
+async def get_project_cache_info(request:Request):
+    project_cache = request.app.project_cache
+
+    if not project_cache:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signals":ResponseSignal.PROJECT_CACHE_DISABLED.value,
+            }
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signals":ResponseSignal.PROJECT_CACHE_INFO_RETRIEVED_SUCCESSFULLY.value,
+            "cache_info":project_cache.get_stats()
+        }
+    )
@@ -3,16 +3,25 @@ from fastapi.responses import JSONResponse
 import os
 from helpers.config import get_settings,Settings
 from controllers import DataController,ProjectController,ProcessController
+from controllers.DataControllers import CONTENT_SNIFF_SIZE
 import aiofiles
 from models import ResponseSignal
 import logging
-from .schemes.data import ProcessingRequest
+from .schemes.data import ProcessingRequest,UploadSessionRequest
 from models.ProjectModel import ProjectModel
 from models.ChunkModel import ChunkModel
-from models.db_schemas import DataChunk,Asset
+from models.db_schemas import Asset
 from models.AssetModel import AssetModel
-from models.enums import AssetTypeEnum
-from datetime import datetime
+from models.UploadSessionModel import UploadSessionModel
+from models.db_schemas import UploadSession
+from models.enums import AssetTypeEnum,UploadStatusEnum
+from controllers.process_workers import concat_files,expand_archive
+from .dependencies import (get_project_model,get_asset_model,get_chunk_model,
+                           get_upload_session_model,get_data_controller)
+import hashlib
+import asyncio
+from datetime import datetime, timedelta
+from typing import List
 
 
 logger = logging.getLogger("uvicorn.error")
@@ -22,18 +31,52 @@ data_router = APIRouter(
     tags=["data"]
 )
 
+async def write_upload_file(file:UploadFile,temp_path:str,chunk_size:int,max_size:int=None):
+    """
+    Stream an uploaded file to `temp_path`, hashing it on the way.
+
+    Returns:
+        str or None: The sha256 of the content, or None if it is larger
+        than `max_size`.
+    """
+    file_hash = hashlib.sha256()
+    file_size = 0
+    async with aiofiles.open(temp_path, "wb") as f:
+        while chunk := await file.read(chunk_size):
+            file_size += len(chunk)
+            if max_size is not None and file_size > max_size:
+                return None
+            file_hash.update(chunk)
+            await f.write(chunk)
+
+    return file_hash.hexdigest()
+
+
+async def remove_stale_upload_sessions(upload_model:UploadSessionModel,
+                                      data_controller:DataController,ttl:int):
+    """
+    Delete the upload sessions abandoned for more than `ttl` seconds, and
+    the part files they received.
+    """
+    deleted_ids = await upload_model.delete_stale_upload_sessions(
+        updated_before=datetime.utcnow() - timedelta(seconds=ttl),
+    )
+    for upload_id in deleted_ids:
+        try:
+            data_controller.remove_upload_files(upload_id=str(upload_id))
+        except Exception as e:
+            logger.error(f"Error while removing the files of upload {upload_id}: {e}")
+
+
 # For upload data and make it chunks
 @data_router.get("/upload/{project_id}")
 async def upload_data(request:Request,project_id:str ,file:UploadFile ,
-                      app_settings: Settings = Depends(get_settings)):
+                      app_settings: Settings = Depends(get_settings),
+                      data_controller:DataController = Depends(get_data_controller),
+                      project_model:ProjectModel = Depends(get_project_model),
+                      asset_model:AssetModel = Depends(get_asset_model)):
 
     print("11")
-    # Validata the file properties
-    data_controller = DataController()
-    project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client,
-    )
-
     # get project details
     project = await project_model.get_project_or_create_one(
         project_id=project_id,
@@ -54,25 +97,35 @@ async def upload_data(request:Request,project_id:str ,file:UploadFile ,
         project_id=project_id
     )
 
-    # save file
+    # save file to a temporary path, hashing the content on the way
+    temp_path = data_controller.get_upload_temp_path()
     try:
-        async with aiofiles.open(file_path, "wb") as f:
-            while chunk := await file.read(app_settings.FILE_DEFAULT_CHUNK_SIZE):
-                await f.write(chunk)
+        file_hash = await write_upload_file(
+            file=file,
+            temp_path=temp_path,
+            chunk_size=app_settings.FILE_DEFAULT_CHUNK_SIZE,
+        )
+
+        # the content is stored once in the blob store and linked into the
+        # project, so re-uploads of the same file take no extra space
+        data_controller.store_upload(
+            temp_path=temp_path,
+            file_hash=file_hash,
+            file_path=file_path,
+        )
     except Exception as e:
         logger.error(f"Error while uploading file {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
         return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,content={"Signals":ResponseSignal.FILE_NOT_SAVED.value})
 
     # store asset in DB
-    asset_model = await AssetModel.create_instance(
-        db_client=request.app.db_client,
-    )
-
     asset_resource = Asset(
         asset_project_id=project.id,
         asset_type=AssetTypeEnum.FILE_.value,
         asset_name=file_id,
         asset_size=os.path.getsize(file_path),
+        asset_hash=file_hash,
     )
 
     asset_record = await asset_model.create_asset(asset=asset_resource)
@@ -91,56 +144,519 @@ async def upload_data(request:Request,project_id:str ,file:UploadFile ,
         )
 
 
+# Upload many files at once, or zip/tar archives expanded server-side.
+# The project and models are loaded once, the files are written
+# concurrently and their assets are created with a single bulk insert
+@data_router.post("/upload/batch/{project_id}")
+async def upload_batch(request:Request,project_id:str,files:List[UploadFile],
+                       app_settings: Settings = Depends(get_settings),
+                       data_controller:DataController = Depends(get_data_controller),
+                       project_model:ProjectModel = Depends(get_project_model),
+                       asset_model:AssetModel = Depends(get_asset_model)):
+
+    if len(files) > app_settings.UPLOAD_BATCH_MAX_FILES:
+        return JSONResponse(status_code=status.HTTP_409_CONFLICT,content={"Signals":ResponseSignal.BATCH_TOO_MANY_FILES.value})
+
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    max_file_size = app_settings.FILE_MAX_SIZE * data_controller.size_scale
+    semaphore = asyncio.Semaphore(app_settings.UPLOAD_BATCH_CONCURRENCY)
+
+    # one UPLOAD_BATCH_MAX_FILES budget for the whole request: each plain
+    # file takes one file, each archive the members it expands
+    remaining_files = app_settings.UPLOAD_BATCH_MAX_FILES - sum(
+        1 for file in files if not data_controller.is_archive(file.filename)
+    )
+
+    def commit_file(file_name:str,temp_path:str,file_hash:str,file_size:int):
+        file_path, file_id = data_controller.generate_unique_filepath(
+            orig_file_name=os.path.basename(file_name),
+            project_id=project_id
+        )
+        data_controller.store_upload(temp_path=temp_path,file_hash=file_hash,file_path=file_path)
+
+        return {
+            "original_file_name":file_name,
+            "file_name":file_id,
+            "file_path":file_path,
+            "asset":Asset(
+                asset_project_id=project.id,
+                asset_type=AssetTypeEnum.FILE_.value,
+                asset_name=file_id,
+                asset_size=file_size,
+                asset_hash=file_hash,
+            ),
+        }
+
+    async def save_archive(file:UploadFile):
+        nonlocal remaining_files
+        if remaining_files <= 0:
+            return [{"original_file_name":file.filename,"Signals":ResponseSignal.BATCH_TOO_MANY_FILES.value}]
+
+        temp_path = data_controller.get_upload_temp_path()
+        try:
+            archive_hash = await write_upload_file(
+                file=file,
+                temp_path=temp_path,
+                chunk_size=app_settings.FILE_DEFAULT_CHUNK_SIZE,
+                max_size=app_settings.UPLOAD_ARCHIVE_MAX_SIZE * data_controller.size_scale,
+            )
+            if archive_hash is None:
+                return [{"original_file_name":file.filename,"Signals":ResponseSignal.FILE_SIZE_EXCEEDED.value}]
+
+            members = await asyncio.get_running_loop().run_in_executor(
+                request.app.process_pool,
+                expand_archive,
+                temp_path,
+                data_controller.get_upload_temp_dir(),
+                app_settings.FILE_ALLOWED_TYPES,
+                max_file_size,
+                remaining_files,
+            )
+        except Exception as e:
+            logger.error(f"Error while expanding archive {file.filename}: {e}")
+            return [{"original_file_name":file.filename,"Signals":ResponseSignal.ARCHIVE_NOT_READ.value}]
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        results = []
+        for member in members:
+            file_name = f"{file.filename}/{member['file_name']}"
+            if "signal" in member:
+                results.append({"original_file_name":file_name,"Signals":member["signal"]})
+                continue
+
+            # archives expanded at the same time share the remaining budget
+            if remaining_files <= 0:
+                os.remove(member["temp_path"])
+                results.append({"original_file_name":file_name,"Signals":ResponseSignal.BATCH_TOO_MANY_FILES.value})
+                continue
+            remaining_files -= 1
+
+            try:
+                results.append(commit_file(file_name=file_name,
+                                           temp_path=member["temp_path"],
+                                           file_hash=member["file_hash"],
+                                           file_size=member["file_size"]))
+            except Exception as e:
+                logger.error(f"Error while uploading file {file_name}: {e}")
+                if os.path.exists(member["temp_path"]):
+                    os.remove(member["temp_path"])
+                results.append({"original_file_name":file_name,"Signals":ResponseSignal.FILE_NOT_SAVED.value})
+
+        return results
+
+    async def save_file(file:UploadFile):
+        async with semaphore:
+            if data_controller.is_archive(file.filename):
+                return await save_archive(file)
+
+            is_valid,result_Signals = data_controller.validate_uploaded_file(file=file)
+            if not is_valid:
+                return [{"original_file_name":file.filename,"Signals":result_Signals}]
+
+            temp_path = data_controller.get_upload_temp_path()
+            try:
+                file_hash = await write_upload_file(
+                    file=file,
+                    temp_path=temp_path,
+                    chunk_size=app_settings.FILE_DEFAULT_CHUNK_SIZE,
+                    max_size=max_file_size,
+                )
+                if file_hash is None:
+                    os.remove(temp_path)
+                    return [{"original_file_name":file.filename,"Signals":ResponseSignal.FILE_SIZE_EXCEEDED.value}]
+
+                return [commit_file(file_name=file.filename,
+                                    temp_path=temp_path,
+                                    file_hash=file_hash,
+                                    file_size=os.path.getsize(temp_path))]
+            except Exception as e:
+                logger.error(f"Error while uploading file {file.filename}: {e}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                return [{"original_file_name":file.filename,"Signals":ResponseSignal.FILE_NOT_SAVED.value}]
+
+    results = [
+        result
+        for file_results in await asyncio.gather(*[save_file(file) for file in files])
+        for result in file_results
+    ]
+
+    # all the stored files get their asset with one insert
+    stored_results = [result for result in results if "asset" in result]
+    try:
+        await asset_model.create_assets(assets=[result["asset"] for result in stored_results])
+    except Exception as e:
+        logger.error(f"Error while creating assets of batch upload: {e}")
+        for result in stored_results:
+            if os.path.lexists(result["file_path"]):
+                os.remove(result["file_path"])
+            result.pop("asset")
+            result["Signals"] = ResponseSignal.FILE_NOT_SAVED.value
+
+    files_status = []
+    for result in results:
+        asset = result.pop("asset", None)
+        result.pop("file_path", None)
+        if asset is not None:
+            result["Signals"] = ResponseSignal.FILE_UPLOADED_SUCCESSFULLY.value
+            result["file_id"] = str(asset.id)
+        files_status.append(result)
+
+    uploaded_files = sum(1 for result in files_status if "file_id" in result)
+
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED if uploaded_files else status.HTTP_400_BAD_REQUEST,
+        content={
+            "Signals":ResponseSignal.BATCH_UPLOAD_COMPLETED.value if uploaded_files else ResponseSignal.BATCH_UPLOAD_FAILED.value,
+            "uploaded_files":uploaded_files,
+            "failed_files":len(files_status) - uploaded_files,
+            "files":files_status,
+            }
+        )
+
+def get_upload_session_content(upload_session:UploadSession):
+    return {
+        "upload_id": str(upload_session.id),
+        "file_name": upload_session.upload_file_name,
+        "total_size": upload_session.upload_total_size,
+        # the offset of the next part
+        "received_size": upload_session.upload_received_size,
+        "parts": upload_session.upload_parts,
+        "status": upload_session.upload_status,
+        "file_id": str(upload_session.upload_asset_id) if upload_session.upload_asset_id else None,
+    }
+
+
+# Start a resumable upload: the file type and size are checked before any
+# byte is received, then the file is sent as parts with PUT .../parts/{part_no}
+@data_router.post("/upload/session/{project_id}")
+async def create_upload_session(request:Request,project_id:str,upload_request:UploadSessionRequest,
+                                app_settings: Settings = Depends(get_settings),
+                                data_controller:DataController = Depends(get_data_controller),
+                                project_model:ProjectModel = Depends(get_project_model),
+                                upload_model:UploadSessionModel = Depends(get_upload_session_model)):
+
+    is_valid,result_Signals = data_controller.validate_upload_request(
+        content_type=upload_request.content_type,
+        file_size=upload_request.file_size,
+    )
+    if not is_valid:
+        return JSONResponse(status_code=status.HTTP_409_CONFLICT,content={"Signals":result_Signals})
+
+    # abandoned sessions do not keep their parts on disk forever
+    await remove_stale_upload_sessions(upload_model=upload_model,
+                                       data_controller=data_controller,
+                                       ttl=app_settings.UPLOAD_SESSION_TTL)
+
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    upload_session = await upload_model.create_upload_session(
+        upload_session=UploadSession(
+            upload_project_id=project.id,
+            project_id=project_id,
+            upload_file_name=upload_request.file_name,
+            upload_content_type=upload_request.content_type,
+            upload_total_size=upload_request.file_size,
+            upload_status=UploadStatusEnum.UPLOADING.value,
+        )
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "Signals":ResponseSignal.UPLOAD_SESSION_CREATED_SUCCESSFULLY.value,
+            **get_upload_session_content(upload_session),
+            }
+        )
+
+
+@data_router.get("/upload/session/{upload_id}")
+async def get_upload_session(request:Request,upload_id:str,
+                             upload_model:UploadSessionModel = Depends(get_upload_session_model)):
+    upload_session = await upload_model.get_upload_session(upload_id=upload_id)
+    if upload_session is None:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND,content={"Signals":ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value})
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "Signals":ResponseSignal.UPLOAD_SESSION_RETRIEVED_SUCCESSFULLY.value,
+            **get_upload_session_content(upload_session),
+            }
+        )
+
+
+# Store one part of a resumable upload. The raw request body is the part
+# content and `offset` must be the current received size of the session,
+# so an interrupted upload resumes from GET /upload/session/{upload_id}
+@data_router.put("/upload/session/{upload_id}/parts/{part_no}")
+async def upload_part(request:Request,upload_id:str,part_no:int,offset:int,
+                      data_controller:DataController = Depends(get_data_controller),
+                      upload_model:UploadSessionModel = Depends(get_upload_session_model)):
+
+    upload_session = await upload_model.get_upload_session(upload_id=upload_id)
+    if upload_session is None:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND,content={"Signals":ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value})
+
+    if upload_session.upload_status != UploadStatusEnum.UPLOADING.value:
+        return JSONResponse(status_code=status.HTTP_409_CONFLICT,content={"Signals":ResponseSignal.UPLOAD_SESSION_ALREADY_COMPLETED.value})
+
+    # a part sent again after it was stored (lost response) is acknowledged as is
+    for part in upload_session.upload_parts:
+        if part["part_no"] == part_no and part["offset"] == offset:
+            return JSONResponse(
+                status_code=status.HTTP_200_OK,
+                content={
+                    "Signals":ResponseSignal.UPLOAD_PART_STORED_SUCCESSFULLY.value,
+                    **get_upload_session_content(upload_session),
+                    }
+                )
+
+    if offset != upload_session.upload_received_size:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "Signals":ResponseSignal.UPLOAD_PART_OFFSET_MISMATCH.value,
+                "received_size":upload_session.upload_received_size,
+                }
+            )
+
+    # reject a part declared larger than the rest of the file before reading it
+    max_part_size = upload_session.upload_total_size - offset
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_part_size:
+        return JSONResponse(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,content={"Signals":ResponseSignal.FILE_SIZE_EXCEEDED.value})
+
+    # the part is written to its own file: a retry racing with the first
+    # attempt writes elsewhere, and only the part recorded first is kept
+    part_path = data_controller.get_upload_part_path(upload_id=str(upload_session.id))
+
+    part_size = 0
+    size_exceeded = False
+    head = b""
+    try:
+        async with aiofiles.open(part_path, "wb") as f:
+            # the body is streamed, so the size is enforced while it is
+            # received and not after it was buffered
+            async for chunk in request.stream():
+                part_size += len(chunk)
+                if part_size > max_part_size:
+                    size_exceeded = True
+                    break
+                if len(head) < CONTENT_SNIFF_SIZE:
+                    head += chunk[:CONTENT_SNIFF_SIZE - len(head)]
+                await f.write(chunk)
+    except Exception as e:
+        logger.error(f"Error while uploading part {part_no} of {upload_id}: {e}")
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,content={"Signals":ResponseSignal.FILE_NOT_SAVED.value})
+
+    if size_exceeded:
+        os.remove(part_path)
+        return JSONResponse(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,content={"Signals":ResponseSignal.FILE_SIZE_EXCEEDED.value})
+
+    # the type declared when the session was created must match the content
+    if offset == 0:
+        is_valid,result_Signals = data_controller.validate_upload_content(
+            content_type=upload_session.upload_content_type,
+            head=head,
+        )
+        if not is_valid:
+            os.remove(part_path)
+            return JSONResponse(status_code=status.HTTP_409_CONFLICT,content={"Signals":result_Signals})
+
+    upload_session = await upload_model.add_upload_part(
+        upload_id=upload_session.id,
+        part_no=part_no,
+        offset=offset,
+        size=part_size,
+        part_file=os.path.basename(part_path),
+    )
+    if upload_session is None:
+        # another part was stored at this offset in the meantime
+        os.remove(part_path)
+        return JSONResponse(status_code=status.HTTP_409_CONFLICT,content={"Signals":ResponseSignal.UPLOAD_PART_OFFSET_MISMATCH.value})
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "Signals":ResponseSignal.UPLOAD_PART_STORED_SUCCESSFULLY.value,
+            **get_upload_session_content(upload_session),
+            }
+        )
+
+
+# Commit a fully received upload as a project file
+@data_router.post("/upload/session/{upload_id}/complete")
+async def complete_upload_session(request:Request,upload_id:str,
+                                  data_controller:DataController = Depends(get_data_controller),
+                                  asset_model:AssetModel = Depends(get_asset_model),
+                                  upload_model:UploadSessionModel = Depends(get_upload_session_model)):
+
+    upload_session = await upload_model.get_upload_session(upload_id=upload_id)
+    if upload_session is None:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND,content={"Signals":ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value})
+
+    if upload_session.upload_received_size < upload_session.upload_total_size:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "Signals":ResponseSignal.UPLOAD_INCOMPLETE.value,
+                "received_size":upload_session.upload_received_size,
+                }
+            )
+
+    # only one request commits the session
+    upload_session = await upload_model.set_upload_status(
+        upload_id=upload_session.id,
+        from_status=UploadStatusEnum.UPLOADING.value,
+        to_status=UploadStatusEnum.COMMITTING.value,
+    )
+    if upload_session is None:
+        return JSONResponse(status_code=status.HTTP_409_CONFLICT,content={"Signals":ResponseSignal.UPLOAD_SESSION_ALREADY_COMPLETED.value})
+
+    # the received size is only what the session recorded: the part files
+    # must hold exactly the declared size before they are hashed and stored
+    stored_parts = data_controller.get_stored_upload_parts(
+        upload_id=str(upload_session.id),
+        upload_parts=upload_session.upload_parts,
+    )
+    if (len(stored_parts) < len(upload_session.upload_parts)
+            or sum(part["size"] for part in stored_parts) != upload_session.upload_total_size):
+        upload_session = await upload_model.reset_upload_parts(
+            upload_id=upload_session.id,
+            from_status=UploadStatusEnum.COMMITTING.value,
+            upload_parts=stored_parts,
+        )
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "Signals":ResponseSignal.UPLOAD_SIZE_MISMATCH.value,
+                "received_size":upload_session.upload_received_size if upload_session else None,
+                }
+            )
+
+    part_paths = [
+        data_controller.get_upload_part_path(upload_id=str(upload_session.id), part_file=part["part_file"])
+        for part in stored_parts
+    ]
+    assembly_path = data_controller.get_upload_assembly_path(upload_id=str(upload_session.id))
+    file_path, file_id = data_controller.generate_unique_filepath(
+        orig_file_name=upload_session.upload_file_name,
+        project_id=upload_session.project_id
+    )
+
+    try:
+        # the parts are concatenated, and hashed on the way, in a worker
+        file_size, file_hash = await asyncio.get_running_loop().run_in_executor(
+            request.app.process_pool, concat_files, part_paths, assembly_path
+        )
+        if file_size != upload_session.upload_total_size:
+            raise Exception(f"assembled {file_size} bytes instead of {upload_session.upload_total_size}")
+
+        data_controller.store_upload(
+            temp_path=assembly_path,
+            file_hash=file_hash,
+            file_path=file_path,
+        )
+
+        asset_record = await asset_model.create_asset(
+            asset=Asset(
+                asset_project_id=upload_session.upload_project_id,
+                asset_type=AssetTypeEnum.FILE_.value,
+                asset_name=file_id,
+                asset_size=file_size,
+                asset_hash=file_hash,
+            )
+        )
+    except Exception as e:
+        logger.error(f"Error while completing upload {upload_id}: {e}")
+
+        # the parts are kept: drop the assembled file and the project file,
+        # so the commit can be retried
+        retry_status = UploadStatusEnum.UPLOADING.value
+        try:
+            data_controller.discard_upload(temp_path=assembly_path, file_path=file_path)
+        except Exception as discard_error:
+            logger.error(f"Error while discarding upload {upload_id}: {discard_error}")
+            retry_status = UploadStatusEnum.FAILED.value
+
+        await upload_model.set_upload_status(
+            upload_id=upload_session.id,
+            from_status=UploadStatusEnum.COMMITTING.value,
+            to_status=retry_status,
+        )
+        return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,content={"Signals":ResponseSignal.FILE_NOT_SAVED.value})
+
+    try:
+        data_controller.remove_upload_files(upload_id=str(upload_session.id))
+    except Exception as e:
+        logger.error(f"Error while removing the parts of upload {upload_id}: {e}")
+
+    await upload_model.set_upload_status(
+        upload_id=upload_session.id,
+        from_status=UploadStatusEnum.COMMITTING.value,
+        to_status=UploadStatusEnum.COMPLETED.value,
+        asset_id=asset_record.id,
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "Signals":ResponseSignal.FILE_UPLOADED_SUCCESSFULLY.value,
+            "file_id": str(asset_record.id),
+            "file_name": asset_record.asset_name,
+            }
+        )
+
+
 # For process the file content and get content
 @data_router.get("/process/{project_id}")
-async def process_endpoint(request:Request,project_id:str, proecess_request:ProcessingRequest):
+async def process_endpoint(request:Request,project_id:str, proecess_request:ProcessingRequest,
+                           project_model:ProjectModel = Depends(get_project_model),
+                           asset_model:AssetModel = Depends(get_asset_model),
+                           chunk_model:ChunkModel = Depends(get_chunk_model)):
     file_id = proecess_request.file_id
     chunk_size = proecess_request.chunk_size
     overlap_size = proecess_request.overlap_size
     do_reset = proecess_request.do_reset
 
 
-    project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client
-        )
-
     project = await project_model.get_project_or_create_one(project_id=project_id)
-    asset_model = await AssetModel.create_instance(
-        db_client=request.app.db_client
-        )
 
-    project_files_ids={}
+    project_assets=[]
 
     # if file_id is provided and send by user
     # we need to process that file only
     if proecess_request.file_id:
         asset_record = await asset_model.get_asset_record(
             asset_project_id=project.id,
-            asset_name=proecess_request.file_id
+            asset_name=proecess_request.file_id,
+            lean=True,
             )
 
         if asset_record is None:
             return JSONResponse(status_code=status.HTTP_404_NOT_FOUND,content={"Signals":ResponseSignal.FILE_ID_NOT_FOUND.value})
        
-        project_files_ids = {
-            asset_record.id: asset_record.asset_name
-        }
+        project_assets = [asset_record]
     
     # if file_id is not provided 
     # we need to get all files in the project
     # and process them
     else:
         # get the file project indexes
-        project_files  = await asset_model.get_all_projects(
+        async for project_files in asset_model.iter_project_assets(
             asset_project_id=project.id,
-            asset_type=AssetTypeEnum.FILE_.value
-            )
-        project_files_ids = {
-            record.id: record.asset_name
-            for record in project_files
-        }
+            asset_type=AssetTypeEnum.FILE_.value,
+            lean=True,
+            ):
+            project_assets.extend(project_files)
 
-        if len(project_files_ids)==0:
+        if len(project_assets)==0:
             return JSONResponse(status_code=status.HTTP_404_NOT_FOUND,content={"Signals":ResponseSignal.NO_FILE_FOUND_IN_PROJECT.value})
 
 
@@ -150,52 +666,40 @@ async def process_endpoint(request:Request,project_id:str, proecess_request:Proc
 
     
 
-    # create chunk model
-    chunk_model = await ChunkModel.create_instance(db_client=request.app.db_client)
-
     # delete old chunks if do_reset is True
     if do_reset:
         await chunk_model.delete_chunks_by_project_id(project_id=project.id)
 
-    no_records=0
-    no_files=0
+    # skip the files whose content and processing settings did not change
+    # since their chunks were stored
+    project_files_ids, asset_configs, skipped_files = await process_controller.select_changed_assets(
+        assets=project_assets,
+        asset_model=asset_model,
+        chunk_size=chunk_size,
+        overlap_size=overlap_size,
+        process_pool=request.app.process_pool,
+        do_reset=bool(do_reset),
+    )
+
     # process each file (one by one file) from files that in project_files_ids
     # by chunking the file content
     # and store the chunks in the database
     # with also count no_chunks, no_files
-    for asset_id, file_id in project_files_ids.items():
-        # get file content
-        file_content = process_controller.get_file_content(file_id=file_id)
+    process_result = await process_controller.process_files(
+        project=project,
+        project_files_ids=project_files_ids,
+        chunk_model=chunk_model,
+        chunk_size=chunk_size,
+        overlap_size=overlap_size,
+        process_pool=request.app.process_pool,
+        asset_model=asset_model,
+        asset_configs=asset_configs,
+    )
 
-        if file_content is None:
-            logger.error(f"Error while processing file {file_id}")
-            continue
-       
-        file_chunks = process_controller.process_file_content(
-            file_content=file_content,
-            file_id=file_id,
-            chunk_size=chunk_size,
-            overlap_size=overlap_size
-        )
-        if file_chunks is None or len(file_chunks) == 0:
-            return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST,content={"Signals":ResponseSignal.PROCESSING_FAILED.value})
-
-
-        file_chunks_records = [
-            DataChunk(
-                project_id=project_id,
-                chunk_text=chunk.page_content,
-                chunk_metadata=chunk.metadata,
-                chunk_order=chunk_index+1,
-                chunk_project_id=project.id,
-                chunk_asset_id=asset_id
-            )
-            for chunk_index, chunk in enumerate(file_chunks)
-        ]
-        
-        no_records += await chunk_model.insert_many_chunks(chunks=file_chunks_records)
-        no_files += 1
+    if process_result is None:
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST,content={"Signals":ResponseSignal.PROCESSING_FAILED.value})
 
+    no_records, no_files = process_result
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -203,5 +707,6 @@ async def process_endpoint(request:Request,project_id:str, proecess_request:Proc
             "Signals":ResponseSignal.PROCESSING_SUCCESSFULLY.value,
             "inserted_chunks":no_records,
             "processed_files":no_files,
+            "skipped_files":skipped_files,
             }
         )
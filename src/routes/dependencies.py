@@ -0,0 +1,40 @@
+"""
+FastAPI dependencies returning the app-scoped models and controllers.
+
+They are created once at startup (see main.py), so the requests do not
+build new instances or run collection checks before their own work.
+"""
+from fastapi import Request
+from models.ProjectModel import ProjectModel
+from models.AssetModel import AssetModel
+from models.ChunkModel import ChunkModel
+from models.UploadSessionModel import UploadSessionModel
+from controllers import DataController, NLPController, JobController
+
+
+def get_project_model(request: Request) -> ProjectModel:
+    return request.app.project_model
+
+
+def get_asset_model(request: Request) -> AssetModel:
+    return request.app.asset_model
+
+
+def get_chunk_model(request: Request) -> ChunkModel:
+    return request.app.chunk_model
+
+
+def get_upload_session_model(request: Request) -> UploadSessionModel:
+    return request.app.upload_session_model
+
+
+def get_data_controller(request: Request) -> DataController:
+    return request.app.data_controller
+
+
+def get_nlp_controller(request: Request) -> NLPController:
+    return request.app.nlp_controller
+
+
+def get_job_controller(request: Request) -> JobController:
+    return request.app.job_controller
@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Depends, status, Request
+from fastapi.responses import JSONResponse
+from .schemes.data import ProcessingRequest
+from .schemes.nlp import PushRequest
+from models.ProjectModel import ProjectModel
+from models.db_schemas import Job
+from models import ResponseSignal, JobTypeEnum
+from controllers import JobController
+from .dependencies import get_project_model, get_job_controller
+import logging
+
+logger = logging.getLogger("uvicorn.error")
+
+jobs_router = APIRouter(
+    prefix="/api/v1/jobs",
+    tags=["api_v1","jobs"]
+)
+
+
+def serialize_job(job: Job):
+    return {
+        "job_id": str(job.id),
+        "project_id": job.project_id,
+        "job_type": job.job_type,
+        "job_status": job.job_status,
+        "job_progress": job.job_progress,
+        "job_error": job.job_error,
+        "job_created_at": job.job_created_at.isoformat(),
+        "job_updated_at": job.job_updated_at.isoformat(),
+    }
+
+
+@jobs_router.post("/process/{project_id}")
+async def submit_process_job(request:Request,project_id:str,proecess_request:ProcessingRequest,
+                            project_model:ProjectModel=Depends(get_project_model),
+                            job_controller:JobController=Depends(get_job_controller)):
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    job = await job_controller.submit(
+        project=project,
+        job_type=JobTypeEnum.PROCESS.value,
+        job_request=proecess_request.dict(),
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signals":ResponseSignal.JOB_SUBMITTED_SUCCESSFULLY.value,
+            "job_id":str(job.id),
+        }
+    )
+
+
+@jobs_router.post("/index/push/{project_id}")
+async def submit_index_job(request:Request,project_id:str,push_request:PushRequest,
+                          project_model:ProjectModel=Depends(get_project_model),
+                          job_controller:JobController=Depends(get_job_controller)):
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    job = await job_controller.submit(
+        project=project,
+        job_type=JobTypeEnum.INDEX.value,
+        job_request=push_request.dict(),
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signals":ResponseSignal.JOB_SUBMITTED_SUCCESSFULLY.value,
+            "job_id":str(job.id),
+        }
+    )
+
+
+@jobs_router.get("/{job_id}")
+async def get_job_status(request:Request,job_id:str,
+                         job_controller:JobController=Depends(get_job_controller)):
+    job = await job_controller.get_job(job_id=job_id)
+
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signals":ResponseSignal.JOB_NOT_FOUND.value,
+            }
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signals":ResponseSignal.JOB_RETRIEVED_SUCCESSFULLY.value,
+            "job":serialize_job(job),
+        }
+    )
+
+
+@jobs_router.post("/{job_id}/cancel")
+async def cancel_job(request:Request,job_id:str,
+                     job_controller:JobController=Depends(get_job_controller)):
+    job = await job_controller.cancel(job_id=job_id)
+
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "signals":ResponseSignal.JOB_CANCEL_FAILED.value,
+            }
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signals":ResponseSignal.JOB_CANCELLED_SUCCESSFULLY.value,
+            "job":serialize_job(job),
+        }
+    )
@@ -1,10 +1,13 @@
 from fastapi import FastAPI,APIRouter,Depends,UploadFile,status, Request
 from fastapi.responses import JSONResponse
-from .schemes.nlp import PushRequest,SearchRequest
+from .schemes.nlp import PushRequest,SearchRequest,BatchSearchRequest
+from helpers.config import get_settings,Settings
 from models.ProjectModel import ProjectModel
 from models.ChunkModel import ChunkModel
 from controllers.NLPController import NLPController
+from controllers.IndexPipelineController import IndexPipelineController
 from models import ResponseSignal
+from .dependencies import get_project_model,get_chunk_model,get_nlp_controller
 import logging
 import json
 
@@ -15,68 +18,46 @@ nlp_router = APIRouter(
     tags=["api_v1","nlp"]
 )
 
+def get_search_filters(nlp_controller:NLPController,search_request:SearchRequest):
+    if search_request.filters is None:
+        return None
+    return nlp_controller.get_search_filters(**search_request.filters.dict())
+
 
 
 @nlp_router.post("/index/push/{project_id}")
-async def index_project(request:Request,project_id:str,push_request:PushRequest):
+async def index_project(request:Request,project_id:str,push_request:PushRequest,
+                        project_model:ProjectModel=Depends(get_project_model),
+                        chunk_model:ChunkModel=Depends(get_chunk_model),
+                        nlp_controller:NLPController=Depends(get_nlp_controller)):
     print("in index push")
-    project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client
-        )
-
     project = await project_model.get_project_or_create_one(project_id=project_id)
     
-    chunk_model = await ChunkModel.create_instance(
-        db_client=request.app.db_client
-    )
-    
     if not project:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content=ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
         )
 
-    nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
+    # read, embed and upsert run as concurrent stages
+    index_pipeline = IndexPipelineController(
+        nlp_controller=nlp_controller,
+        chunk_model=chunk_model,
     )
 
-    has_record = True
-    page_no = 1
-    inserted_items_count=0
-    idx =0
-
-    while has_record:
-        page_chunks = await chunk_model.get_project_chunks(project_id=project.id,page_no=page_no)
-        if len(page_chunks):
-            page_no +=1
-
-        if not page_chunks or len(page_chunks) == 0:
-            has_record = False
-            break
-
-        chunks_ids = list(range(idx,idx+len(page_chunks)))
-        idx+=len(page_chunks)
+    inserted_items_count = await index_pipeline.index_project(
+        project=project,
+        do_reset=push_request.do_reset,
+    )
 
-        is_inserted =nlp_controller.index_into_vector_db(
-            project=project,
-            chunks=page_chunks,
-            do_reset=push_request.do_reset,
-            chunks_ids=chunks_ids
+    if inserted_items_count is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signals":ResponseSignal.INSERT_INTO_VECTORDB_FAILED.value,
+            }
         )
 
-        if not is_inserted:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "signals":ResponseSignal.INSERT_INTO_VECTORDB_FAILED.value,
-                }
-            )
-        inserted_items_count+=len(page_chunks)
-
-
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
@@ -87,32 +68,19 @@ async def index_project(request:Request,project_id:str,push_request:PushRequest)
 
 
 @nlp_router.post("/index/info/{project_id}")
-async def get_project_info(request:Request,project_id:str):
+async def get_project_info(request:Request,project_id:str,
+                           project_model:ProjectModel=Depends(get_project_model),
+                           nlp_controller:NLPController=Depends(get_nlp_controller)):
     print("in get project info")
-    project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client
-        )
-
     project = await project_model.get_project_or_create_one(project_id=project_id)
     
-    chunk_model = await ChunkModel.create_instance(
-        db_client=request.app.db_client
-    )
-    
     if not project:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content=ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
         )
 
-    nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
-    )
-
-    collection_info = nlp_controller.get_vector_db_collection_info(project=project)
+    collection_info = await nlp_controller.get_vector_db_collection_info(project=project)
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
@@ -123,12 +91,10 @@ async def get_project_info(request:Request,project_id:str):
 
 
 @nlp_router.post("/index/search/{project_id}")
-async def search_index(request:Request,project_id:str,search_request:SearchRequest):
+async def search_index(request:Request,project_id:str,search_request:SearchRequest,
+                       project_model:ProjectModel=Depends(get_project_model),
+                       nlp_controller:NLPController=Depends(get_nlp_controller)):
     print("in search project")
-    project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client
-        )
-
     project = await project_model.get_project_or_create_one(project_id=project_id)
     
     if not project:
@@ -137,17 +103,11 @@ async def search_index(request:Request,project_id:str,search_request:SearchReque
             content=ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
         )
 
-    nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
-    )
-
-    results = nlp_controller.search_vector_db_collection(
+    results = await nlp_controller.search_vector_db_collection(
         project=project,
         text=search_request.text,
         limit=search_request.limit,
+        filters=get_search_filters(nlp_controller,search_request),
     )
 
     if not results:
@@ -165,31 +125,71 @@ async def search_index(request:Request,project_id:str,search_request:SearchReque
     )
 
 
-@nlp_router.post("/index/answer/{project_id}")
-async def answer_rag(request:Request,project_id:str,search_request:SearchRequest):
-    project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client
-    )
+@nlp_router.post("/index/search/batch/{project_id}")
+async def search_index_batch(request:Request,project_id:str,search_request:BatchSearchRequest,
+                             app_settings:Settings=Depends(get_settings),
+                             project_model:ProjectModel=Depends(get_project_model),
+                             nlp_controller:NLPController=Depends(get_nlp_controller)):
+    if len(search_request.queries) > app_settings.VECTOR_DB_SEARCH_BATCH_MAX_QUERIES:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signals":ResponseSignal.SEARCH_BATCH_TOO_MANY_QUERIES.value,
+            }
+        )
 
     project = await project_model.get_project_or_create_one(project_id=project_id)
-    
+
     if not project:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content=ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
         )
 
-    nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
+    results = []
+    if search_request.queries:
+        results = await nlp_controller.search_vector_db_collection_batch(
+            project=project,
+            texts=[query.text for query in search_request.queries],
+            limits=[query.limit for query in search_request.queries],
+            filters=[get_search_filters(nlp_controller,query) for query in search_request.queries],
+        )
+
+    if results is False:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content=ResponseSignal.SEARCH_VECTORDB_FAILED.value
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signals":ResponseSignal.SEARCH_VECTORDB_SUCCESSFULLY.value,
+            "results":[
+                [result.dict() for result in query_results]
+                for query_results in results
+            ]
+        }
     )
 
-    answer, full_prompt, chat_history = nlp_controller.answer_rag_question(
+
+@nlp_router.post("/index/answer/{project_id}")
+async def answer_rag(request:Request,project_id:str,search_request:SearchRequest,
+                     project_model:ProjectModel=Depends(get_project_model),
+                     nlp_controller:NLPController=Depends(get_nlp_controller)):
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+    
+    if not project:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content=ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+        )
+
+    answer, full_prompt, chat_history = await nlp_controller.answer_rag_question(
         project=project,
         query=search_request.text,
         limit=search_request.limit,
+        filters=get_search_filters(nlp_controller,search_request),
     )
 
     if not answer:
@@ -207,3 +207,24 @@ async def answer_rag(request:Request,project_id:str,search_request:SearchRequest
             "chat_history":chat_history
         }
     )
+
+
+@nlp_router.get("/embedding/cache/info")
+async def get_embedding_cache_info(request:Request):
+    embedding_cache = request.app.embedding_cache
+
+    if not embedding_cache:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signals":ResponseSignal.EMBEDDING_CACHE_DISABLED.value,
+            }
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signals":ResponseSignal.EMBEDDING_CACHE_INFO_RETRIEVED_SUCCESSFULLY.value,
+            "cache_info":embedding_cache.get_stats()
+        }
+    )
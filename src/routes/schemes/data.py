@@ -8,3 +8,7 @@ class ProcessingRequest(BaseModel):
     reset :Optional[int] = 0
     do_reset: Optional[int] =0
 
+class UploadSessionRequest(BaseModel):
+    file_name: str
+    content_type: str
+    file_size: int
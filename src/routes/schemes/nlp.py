@@ -1,9 +1,22 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 
 class PushRequest(BaseModel):
     do_reset: Optional[int] = 0
 
+class SearchFilter(BaseModel):
+    # ids of the uploaded files (assets) to search in
+    file_ids: Optional[List[str]] = None
+    # inclusive page range
+    page_from: Optional[int] = None
+    page_to: Optional[int] = None
+    # exact values of chunk metadata keys, e.g. {"author": "..."}
+    metadata: Optional[dict] = None
+
 class SearchRequest(BaseModel):
     text: str
     limit: Optional[int] = 5
+    filters: Optional[SearchFilter] = None
+
+class BatchSearchRequest(BaseModel):
+    queries: List[SearchRequest]
@@ -11,9 +11,9 @@ class OpenAIEnums(Enum):
     ASSISTANT = "assistant"
 
 class CohereEnums(Enum):
-    SYSTEM = "SYSTEM"
-    USER = "USER"
-    ASSISTANT = "CHATBOT"
+    SYSTEM = "system"
+    USER = "user"
+    ASSISTANT = "assistant"
 
     DOCUMENT= "search_document"
     QUERY= "search_query"
@@ -4,7 +4,7 @@ class LLMInterface(ABC):
     @abstractmethod
     def set_generation_model(self,model_id:str):
         pass
-    
+
     @abstractmethod
     def set_embedding_model(self, model_id: str, embedding_size: int):
         pass
@@ -17,8 +17,54 @@ class LLMInterface(ABC):
     def embed_text(self,document_type:str,document_content:str=None):
         pass
 
+    @abstractmethod
+    def embed_texts(self,texts:list,document_type:str):
+        pass
+
+    @abstractmethod
+    async def agenerate_text(self,prompt:str,chat_history:list=[],max_output_tokens:int=None,temperature:float=None):
+        pass
+
+    @abstractmethod
+    async def aembed_text(self,document_type:str,document_content:str=None):
+        pass
+
+    @abstractmethod
+    async def aembed_texts(self,texts:list,document_type:str):
+        pass
+
     @abstractmethod
     def construct_prompt(self,prompt:str,role:str):
         pass
 
-    
+    def split_embedding_batches(self,texts:list,batch_size:int,max_batch_characters:int=None):
+        """
+        Split texts into batches that respect the provider limits.
+
+        A batch is closed when it reaches `batch_size` items or when adding
+        the next text would exceed `max_batch_characters` (a cheap proxy for
+        the provider token limit per request).
+        """
+        batches = []
+        current_batch = []
+        current_characters = 0
+
+        for text in texts:
+            text_characters = len(text)
+            if current_batch and (
+                len(current_batch) >= batch_size or
+                (max_batch_characters and current_characters + text_characters > max_batch_characters)
+            ):
+                batches.append(current_batch)
+                current_batch = []
+                current_characters = 0
+
+            current_batch.append(text)
+            current_characters += text_characters
+
+        if current_batch:
+            batches.append(current_batch)
+
+        return batches
+
+
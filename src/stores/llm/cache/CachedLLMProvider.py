@@ -0,0 +1,123 @@
+import asyncio
+from ..LLMInterface import LLMInterface
+from .EmbeddingCache import EmbeddingCache
+
+
+class CachedLLMProvider(LLMInterface):
+    """
+    Wraps an LLM provider and serves embeddings from an EmbeddingCache.
+
+    Generation and every other attribute are delegated to the wrapped provider,
+    so the wrapper can replace the embedding client transparently.
+    """
+
+    def __init__(self, provider: LLMInterface, provider_name: str, cache: EmbeddingCache):
+        self.provider = provider
+        self.provider_name = provider_name
+        self.cache = cache
+
+    def __getattr__(self, name):
+        # only called for attributes the wrapper does not define itself
+        return getattr(self.provider, name)
+
+    def set_generation_model(self, model_id: str):
+        self.provider.set_generation_model(model_id=model_id)
+
+    def set_embedding_model(self, embedding_model_id: str, embedding_size: int):
+        self.provider.set_embedding_model(embedding_model_id=embedding_model_id,
+                                          embedding_size=embedding_size)
+
+    def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None, temperature: float = None):
+        return self.provider.generate_text(prompt=prompt, chat_history=chat_history,
+                                           max_output_tokens=max_output_tokens,
+                                           temperature=temperature)
+
+    async def agenerate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None, temperature: float = None):
+        return await self.provider.agenerate_text(prompt=prompt, chat_history=chat_history,
+                                                  max_output_tokens=max_output_tokens,
+                                                  temperature=temperature)
+
+    def construct_prompt(self, prompt: str, role: str):
+        return self.provider.construct_prompt(prompt=prompt, role=role)
+
+    def get_cache_key(self, text: str, document_type: str):
+        return self.cache.build_key(provider=self.provider_name,
+                                    model_id=self.provider.embedding_model_id,
+                                    document_type=document_type,
+                                    text=text)
+
+    def embed_text(self, document_type: str, document_content: str = None):
+        cache_key = self.get_cache_key(text=document_content, document_type=document_type)
+
+        cached = self.cache.get_many([cache_key])
+        if cache_key in cached:
+            return cached[cache_key]
+
+        vector = self.provider.embed_text(document_type=document_type,
+                                          document_content=document_content)
+        if vector:
+            self.cache.put_many({cache_key: vector})
+
+        return vector
+
+    def embed_texts(self, texts: list, document_type: str):
+        cache_keys = [self.get_cache_key(text=text, document_type=document_type) for text in texts]
+        cached = self.cache.get_many(cache_keys)
+
+        # embed each missing text once, even if it is repeated in the batch
+        missing = {}
+        for cache_key, text in zip(cache_keys, texts):
+            if cache_key not in cached and cache_key not in missing:
+                missing[cache_key] = text
+
+        if missing:
+            vectors = self.provider.embed_texts(texts=list(missing.values()),
+                                                document_type=document_type)
+            if not vectors or len(vectors) != len(missing):
+                return None
+
+            new_items = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(new_items)
+            cached.update(new_items)
+
+        return [cached[cache_key] for cache_key in cache_keys]
+
+    async def run_cache(self, cache_method, *args):
+        # the SQLite calls block (lock, reads, commits and evictions), so
+        # they run in a thread and not on the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, cache_method, *args)
+
+    async def aembed_text(self, document_type: str, document_content: str = None):
+        cache_key = self.get_cache_key(text=document_content, document_type=document_type)
+
+        cached = await self.run_cache(self.cache.get_many, [cache_key])
+        if cache_key in cached:
+            return cached[cache_key]
+
+        vector = await self.provider.aembed_text(document_type=document_type,
+                                                 document_content=document_content)
+        if vector:
+            await self.run_cache(self.cache.put_many, {cache_key: vector})
+
+        return vector
+
+    async def aembed_texts(self, texts: list, document_type: str):
+        cache_keys = [self.get_cache_key(text=text, document_type=document_type) for text in texts]
+        cached = await self.run_cache(self.cache.get_many, cache_keys)
+
+        missing = {}
+        for cache_key, text in zip(cache_keys, texts):
+            if cache_key not in cached and cache_key not in missing:
+                missing[cache_key] = text
+
+        if missing:
+            vectors = await self.provider.aembed_texts(texts=list(missing.values()),
+                                                       document_type=document_type)
+            if not vectors or len(vectors) != len(missing):
+                return None
+
+            new_items = dict(zip(missing.keys(), vectors))
+            await self.run_cache(self.cache.put_many, new_items)
+            cached.update(new_items)
+
+        return [cached[cache_key] for cache_key in cache_keys]
@@ -0,0 +1,168 @@
+from array import array
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache backed by SQLite.
+
+    Entries are keyed by (provider, embedding model, document type, text hash)
+    so an unchanged chunk or a repeated query is only embedded once.
+    The cache is bounded by `max_entries` and evicts the least recently
+    used vectors first.
+
+    Lookups only read: the access times of the hits are kept in memory and
+    written in one batch by the next put, or once `access_flush_size` of
+    them are pending, so a cached query does not commit a write.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 500000,
+                 db_file_name: str = "embeddings.sqlite3",
+                 access_flush_size: int = 1000):
+        self.db_file = os.path.join(db_path, db_file_name)
+        self.max_entries = max_entries
+        self.access_flush_size = access_flush_size
+
+        # cache_key -> last access time not written yet
+        self.pending_access = {}
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        self.connection = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "cache_key TEXT PRIMARY KEY, "
+            "vector BLOB NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_access_idx ON embeddings (last_access)"
+        )
+        self.connection.commit()
+
+        self.size = self.connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def build_key(provider: str, model_id: str, document_type: str, text: str):
+        text_hash = hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+        return f"{provider}:{model_id}:{document_type}:{text_hash}"
+
+    def get_many(self, keys: list):
+        """
+        Returns a dict {key: vector} for the keys found in the cache.
+        """
+        if not keys:
+            return {}
+
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self.lock:
+            # stay below the sqlite bound variables limit
+            for i in range(0, len(unique_keys), 500):
+                batch_keys = unique_keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch_keys))
+                rows = self.connection.execute(
+                    f"SELECT cache_key, vector FROM embeddings WHERE cache_key IN ({placeholders})",
+                    batch_keys
+                ).fetchall()
+
+                for cache_key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[cache_key] = vector.tolist()
+
+            if found:
+                now = time.time()
+                self.pending_access.update(dict.fromkeys(found, now))
+                if len(self.pending_access) >= self.access_flush_size:
+                    self.flush_access()
+                    self.connection.commit()
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        return found
+
+    def put_many(self, items: dict):
+        """
+        Stores {key: vector} items and evicts the least recently used
+        entries when the cache grows past max_entries.
+        """
+        if not items:
+            return
+
+        now = time.time()
+        rows = [
+            (cache_key, array("f", vector).tobytes(), now)
+            for cache_key, vector in items.items()
+            if vector
+        ]
+
+        with self.lock:
+            # the evictions below need the recent accesses
+            self.flush_access()
+
+            cursor = self.connection.executemany(
+                "INSERT OR IGNORE INTO embeddings (cache_key, vector, last_access) VALUES (?, ?, ?)",
+                rows
+            )
+            self.size += max(cursor.rowcount, 0)
+
+            if self.max_entries and self.size > self.max_entries:
+                # evict a little more than needed so we do not evict on every put
+                evict_count = self.size - self.max_entries + max(self.max_entries // 100, 1)
+                cursor = self.connection.execute(
+                    "DELETE FROM embeddings WHERE cache_key IN ("
+                    "SELECT cache_key FROM embeddings ORDER BY last_access LIMIT ?)",
+                    (evict_count,)
+                )
+                self.size -= cursor.rowcount
+                self.evictions += cursor.rowcount
+
+            self.connection.commit()
+
+    def flush_access(self):
+        """
+        Write the pending access times, without committing. Called with
+        the lock held.
+        """
+        if not self.pending_access:
+            return
+
+        self.connection.executemany(
+            "UPDATE embeddings SET last_access = ? WHERE cache_key = ?",
+            [(accessed_at, cache_key) for cache_key, accessed_at in self.pending_access.items()]
+        )
+        self.pending_access.clear()
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": self.size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self.lock:
+            self.flush_access()
+            self.connection.commit()
+            self.connection.close()
@@ -0,0 +1,2 @@
+from .EmbeddingCache import EmbeddingCache
+from .CachedLLMProvider import CachedLLMProvider
@@ -16,6 +16,8 @@ class CoHereProvider(LLMInterface):
 
         # cohere client
         self.client = cohere.ClientV2(api_key=api_key)
+        # async client used by the a* methods so requests do not block the event loop
+        self.async_client = cohere.AsyncClientV2(api_key=api_key)
 
         # default values for generation
         self.default_input_max_characters = default_input_max_characters
@@ -29,6 +31,9 @@ class CoHereProvider(LLMInterface):
         self.embedding_model_id = None
         self.embedding_size=None
 
+        # embedding batch limit (max texts per embed call)
+        self.embedding_batch_size = 96
+
         self.enums = CohereEnums
 
         # logger
@@ -58,20 +63,22 @@ class CoHereProvider(LLMInterface):
             self.construct_prompt(prompt=prompt,role=self.enums.USER.value)
         )
 
-        # call the cohere api
+        # call the cohere api (v2 chat takes the whole conversation as messages)
     
         response = self.client.chat(
             model=self.generation_model_id,
-            chat_history=chat_history,
-            message = self.process_text(prompt),
+            messages=chat_history,
             max_tokens=max_output_tokens,
             temperature=temperature
         )
-        if not response or not response.text:
+        return self.get_response_text(response)
+
+    def get_response_text(self,response):
+        if not response or not response.message or not response.message.content:
             self.logger.error("No response from Cohere")
             return None
 
-        return response.text
+        return response.message.content[0].text
     
     def embed_text(self,document_type:str,document_content:str=None):
         if not self.client:
@@ -100,7 +107,100 @@ class CoHereProvider(LLMInterface):
             self.logger.error("No response from Cohere")
             return None
         return response.embeddings.float[0]
-        
+
+    def embed_texts(self,texts:list,document_type:str):
+        if not self.client:
+            self.logger.error("Cohere client is not initialized")
+            raise Exception("Cohere client is not initialized")
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model is not set")
+            raise Exception("Embedding model is not set")
+
+        input_type = self.enums.DOCUMENT.value
+        if document_type==DocumentTypeEnum.QUERY.value:
+            input_type = self.enums.QUERY.value
+
+        vectors = []
+        # texts are truncated by process_text, so the count is the only limit
+        batches = self.split_embedding_batches(texts=[self.process_text(text) for text in texts],
+                                               batch_size=self.embedding_batch_size)
+        for batch in batches:
+            response = self.client.embed(
+                model=self.embedding_model_id,
+                texts=batch,
+                input_type=input_type,
+                embedding_types=['float']
+            )
+
+            if not response or not response.embeddings or not response.embeddings.float:
+                self.logger.error("No response from Cohere")
+                return None
+            vectors.extend(response.embeddings.float)
+
+        return vectors
+
+    async def agenerate_text(self,prompt:str,chat_history:list=[],max_output_tokens:int=None,temperature:float=None):
+        if not self.async_client:
+            self.logger.error("Cohere async client is not initialized")
+            raise Exception("Cohere async client is not initialized")
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model is not set")
+            raise Exception("Generation model is not set")
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_characters
+        temperature = temperature if temperature else self.default_temperature
+
+        chat_history.append(
+            self.construct_prompt(prompt=prompt,role=self.enums.USER.value)
+        )
+
+        response = await self.async_client.chat(
+            model=self.generation_model_id,
+            messages=chat_history,
+            max_tokens=max_output_tokens,
+            temperature=temperature
+        )
+        return self.get_response_text(response)
+
+    async def aembed_text(self,document_type:str,document_content:str=None):
+        vectors = await self.aembed_texts(texts=[document_content],document_type=document_type)
+        if not vectors:
+            return None
+        return vectors[0]
+
+    async def aembed_texts(self,texts:list,document_type:str):
+        if not self.async_client:
+            self.logger.error("Cohere async client is not initialized")
+            raise Exception("Cohere async client is not initialized")
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model is not set")
+            raise Exception("Embedding model is not set")
+
+        input_type = self.enums.DOCUMENT.value
+        if document_type==DocumentTypeEnum.QUERY.value:
+            input_type = self.enums.QUERY.value
+
+        vectors = []
+        batches = self.split_embedding_batches(texts=[self.process_text(text) for text in texts],
+                                               batch_size=self.embedding_batch_size)
+        for batch in batches:
+            response = await self.async_client.embed(
+                model=self.embedding_model_id,
+                texts=batch,
+                input_type=input_type,
+                embedding_types=['float']
+            )
+
+            if not response or not response.embeddings or not response.embeddings.float:
+                self.logger.error("No response from Cohere")
+                return None
+            vectors.extend(response.embeddings.float)
+
+        return vectors
+
 
     def construct_prompt(self,prompt:str,role:str):
         return {
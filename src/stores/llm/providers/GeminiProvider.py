@@ -29,6 +29,10 @@ class GeminiProvider(LLMInterface):
         self.embedding_model_id = None
         self.embedding_size=None
 
+        # embedding batch limits (max contents per request, characters per request)
+        self.embedding_batch_size = 100
+        self.embedding_max_batch_characters = 200000
+
         self.enums = GeminiEnums
         # logger
         self.logger = logging.getLogger(__name__)
@@ -52,6 +56,43 @@ class GeminiProvider(LLMInterface):
             self.logger.error("Generation model is not set")
             raise Exception("Generation model is not set")
 
+        formatted_contents, config = self.build_generation_request(prompt=prompt,
+                                                                   chat_history=chat_history,
+                                                                   max_output_tokens=max_output_tokens,
+                                                                   temperature=temperature)
+
+        response = self.client.models.generate_content(
+                model=self.generation_model_id,
+                contents=formatted_contents,
+                config=config
+            )
+
+        return self.get_response_text(response)
+
+    async def agenerate_text(self,prompt:str,chat_history:list=[],max_output_tokens:int=None,temperature:float=None):
+        if not self.client:
+            self.logger.error("Gemini client is not initialized")
+            raise Exception("Gemini client is not initialized")
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model is not set")
+            raise Exception("Generation model is not set")
+
+        formatted_contents, config = self.build_generation_request(prompt=prompt,
+                                                                   chat_history=chat_history,
+                                                                   max_output_tokens=max_output_tokens,
+                                                                   temperature=temperature)
+
+        # client.aio exposes the same api on top of the async transport
+        response = await self.client.aio.models.generate_content(
+                model=self.generation_model_id,
+                contents=formatted_contents,
+                config=config
+            )
+
+        return self.get_response_text(response)
+
+    def build_generation_request(self,prompt:str,chat_history:list,max_output_tokens:int=None,temperature:float=None):
         max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_characters
         temperature = temperature if temperature else self.default_temperature
         
@@ -88,16 +129,15 @@ class GeminiProvider(LLMInterface):
             "parts": [{"text": self.process_text(prompt)}]
         })
 
-        response = self.client.models.generate_content(
-                model=self.generation_model_id,
-                contents=formatted_contents,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction_text,
-                    temperature=temperature,
-                    max_output_tokens=max_output_tokens
-                )
-            )
+        config = types.GenerateContentConfig(
+            system_instruction=system_instruction_text,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens
+        )
 
+        return formatted_contents, config
+
+    def get_response_text(self,response):
         if not response or not response.candidates or len(response.candidates)==0 or not response.candidates[0].content or not response.candidates[0].content.parts or len(response.candidates[0].content.parts)==0:
             self.logger.error("No response from Gemini")
             return None
@@ -126,12 +166,80 @@ class GeminiProvider(LLMInterface):
             )
 
             # Return numeric embedding array
-            return result.embeddings
+            return result.embeddings[0].values
 
         except Exception as e:
             self.logger.error(f"Error embedding text: {e}")
             return None
 
+    def embed_texts(self,texts:list,document_type:str):
+
+        if not self.embedding_model_id:
+            raise Exception("Embedding model is not set")
+
+        task_type = types.EmbedContentConfig.TaskType.RETRIEVAL_DOCUMENT
+        if document_type == DocumentTypeEnum.QUERY.value:
+            task_type = types.EmbedContentConfig.TaskType.RETRIEVAL_QUERY
+
+        vectors = []
+        batches = self.split_embedding_batches(texts=[text.strip() for text in texts],
+                                               batch_size=self.embedding_batch_size,
+                                               max_batch_characters=self.embedding_max_batch_characters)
+        for batch in batches:
+            try:
+                result = self.client.models.embed_content(
+                    model=self.embedding_model_id,
+                    contents=batch,
+                    config=types.EmbedContentConfig(
+                        task_type=task_type
+                    )
+                )
+            except Exception as e:
+                self.logger.error(f"Error embedding texts: {e}")
+                return None
+
+            vectors.extend(embedding.values for embedding in result.embeddings)
+
+        return vectors
+
+    async def aembed_text(self,
+                          document_type: str,
+                          document_content: str = None):
+        vectors = await self.aembed_texts(texts=[document_content],document_type=document_type)
+        if not vectors:
+            return None
+        return vectors[0]
+
+    async def aembed_texts(self,texts:list,document_type:str):
+
+        if not self.embedding_model_id:
+            raise Exception("Embedding model is not set")
+
+        task_type = types.EmbedContentConfig.TaskType.RETRIEVAL_DOCUMENT
+        if document_type == DocumentTypeEnum.QUERY.value:
+            task_type = types.EmbedContentConfig.TaskType.RETRIEVAL_QUERY
+
+        vectors = []
+        batches = self.split_embedding_batches(texts=[text.strip() for text in texts],
+                                               batch_size=self.embedding_batch_size,
+                                               max_batch_characters=self.embedding_max_batch_characters)
+        for batch in batches:
+            try:
+                result = await self.client.aio.models.embed_content(
+                    model=self.embedding_model_id,
+                    contents=batch,
+                    config=types.EmbedContentConfig(
+                        task_type=task_type
+                    )
+                )
+            except Exception as e:
+                self.logger.error(f"Error embedding texts: {e}")
+                return None
+
+            vectors.extend(embedding.values for embedding in result.embeddings)
+
+        return vectors
+
     def construct_prompt(self,prompt:str,role:str):
         # Gemini expects 'parts' instead of 'content'
         return {
@@ -1,5 +1,5 @@
 from ..LLMInterface import LLMInterface
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import logging
 from ..LLMEnums import OpenAIEnums
 
@@ -25,12 +25,21 @@ class OpenAIProvider(LLMInterface):
         self.embedding_model_id = None
         self.embedding_size=None
 
+        # embedding batch limits (inputs per request, characters as a token upper bound)
+        self.embedding_batch_size = 2048
+        self.embedding_max_batch_characters = 300000
+
         self.enums = OpenAIEnums
 
         self.client = OpenAI(api_key=api_key,
                              base_url=api_url if api_url and len(api_url) else None
                              )
 
+        # async client used by the a* methods so requests do not block the event loop
+        self.async_client = AsyncOpenAI(api_key=api_key,
+                                        base_url=api_url if api_url and len(api_url) else None
+                                        )
+
         self.logger = logging.getLogger(__name__)
     
 
@@ -89,7 +98,113 @@ class OpenAIProvider(LLMInterface):
         except Exception as e:
             self.logger.error(f"Error embedding text: {e}")
             raise Exception("Error embedding text")
-        
+
+    def embed_texts(self,texts:list,document_type:str):
+        if not self.client:
+            self.logger.error("OpenAI client is not initialized")
+            raise Exception("OpenAI client is not initialized")
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model is not set")
+            raise Exception("Embedding model is not set")
+
+        vectors = []
+        batches = self.split_embedding_batches(texts=texts,
+                                               batch_size=self.embedding_batch_size,
+                                               max_batch_characters=self.embedding_max_batch_characters)
+        for batch in batches:
+            try:
+                response = self.client.embeddings.create(
+                    input=batch,
+                    model=self.embedding_model_id
+                )
+            except Exception as e:
+                self.logger.error(f"Error embedding texts: {e}")
+                raise Exception("Error embedding texts")
+
+            # the api does not guarantee the order of the returned items
+            vectors.extend(
+                item.embedding for item in sorted(response.data,key=lambda item: item.index)
+            )
+
+        return vectors
+
+    async def agenerate_text(self,prompt:str,chat_history:list=[],max_output_tokens:int=None,temperature:float=None):
+        if not self.async_client:
+            self.logger.error("OpenAI async client is not initialized")
+            raise Exception("OpenAI async client is not initialized")
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model is not set")
+            raise Exception("Generation model is not set")
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_characters
+        temperature = temperature if temperature else self.default_temperature
+
+        chat_history.append(
+            self.construct_prompt(prompt=prompt,role=self.enums.USER.value)
+        )
+
+        response = await self.async_client.chat.completions.create(
+            model=self.generation_model_id,
+            messages=chat_history,
+            max_tokens=max_output_tokens,
+            temperature=temperature
+        )
+        if not response or not response.choices or len(response.choices)==0 or not response.choices[0].message:
+            self.logger.error("No response from OpenAI")
+            return None
+
+        return response.choices[0].message.content
+
+    async def aembed_text(self,document_type:str,document_content:str=None):
+        if not self.async_client:
+            self.logger.error("OpenAI async client is not initialized")
+            raise Exception("OpenAI async client is not initialized")
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model is not set")
+            raise Exception("Embedding model is not set")
+
+        try:
+            response = await self.async_client.embeddings.create(
+                input=document_content,
+                model=self.embedding_model_id
+            )
+            return response.data[0].embedding
+        except Exception as e:
+            self.logger.error(f"Error embedding text: {e}")
+            raise Exception("Error embedding text")
+
+    async def aembed_texts(self,texts:list,document_type:str):
+        if not self.async_client:
+            self.logger.error("OpenAI async client is not initialized")
+            raise Exception("OpenAI async client is not initialized")
+
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model is not set")
+            raise Exception("Embedding model is not set")
+
+        vectors = []
+        batches = self.split_embedding_batches(texts=texts,
+                                               batch_size=self.embedding_batch_size,
+                                               max_batch_characters=self.embedding_max_batch_characters)
+        for batch in batches:
+            try:
+                response = await self.async_client.embeddings.create(
+                    input=batch,
+                    model=self.embedding_model_id
+                )
+            except Exception as e:
+                self.logger.error(f"Error embedding texts: {e}")
+                raise Exception("Error embedding texts")
+
+            vectors.extend(
+                item.embedding for item in sorted(response.data,key=lambda item: item.index)
+            )
+
+        return vectors
+
     def construct_prompt(self,prompt:str,role:str):
         return {
             "role":role,
@@ -4,50 +4,101 @@ from models.db_schemas import RetrieveDocument
 
 
 class VectorDBInterface(ABC):
+    """
+    Vector DB clients are asynchronous: every call is awaited, so searches
+    and upserts never block the event loop.
+    """
 
     @abstractclassmethod
-    def connect(self):
+    async def connect(self):
         pass
 
     @abstractclassmethod
-    def disconnect(self):
+    async def disconnect(self):
         pass
 
     @abstractclassmethod
-    def is_collection_existed(self,collection_name:str)-> bool:
+    async def is_collection_existed(self,collection_name:str)-> bool:
         pass
     
     @abstractclassmethod
-    def list_all_collections(self)-> list:
+    async def list_all_collections(self)-> list:
         pass
     
     @abstractclassmethod
-    def get_collection_info(self,collection_name:str) -> dict  :
+    async def get_collection_info(self,collection_name:str) -> dict  :
         pass
     @abstractclassmethod
-    def delete_collection(self,collection_name:str) :
+    async def delete_collection(self,collection_name:str) :
         pass
     
     @abstractclassmethod
-    def create_collection(self,collection_name:str,
+    async def create_collection(self,collection_name:str,
                                 embedding_size:int,
                                 do_reset:bool = None):
         pass
 
     @abstractclassmethod
-    def insert_one(self,collection_name:str,text:str, vector: List,
+    async def insert_one(self,collection_name:str,text:str, vector: List,
                         metadata: dict =None,
                         record_id:str = None):
         pass
 
     @abstractclassmethod
-    def insert_many(self,collection_name:str,texts:List[str], 
+    async def insert_many(self,collection_name:str,texts:List[str], 
                         vectors:List,metadata:List=None,
-                        record_ids:List=None,batch_size:int=None):
+                        record_ids:List=None,batch_size:int=None,
+                        payloads:List[dict]=None,sparse_vectors:List[dict]=None):
+        """
+        `sparse_vectors` are {"indices": [...], "values": [...]} term
+        weights stored next to the dense vectors, when the collection has
+        them.
+        """
         pass
 
     @abstractclassmethod
-    def search_by_vector(self,collection_name:str,
+    async def delete_records_outside(self,collection_name:str,
+                                     field_name:str,field_values:List):
+        """
+        Delete the records whose payload `field_name` is not one of
+        `field_values` (or is missing).
+        """
+        pass
+
+    @abstractclassmethod
+    async def delete_stale_records(self,collection_name:str,
+                                   field_name:str,field_value:Any,
+                                   record_ids:List):
+        """
+        Delete the records whose payload `field_name` is `field_value`,
+        except `record_ids`.
+        """
+        pass
+
+    @abstractclassmethod
+    async def search_by_vector(self,collection_name:str,
                               vector:List,
-                              limit:int)-> List[RetrieveDocument]:
+                              limit:int,
+                              filters:dict=None,
+                              sparse_vector:dict=None)-> List[RetrieveDocument]:
+        """
+        `filters` maps payload fields to a value (exact match), a list
+        (any of the values) or a range dict with gt/gte/lt/lte keys. Nested
+        fields use dots, e.g. "metadata.author".
+
+        With a `sparse_vector`, the dense and sparse results are fused
+        (hybrid search).
+        """
+        pass
+
+    @abstractclassmethod
+    async def search_by_vectors(self,collection_name:str,
+                               vectors:List,
+                               limits:List[int],
+                               filters:List[dict]=None,
+                               sparse_vectors:List[dict]=None)-> List[List[RetrieveDocument]]:
+        """
+        Run one search per vector in a single request, returns the
+        results of each vector in order.
+        """
         pass
\ No newline at end of file
@@ -11,10 +11,21 @@ class VectorDBProviderFactory:
     
     def create(self,provider:str):
         if provider == VectorDBEnums.QDRANT.value:
-            db_path = self.base_controller.get_database_path(db_name=self.config.VECTOR_DB_PATH)
+            db_path = None
+            if not self.config.VECTOR_DB_URL:
+                # embedded storage, only for a single worker process
+                db_path = self.base_controller.get_database_path(db_name=self.config.VECTOR_DB_PATH)
+
             return QdrantDBProvider(
                 db_path=db_path,
-                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD
+                distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
+                url=self.config.VECTOR_DB_URL,
+                api_key=self.config.VECTOR_DB_API_KEY,
+                prefer_grpc=self.config.VECTOR_DB_PREFER_GRPC,
+                grpc_port=self.config.VECTOR_DB_GRPC_PORT,
+                timeout=self.config.VECTOR_DB_TIMEOUT,
+                hybrid=self.config.VECTOR_DB_HYBRID_SEARCH,
+                hybrid_prefetch_factor=self.config.VECTOR_DB_HYBRID_PREFETCH_FACTOR,
             )
 
         return None
\ No newline at end of file
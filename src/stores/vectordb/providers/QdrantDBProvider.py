@@ -1,19 +1,55 @@
-from qdrant_client import models, QdrantClient
+from qdrant_client import models, AsyncQdrantClient
 from ..VectorDBInterface import VectorDBInterface
 from ..VectorDBEnums import DistanceMethodEnums
 import logging
 from typing import List
 from models.db_schemas import RetrieveDocument
 
+# payload fields indexed in every collection
+PAYLOAD_INDEXES = {
+    "asset_id": models.PayloadSchemaType.KEYWORD,
+    "page": models.PayloadSchemaType.INTEGER,
+    "chunk_order": models.PayloadSchemaType.INTEGER,
+}
+
+# name of the BM25 sparse vector, next to the unnamed dense vector
+SPARSE_VECTOR_NAME = "bm25"
+
 
 class QdrantDBProvider(VectorDBInterface):
 
-    def __init__(self, db_path: str, distance_method: str):
+    def __init__(self, db_path: str, distance_method: str, url: str = None,
+                       api_key: str = None, prefer_grpc: bool = True,
+                       grpc_port: int = 6334, timeout: int = None,
+                       hybrid: bool = False, hybrid_prefetch_factor: int = 4):
+        """
+        Args:
+            db_path (str): Directory of the embedded storage, used when no
+                           `url` is given. It is locked by one process.
+            url (str, optional): URL of a Qdrant server (e.g.
+                                 http://localhost:6333), shared by any
+                                 number of workers and nodes.
+            prefer_grpc (bool): Talk to the server over gRPC on `grpc_port`.
+            hybrid (bool): Create collections with a BM25 sparse vector and
+                           fuse dense and sparse searches with RRF.
+            hybrid_prefetch_factor (int): Candidates fetched by each search
+                                          before the fusion, per result.
+        """
 
         self.client = None
         self.db_path = db_path
+        self.url = url
+        self.api_key = api_key
+        self.prefer_grpc = prefer_grpc
+        self.grpc_port = grpc_port
+        self.timeout = timeout
+        self.hybrid = hybrid
+        self.hybrid_prefetch_factor = hybrid_prefetch_factor
         self.distance_method = None
 
+        # collection_name -> whether it has the sparse vector
+        self.sparse_collections = {}
+
         if distance_method == DistanceMethodEnums.COSINE.value:
             self.distance_method = models.Distance.COSINE
         elif distance_method == DistanceMethodEnums.DOT.value:
@@ -21,54 +57,108 @@ class QdrantDBProvider(VectorDBInterface):
 
         self.logger = logging.getLogger(__name__)
 
-    def connect(self):
-        self.client = QdrantClient(path=self.db_path)
+    async def connect(self):
+        if self.url:
+            self.client = AsyncQdrantClient(
+                url=self.url,
+                api_key=self.api_key or None,
+                prefer_grpc=self.prefer_grpc,
+                grpc_port=self.grpc_port,
+                timeout=self.timeout,
+            )
+        else:
+            self.client = AsyncQdrantClient(path=self.db_path)
 
-    def disconnect(self):
+    async def disconnect(self):
+        if self.client is not None:
+            await self.client.close()
         self.client = None
 
-    def is_collection_existed(self, collection_name: str) -> bool:
-        return self.client.collection_exists(collection_name=collection_name)
+    async def is_collection_existed(self, collection_name: str) -> bool:
+        return await self.client.collection_exists(collection_name=collection_name)
     
-    def list_all_collections(self) -> List:
-        return self.client.get_collections()
+    async def list_all_collections(self) -> List:
+        return await self.client.get_collections()
     
-    def get_collection_info(self, collection_name: str) -> dict:
-        return self.client.get_collection(collection_name=collection_name)
+    async def get_collection_info(self, collection_name: str) -> dict:
+        return await self.client.get_collection(collection_name=collection_name)
     
-    def delete_collection(self, collection_name: str):
-        if self.is_collection_existed(collection_name):
-            return self.client.delete_collection(collection_name=collection_name)
+    async def delete_collection(self, collection_name: str):
+        self.sparse_collections.pop(collection_name, None)
+        if await self.is_collection_existed(collection_name):
+            return await self.client.delete_collection(collection_name=collection_name)
         
-    def create_collection(self, collection_name: str, 
+    async def create_collection(self, collection_name: str, 
                                 embedding_size: int,
                                 do_reset: bool = False):
         if do_reset:
-            _ = self.delete_collection(collection_name=collection_name)
+            _ = await self.delete_collection(collection_name=collection_name)
         
-        if not self.is_collection_existed(collection_name):
-            _ = self.client.create_collection(
-                collection_name=collection_name,
-                vectors_config=models.VectorParams(
-                    size=embedding_size,
-                    distance=self.distance_method
+        if not await self.is_collection_existed(collection_name):
+            try:
+                _ = await self.client.create_collection(
+                    collection_name=collection_name,
+                    vectors_config=models.VectorParams(
+                        size=embedding_size,
+                        distance=self.distance_method
+                    ),
+                    # the vector db weights the BM25 terms by their IDF
+                    sparse_vectors_config={
+                        SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)
+                    } if self.hybrid else None,
                 )
-            )
+                await self.create_payload_indexes(collection_name=collection_name)
+            except Exception:
+                # created in the meantime by another worker sharing the server
+                if await self.is_collection_existed(collection_name):
+                    return False
+                raise
 
             return True
         
         return False
+
+    async def create_payload_indexes(self, collection_name: str):
+        if not self.url:
+            # the embedded storage has no payload indexes
+            return
+
+        # filtered searches and the stale points of an asset use these fields
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            _ = await self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=field_schema,
+            )
     
-    def insert_one(self, collection_name: str, text: str, vector: list,
+    async def has_sparse_vectors(self, collection_name: str):
+        """
+        Collections created before hybrid search, or with it disabled, only
+        have the dense vector.
+        """
+        if collection_name not in self.sparse_collections:
+            collection_info = await self.client.get_collection(collection_name=collection_name)
+            sparse_vectors = collection_info.config.params.sparse_vectors or {}
+            self.sparse_collections[collection_name] = SPARSE_VECTOR_NAME in sparse_vectors
+
+        return self.sparse_collections[collection_name]
+
+    def get_point_vector(self, vector: list, sparse_vector: dict = None):
+        if not sparse_vector or not sparse_vector["indices"]:
+            return vector
+
+        return {"": vector, SPARSE_VECTOR_NAME: models.SparseVector(**sparse_vector)}
+
+    async def insert_one(self, collection_name: str, text: str, vector: list,
                          metadata: dict = None, 
                          record_id: str = None):
         
-        if not self.is_collection_existed(collection_name):
+        if not await self.is_collection_existed(collection_name):
             self.logger.error(f"Can not insert new record to non-existed collection: {collection_name}")
             return False
         
         try:
-            _ = self.client.upsert(
+            _ = await self.client.upsert(
                 collection_name=collection_name,
                 points=[
                     models.PointStruct(
@@ -86,13 +176,20 @@ class QdrantDBProvider(VectorDBInterface):
 
         return True
     
-    def insert_many(self, collection_name: str, texts: list, 
+    async def insert_many(self, collection_name: str, texts: list, 
                           vectors: list, metadata: list = None, 
-                          record_ids: list = None, batch_size: int = 50):
+                          record_ids: list = None, batch_size: int = 50,
+                          payloads: list = None, sparse_vectors: list = None):
         
         if metadata is None:
             metadata = [None] * len(texts)
 
+        if payloads is None:
+            payloads = [{}] * len(texts)
+
+        if sparse_vectors is None or not await self.has_sparse_vectors(collection_name):
+            sparse_vectors = [None] * len(texts)
+
         if record_ids is None:
             record_ids = list(range(0,len(texts)))
 
@@ -102,13 +199,16 @@ class QdrantDBProvider(VectorDBInterface):
             batch_texts = texts[i:batch_end]
             batch_vectors = vectors[i:batch_end]
             batch_metadata = metadata[i:batch_end]
+            batch_payloads = payloads[i:batch_end]
+            batch_sparse_vectors = sparse_vectors[i:batch_end]
 
             batch_record_ids = record_ids[i:batch_end]
             batch_records = [
                 models.PointStruct(
                     id=batch_record_ids[x],
-                    vector=batch_vectors[x],
+                    vector=self.get_point_vector(batch_vectors[x], batch_sparse_vectors[x]),
                     payload={
+                        **batch_payloads[x],
                         "text": batch_texts[x], "metadata": batch_metadata[x]
                     }
                 )
@@ -117,7 +217,7 @@ class QdrantDBProvider(VectorDBInterface):
             ]
 
             try:
-                _ = self.client.upsert(
+                _ = await self.client.upsert(
                     collection_name=collection_name,
                     points=batch_records,
                 )
@@ -126,26 +226,148 @@ class QdrantDBProvider(VectorDBInterface):
                 return False
 
         return True
-        
-    def search_by_vector(self, collection_name: str, vector: list, limit: int = 5) -> RetrieveDocument:
 
-        results = self.client.query_points(
+    async def delete_records_outside(self, collection_name: str,
+                                     field_name: str, field_values: list):
+        records_filter = models.Filter()
+        if field_values:
+            records_filter = models.Filter(must_not=[
+                models.FieldCondition(key=field_name, match=models.MatchAny(any=list(field_values)))
+            ])
+
+        _ = await self.client.delete(
             collection_name=collection_name,
-            query=vector,
-            limit=limit
+            points_selector=models.FilterSelector(filter=records_filter),
         )
 
-        if not results :
+    async def delete_stale_records(self, collection_name: str, field_name: str,
+                                   field_value, record_ids: list, batch_size: int = 1000):
+        # the ids to keep are not sent in the filter, which has no size
+        # bound: the matching point ids are scrolled page by page and the
+        # stale ones of each page deleted by id
+        keep_ids = {str(record_id) for record_id in record_ids}
+        records_filter = models.Filter(must=[
+            models.FieldCondition(key=field_name, match=models.MatchValue(value=field_value))
+        ])
+
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=records_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False,
+            )
+
+            stale_ids = [point.id for point in points if str(point.id) not in keep_ids]
+            if stale_ids:
+                _ = await self.client.delete(
+                    collection_name=collection_name,
+                    points_selector=models.PointIdsList(points=stale_ids),
+                )
+
+            if offset is None:
+                break
+        
+    def get_filter(self, filters: dict = None):
+        """
+        Build a Qdrant filter from {field: value, [values] or range dict}.
+        """
+        if not filters:
             return None
-       
 
-        retrieved_docs = [
+        conditions = []
+        for field_name, value in filters.items():
+            if isinstance(value, dict):
+                match = {"range": models.Range(**value)}
+            elif isinstance(value, (list, tuple, set)):
+                match = {"match": models.MatchAny(any=list(value))}
+            else:
+                match = {"match": models.MatchValue(value=value)}
+
+            conditions.append(models.FieldCondition(key=field_name, **match))
+
+        return models.Filter(must=conditions)
+
+    def to_retrieve_documents(self, points: list):
+        return [
             RetrieveDocument(
                 **{"text": point.payload.get("text"),
-                "score": point.score}
+                "score": point.score,
+                "metadata": point.payload.get("metadata"),
+                "file_id": point.payload.get("asset_id")}
             )
-            for point in results.points
+            for point in points
         ]
-        return retrieved_docs
 
+    def get_query(self, vector: list, limit: int, filters: dict = None,
+                  sparse_vector: dict = None):
+        """
+        Build the query of a search: the dense search alone, or the dense
+        and sparse searches fused with reciprocal rank fusion by Qdrant.
+        """
+        query_filter = self.get_filter(filters)
+
+        if not sparse_vector or not sparse_vector["indices"]:
+            return models.QueryRequest(query=vector, filter=query_filter,
+                                       limit=limit, with_payload=True)
+
+        prefetch_limit = limit * self.hybrid_prefetch_factor
+        return models.QueryRequest(
+            prefetch=[
+                models.Prefetch(query=vector, filter=query_filter, limit=prefetch_limit),
+                models.Prefetch(query=models.SparseVector(**sparse_vector), using=SPARSE_VECTOR_NAME,
+                                filter=query_filter, limit=prefetch_limit),
+            ],
+            query=models.FusionQuery(fusion=models.Fusion.RRF),
+            limit=limit,
+            with_payload=True,
+        )
+
+    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5,
+                               filters: dict = None, sparse_vector: dict = None) -> RetrieveDocument:
+
+        if sparse_vector and not await self.has_sparse_vectors(collection_name):
+            sparse_vector = None
+
+        query = self.get_query(vector=vector, limit=limit, filters=filters,
+                               sparse_vector=sparse_vector)
+
+        results = await self.client.query_points(
+            collection_name=collection_name,
+            prefetch=query.prefetch,
+            query=query.query,
+            query_filter=query.filter,
+            limit=query.limit,
+            with_payload=True,
+        )
+
+        if not results :
+            return None
+
+        return self.to_retrieve_documents(results.points)
+
+    async def search_by_vectors(self, collection_name: str, vectors: list, limits: list,
+                                filters: list = None, sparse_vectors: list = None) -> list:
 
+        if filters is None:
+            filters = [None] * len(vectors)
+
+        if sparse_vectors is None or not await self.has_sparse_vectors(collection_name):
+            sparse_vectors = [None] * len(vectors)
+
+        responses = await self.client.query_batch_points(
+            collection_name=collection_name,
+            requests=[
+                self.get_query(vector=vector, limit=limit, filters=query_filters,
+                               sparse_vector=sparse_vector)
+                for vector, limit, query_filters, sparse_vector in zip(vectors, limits, filters, sparse_vectors)
+            ],
+        )
+
+        return [
+            self.to_retrieve_documents(response.points)
+            for response in responses
+        ]
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# the app modules are imported relative to src/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# the required settings, when no .env provides them
+for key, value in {
+    "APP_NAME": "mini-rag-tests",
+    "APP_VERSION": "0.1",
+    "GEMINI_API_KEY": "",
+    "FILE_ALLOWED_TYPES": '["text/plain","application/pdf"]',
+    "FILE_MAX_SIZE": "10",
+    "FILE_DEFAULT_CHUNK_SIZE": "512000",
+    "MONGODB_URL": "mongodb://localhost:27017",
+    "MONGODB_DATABASE": "mini_rag_tests",
+    "GENERATION_BACKEND": "OPENAI",
+    "EMBEDDING_BACKEND": "OPENAI",
+    "OPENAI_API_KEY": "",
+    "OPENAI_API_URL": "",
+    "COHERE_API_KEY": "",
+    "GENERATION_MODEL_ID": "",
+    "EMBEDIDING_MODEL_ID": "",
+    "EMBEDIDING_MODEL_SIZE": "3",
+    "INPUT_DEFAULT_MAX_CHARACTER": "1024",
+    "GENERATION_DEFAULT_MAX_TOKENS": "200",
+    "GENERATION_DEFAULT_TEMPREATURE": "0.1",
+    "EMBEDDING_CACHE_DB_NAME": "",
+    "VECTOR_DB_BACKEND": "QDRANT",
+    "VECTOR_DB_DISTANCE_METHOD": "COSINE",
+    "PRIMARY_LANG": "en",
+    "DEFAULT_LANG": "en",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+@pytest.fixture
+def db():
+    """
+    An in-memory Mongo database (mongomock-motor), the tests needing it are
+    skipped when it is not installed.
+    """
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import mongomock.collection
+
+    # recent pymongo versions pass `sort` to bulk update operations, which
+    # mongomock does not accept yet
+    for name in ("add_update", "add_replace"):
+        add_operation = getattr(mongomock.collection.BulkOperationBuilder, name)
+        if not getattr(add_operation, "accepts_sort", False):
+            def add_operation_without_sort(self, *args, _add_operation=add_operation, **kwargs):
+                kwargs.pop("sort", None)
+                return _add_operation(self, *args, **kwargs)
+
+            add_operation_without_sort.accepts_sort = True
+            setattr(mongomock.collection.BulkOperationBuilder, name, add_operation_without_sort)
+
+    from models.BaseDataModel import BaseDataModel
+    # every test gets a new database, so the indexes are created again
+    BaseDataModel.initialized_collections.clear()
+
+    return mongomock_motor.AsyncMongoMockClient()["mini_rag_tests"]
+
+
+@pytest.fixture
+def app(db, monkeypatch, tmp_path):
+    """
+    An app serving the data routes, with the files stored under tmp_path.
+    """
+    from fastapi import FastAPI
+    from controllers import DataController
+    from controllers.BaseController import BaseController
+    from models.AssetModel import AssetModel
+    from models.ProjectModel import ProjectModel
+    from models.UploadSessionModel import UploadSessionModel
+    from routes.data import data_router
+
+    base_init = BaseController.__init__
+
+    def init_in_tmp_path(self):
+        base_init(self)
+        self.file_dir = str(tmp_path / "files")
+        self.blob_dir = str(tmp_path / "blobs")
+        self.database_dir = str(tmp_path / "database")
+        os.makedirs(self.file_dir, exist_ok=True)
+
+    monkeypatch.setattr(BaseController, "__init__", init_in_tmp_path)
+
+    app = FastAPI()
+    app.include_router(data_router)
+    app.process_pool = None
+
+    async def create_models():
+        app.project_model = await ProjectModel.create_instance(db_client=db)
+        app.asset_model = await AssetModel.create_instance(db_client=db)
+        app.upload_session_model = await UploadSessionModel.create_instance(db_client=db)
+
+    asyncio.run(create_models())
+    app.data_controller = DataController()
+    return app
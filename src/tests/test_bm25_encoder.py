@@ -0,0 +1,26 @@
+import pytest
+
+from helpers.BM25Encoder import BM25Encoder
+
+
+def get_weight(sparse_vector, encoder, token):
+    return dict(zip(sparse_vector["indices"], sparse_vector["values"]))[encoder.get_term_index(token)]
+
+
+def test_document_length_is_normalized_by_the_collection_average():
+    encoder = BM25Encoder()
+    stats = {}
+
+    short_chunk = "pump failure code e42"
+    long_chunk = "pump failure code e42 " + "maintenance log entry " * 10
+
+    short_vector, long_vector = encoder.encode_documents([short_chunk, long_chunk], stats=stats)
+
+    # the running statistics follow the indexed chunks
+    assert stats == {"documents": 2, "tokens": 4 + 34}
+    # the same term weighs more in the chunk shorter than the average
+    assert get_weight(short_vector, encoder, "pump") > get_weight(long_vector, encoder, "pump")
+
+    # a chunk of the average length is weighted as if b was 0
+    (average_vector,) = encoder.encode_documents(["pump " + "word " * 18], stats={"documents": 1, "tokens": 19})
+    assert get_weight(average_vector, encoder, "pump") == pytest.approx(1.0)
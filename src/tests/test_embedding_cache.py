@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+from stores.llm.cache import CachedLLMProvider, EmbeddingCache
+
+
+def get_last_access(embedding_cache, cache_key):
+    return embedding_cache.connection.execute(
+        "SELECT last_access FROM embeddings WHERE cache_key = ?", (cache_key,)
+    ).fetchone()[0]
+
+
+def test_cache_hits_are_written_in_batches(tmp_path):
+    embedding_cache = EmbeddingCache(db_path=str(tmp_path), access_flush_size=3)
+    embedding_cache.put_many({"a": [1.0], "b": [2.0], "c": [3.0]})
+    stored_access = get_last_access(embedding_cache, "a")
+
+    # a lookup only reads
+    assert embedding_cache.get_many(["a", "b"]) == {"a": [1.0], "b": [2.0]}
+    assert get_last_access(embedding_cache, "a") == stored_access
+    assert embedding_cache.connection.in_transaction is False
+
+    # the pending accesses are written once enough of them are pending
+    embedding_cache.get_many(["c"])
+    assert embedding_cache.pending_access == {}
+    assert get_last_access(embedding_cache, "a") > stored_access
+
+    embedding_cache.close()
+
+
+class FakeEmbeddingProvider:
+    embedding_model_id = "fake-model"
+
+    async def aembed_texts(self, texts, document_type):
+        return [[float(len(text))] for text in texts]
+
+
+class ThreadRecordingCache(EmbeddingCache):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.call_threads = set()
+
+    def get_many(self, keys):
+        self.call_threads.add(threading.get_ident())
+        return super().get_many(keys)
+
+    def put_many(self, items):
+        self.call_threads.add(threading.get_ident())
+        return super().put_many(items)
+
+
+def test_async_embeddings_do_not_call_the_cache_on_the_event_loop(tmp_path):
+    embedding_cache = ThreadRecordingCache(db_path=str(tmp_path))
+    embedding_client = CachedLLMProvider(provider=FakeEmbeddingProvider(),
+                                         provider_name="FAKE", cache=embedding_cache)
+
+    async def scenario():
+        first = await embedding_client.aembed_texts(texts=["one", "three"], document_type="document")
+        second = await embedding_client.aembed_texts(texts=["three"], document_type="document")
+        return first, second
+
+    assert asyncio.run(scenario()) == ([[3.0], [5.0]], [[5.0]])
+    assert embedding_cache.hits == 1
+    assert threading.get_ident() not in embedding_cache.call_threads
+
+    embedding_cache.close()
@@ -0,0 +1,210 @@
+import asyncio
+
+from bson.objectid import ObjectId
+
+from controllers.JobController import JobController
+from controllers.ProcessController import ProcessController
+from controllers.ProjectController import ProjectController
+from models import AssetTypeEnum, JobStatusEnum, JobTypeEnum
+from models.AssetModel import AssetModel
+from models.ChunkModel import ChunkModel
+from models.JobModel import JobModel
+from models.ProjectModel import ProjectModel
+from models.db_schemas import Asset, Job
+
+
+class FakeProject:
+    def __init__(self):
+        self.id = ObjectId()
+        self.project_id = "jobs"
+
+
+def make_job_controller(db, owner_id, run_job):
+    job_controller = JobController(db_client=db, process_pool=None, nlp_controller=None,
+                                   project_model=None, asset_model=None, chunk_model=None)
+    job_controller.owner_id = owner_id
+    job_controller.lease_ttl = 0.3
+    job_controller.workers_count = 1
+    job_controller.run_job = run_job
+    return job_controller
+
+
+def test_a_pending_job_is_claimed_once(db):
+    async def scenario():
+        job_model = await JobModel.create_instance(db_client=db)
+        job = await job_model.create_job(job=Job(
+            job_project_id=ObjectId(), project_id="jobs", job_type=JobTypeEnum.PROCESS.value,
+            job_status=JobStatusEnum.PENDING.value,
+        ))
+
+        claims = await asyncio.gather(*[
+            job_model.claim_job(job_id=job.id, owner_id=owner_id, lease_ttl=60)
+            for owner_id in ("first", "second")
+        ])
+        claimed = [claim for claim in claims if claim is not None]
+        assert len(claimed) == 1
+        assert claimed[0].job_status == JobStatusEnum.RUNNING.value
+
+        # a cancelled job is not claimed
+        cancelled = await job_model.create_job(job=Job(
+            job_project_id=ObjectId(), project_id="jobs", job_type=JobTypeEnum.PROCESS.value,
+            job_status=JobStatusEnum.PENDING.value,
+        ))
+        await job_model.cancel_job(job_id=str(cancelled.id))
+        assert await job_model.claim_job(job_id=cancelled.id, owner_id="first", lease_ttl=60) is None
+
+    asyncio.run(scenario())
+
+
+def test_cancel_stops_a_running_job(db):
+    async def scenario():
+        job_started = asyncio.Event()
+        job_stopped = asyncio.Event()
+
+        async def blocked_run(job):
+            job_started.set()
+            try:
+                await asyncio.Event().wait()
+            finally:
+                job_stopped.set()
+
+        job_controller = make_job_controller(db, "worker", blocked_run)
+        await job_controller.start()
+        job = await job_controller.submit(project=FakeProject(), job_type=JobTypeEnum.PROCESS.value,
+                                          job_request={})
+        await job_started.wait()
+
+        assert (await job_controller.cancel(str(job.id))).job_status == JobStatusEnum.CANCELLED.value
+        await asyncio.wait_for(job_stopped.wait(), timeout=1)
+        await asyncio.sleep(0.05)
+
+        # the worker does not overwrite the cancelled status, and a finished
+        # job can not be cancelled again
+        assert (await job_controller.get_job(job.id)).job_status == JobStatusEnum.CANCELLED.value
+        assert await job_controller.cancel(str(job.id)) is None
+
+        await job_controller.stop()
+
+    asyncio.run(scenario())
+
+
+def test_process_job_resumes_from_its_checkpoint(db, monkeypatch, tmp_path):
+    monkeypatch.setattr(ProjectController, "get_project_path",
+                        lambda self, project_id: str(tmp_path))
+    monkeypatch.setattr(ProcessController, "get_page_cache_path",
+                        lambda self, asset_hash: None)
+
+    async def scenario():
+        project_model = await ProjectModel.create_instance(db_client=db)
+        asset_model = await AssetModel.create_instance(db_client=db)
+        chunk_model = await ChunkModel.create_instance(db_client=db)
+        project = await project_model.get_project_or_create_one(project_id="jobs")
+
+        assets = []
+        for file_name in ("stored.txt", "pending.txt"):
+            (tmp_path / file_name).write_text(f"words of {file_name}. " * 40)
+            assets.append(await asset_model.create_asset(Asset(
+                asset_project_id=project.id,
+                asset_type=AssetTypeEnum.FILE_.value,
+                asset_name=file_name,
+                asset_size=1,
+            )))
+        stored_asset, pending_asset = assets
+
+        job_controller = JobController(db_client=db, process_pool=None, nlp_controller=None,
+                                       project_model=project_model, asset_model=asset_model,
+                                       chunk_model=chunk_model)
+        job_controller.job_model = await JobModel.create_instance(db_client=db)
+
+        # the job was interrupted after the first file was stored
+        job = await job_controller.job_model.create_job(job=Job(
+            job_project_id=project.id, project_id="jobs", job_type=JobTypeEnum.PROCESS.value,
+            job_status=JobStatusEnum.RUNNING.value,
+            job_request={"chunk_size": 100, "overlap_size": 0, "do_reset": 1},
+            job_checkpoint={"processed_assets": [str(stored_asset.id)]},
+        ))
+        await job_controller.run_job(job=job)
+
+        # the stored file is neither reset nor processed again
+        assert await chunk_model.get_project_asset_ids(project_id=project.id) == [pending_asset.id]
+
+        job = await job_controller.get_job(job.id)
+        assert job.job_checkpoint["processed_assets"] == [str(stored_asset.id), str(pending_asset.id)]
+        assert job.job_progress["files_total"] == 2
+        assert job.job_progress["files_processed"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_running_jobs_of_live_workers_are_not_requeued(db):
+    async def scenario():
+        release_first_run = asyncio.Event()
+        runs = []
+
+        async def first_run(job):
+            runs.append(("first", job.id))
+            await release_first_run.wait()
+
+        async def second_run(job):
+            runs.append(("second", job.id))
+
+        first = make_job_controller(db, "first", first_run)
+        await first.start()
+        job = await first.submit(project=FakeProject(), job_type=JobTypeEnum.PROCESS.value,
+                                 job_request={})
+        await asyncio.sleep(0.05)
+
+        # a sibling worker starting while the job runs leaves it alone
+        second = make_job_controller(db, "second", second_run)
+        await second.start()
+        await asyncio.sleep(0.5)
+
+        running_job = await first.get_job(job.id)
+        assert running_job.job_status == JobStatusEnum.RUNNING.value
+        assert running_job.job_owner == "first"
+        assert runs == [("first", job.id)]
+
+        # the first worker stops without finishing the job: once its lease
+        # expires the second worker takes the job over
+        await first.stop()
+        for _ in range(30):
+            await asyncio.sleep(0.1)
+            if (await second.get_job(job.id)).job_status == JobStatusEnum.COMPLETED.value:
+                break
+
+        finished_job = await second.get_job(job.id)
+        assert finished_job.job_status == JobStatusEnum.COMPLETED.value
+        assert finished_job.job_owner == "second"
+        assert runs == [("first", job.id), ("second", job.id)]
+
+        await second.stop()
+
+    asyncio.run(scenario())
+
+
+def test_restarted_owner_requeues_its_own_jobs(db):
+    async def scenario():
+        async def blocked_run(job):
+            await asyncio.Event().wait()
+
+        async def quick_run(job):
+            pass
+
+        crashed = make_job_controller(db, "node-1", blocked_run)
+        await crashed.start()
+        job = await crashed.submit(project=FakeProject(), job_type=JobTypeEnum.PROCESS.value,
+                                   job_request={})
+        await asyncio.sleep(0.05)
+        await crashed.stop()
+
+        # the same owner id starts again before the lease expires
+        crashed.lease_ttl = 60
+        restarted = make_job_controller(db, "node-1", quick_run)
+        restarted.lease_ttl = 60
+        await restarted.start()
+        await asyncio.sleep(0.1)
+
+        assert (await restarted.get_job(job.id)).job_status == JobStatusEnum.COMPLETED.value
+        await restarted.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,154 @@
+import asyncio
+
+from controllers.ProcessController import ProcessController
+from controllers.ProjectController import ProjectController
+from models.AssetModel import AssetModel
+from models.ChunkModel import ChunkModel
+from models.ProjectModel import ProjectModel
+from models.db_schemas import Asset, DataChunk
+from models.enums.AssetTypeEnum import AssetTypeEnum
+
+
+def make_process_controller(monkeypatch, tmp_path):
+    monkeypatch.setattr(ProjectController, "get_project_path",
+                        lambda self, project_id: str(tmp_path))
+    monkeypatch.setattr(ProcessController, "get_page_cache_path",
+                        lambda self, asset_hash: None)
+    return ProcessController(project_id="reprocess")
+
+
+async def create_processed_asset(db, process_controller, tmp_path, chunk_size):
+    project_model = await ProjectModel.create_instance(db_client=db)
+    asset_model = await AssetModel.create_instance(db_client=db)
+    chunk_model = await ChunkModel.create_instance(db_client=db)
+
+    project = await project_model.get_project_or_create_one(project_id="reprocess")
+    (tmp_path / "notes.txt").write_text("some words to chunk. " * 40)
+
+    asset = await asset_model.create_asset(Asset(
+        asset_project_id=project.id,
+        asset_type=AssetTypeEnum.FILE_.value,
+        asset_name="notes.txt",
+        asset_size=1,
+        asset_hash="notes-hash",
+    ))
+    await chunk_model.insert_many_chunks(chunks=[DataChunk(
+        chunk_text="stored chunk",
+        chunk_metadata={},
+        chunk_order=1,
+        chunk_project_id=project.id,
+        chunk_asset_id=asset.id,
+    )])
+    await asset_model.update_asset_config(asset_id=asset.id, asset_config=process_controller.get_asset_config(
+        asset_hash="notes-hash", chunk_size=chunk_size, overlap_size=0))
+
+    return project, asset_model, chunk_model
+
+
+async def select_and_process(process_controller, project, asset_model, chunk_model, chunk_size):
+    assets = [record async for records in asset_model.iter_project_assets(
+        asset_project_id=project.id, asset_type=AssetTypeEnum.FILE_.value, lean=True,
+    ) for record in records]
+
+    project_files_ids, asset_configs, _ = await process_controller.select_changed_assets(
+        assets=assets, asset_model=asset_model, chunk_size=chunk_size, overlap_size=0)
+
+    process_result = await process_controller.process_files(
+        project=project, project_files_ids=project_files_ids, chunk_model=chunk_model,
+        chunk_size=chunk_size, overlap_size=0, asset_model=asset_model,
+        asset_configs=asset_configs)
+
+    return project_files_ids, process_result
+
+
+def test_failed_reprocess_is_retried_with_the_same_config(db, monkeypatch, tmp_path):
+    async def scenario():
+        process_controller = make_process_controller(monkeypatch, tmp_path)
+        project, asset_model, chunk_model = await create_processed_asset(
+            db, process_controller, tmp_path, chunk_size=100)
+
+        async def failing_file_chunks(**kwargs):
+            raise Exception("parser crashed")
+            yield
+
+        # a reprocess with another chunk_size fails after the old chunks
+        # were deleted
+        with monkeypatch.context() as patch:
+            patch.setattr(process_controller, "iter_file_chunks", failing_file_chunks)
+            project_files_ids, process_result = await select_and_process(
+                process_controller, project, asset_model, chunk_model, chunk_size=50)
+
+        assert len(project_files_ids) == 1
+        assert process_result == (0, 0)
+
+        asset = await asset_model.get_asset_record(asset_project_id=project.id,
+                                                   asset_name="notes.txt")
+        assert asset.asset_config is None
+        assert await chunk_model.get_project_asset_ids(project_id=project.id) == []
+
+        # the retry with the first config is not skipped as unchanged
+        project_files_ids, process_result = await select_and_process(
+            process_controller, project, asset_model, chunk_model, chunk_size=100)
+
+        assert list(project_files_ids) == [asset.id]
+        assert process_result[0] > 0
+        asset = await asset_model.get_asset_record(asset_project_id=project.id,
+                                                   asset_name="notes.txt")
+        assert asset.asset_config["chunk_size"] == 100
+
+    asyncio.run(scenario())
+
+
+def test_project_reset_clears_asset_configs(db, monkeypatch, tmp_path):
+    async def scenario():
+        process_controller = make_process_controller(monkeypatch, tmp_path)
+        project, asset_model, chunk_model = await create_processed_asset(
+            db, process_controller, tmp_path, chunk_size=100)
+
+        await chunk_model.delete_chunks_by_project_id(project_id=project.id)
+
+        # a resumed reset job selects its assets without do_reset
+        project_files_ids, process_result = await select_and_process(
+            process_controller, project, asset_model, chunk_model, chunk_size=100)
+
+        assert len(project_files_ids) == 1
+        assert process_result[0] > 0
+
+    asyncio.run(scenario())
+
+
+class FakeRecyclingPool:
+    def __init__(self):
+        self.generation = 0
+        self.recycled_generations = []
+
+    def recycle(self, generation):
+        self.recycled_generations.append(generation)
+        self.generation += 1
+        return True
+
+
+def test_file_timeout_recycles_the_process_pool(db, monkeypatch, tmp_path):
+    async def scenario():
+        process_controller = make_process_controller(monkeypatch, tmp_path)
+        project, asset_model, chunk_model = await create_processed_asset(
+            db, process_controller, tmp_path, chunk_size=100)
+
+        async def stuck_file_chunks(**kwargs):
+            await asyncio.sleep(60)
+            yield []
+
+        process_pool = FakeRecyclingPool()
+        monkeypatch.setattr(process_controller.app_settings, "PROCESS_FILE_TIMEOUT", 0.1)
+        monkeypatch.setattr(process_controller, "iter_file_chunks", stuck_file_chunks)
+
+        asset = await asset_model.get_asset_record(asset_project_id=project.id,
+                                                   asset_name="notes.txt")
+        process_result = await process_controller.process_files(
+            project=project, project_files_ids={asset.id: "notes.txt"}, chunk_model=chunk_model,
+            chunk_size=100, overlap_size=0, process_pool=process_pool)
+
+        assert process_result == (0, 0)
+        assert process_pool.recycled_generations == [0]
+
+    asyncio.run(scenario())
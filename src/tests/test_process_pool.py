@@ -0,0 +1,25 @@
+from concurrent.futures import BrokenExecutor
+import time
+
+from helpers.ProcessPool import RecyclingProcessPool
+
+
+def test_recycled_pool_runs_new_tasks_and_stops_the_old_workers():
+    process_pool = RecyclingProcessPool(max_workers=1, retire_timeout=0.5)
+    try:
+        # a task abandoned after a timeout, holding the only worker
+        stuck_task = process_pool.submit(time.sleep, 60)
+
+        assert process_pool.recycle(generation=0)
+        # the other timeouts of the same pool do not recycle it again
+        assert not process_pool.recycle(generation=0)
+        assert process_pool.generation == 1
+
+        started_at = time.monotonic()
+        assert process_pool.submit(pow, 2, 5).result(timeout=30) == 32
+        assert time.monotonic() - started_at < 30
+
+        # the worker of the retired pool is terminated after retire_timeout
+        assert isinstance(stuck_task.exception(timeout=30), BrokenExecutor)
+    finally:
+        process_pool.shutdown(cancel_futures=True)
@@ -0,0 +1,36 @@
+import asyncio
+
+from helpers.ProjectCache import ProjectCache
+
+
+def test_waiters_load_again_when_the_loading_caller_is_cancelled():
+    async def scenario():
+        project_cache = ProjectCache(max_entries=10, ttl=60)
+        loads = []
+        leader_started = asyncio.Event()
+
+        async def slow_loader():
+            loads.append("leader")
+            leader_started.set()
+            await asyncio.sleep(60)
+
+        async def loader():
+            loads.append("waiter")
+            return "project"
+
+        leader = asyncio.create_task(project_cache.get_or_load("project", slow_loader))
+        await leader_started.wait()
+        waiters = [asyncio.create_task(project_cache.get_or_load("project", loader))
+                   for _ in range(3)]
+        await asyncio.sleep(0)
+
+        # e.g. the client of the loading request disconnected
+        leader.cancel()
+
+        assert await asyncio.gather(*waiters) == ["project"] * 3
+        assert leader.cancelled()
+        # one of the waiters loaded it, the others waited for that load
+        assert loads == ["leader", "waiter"]
+        assert project_cache.get("project") == "project"
+
+    asyncio.run(scenario())
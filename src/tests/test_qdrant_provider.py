@@ -0,0 +1,35 @@
+import asyncio
+import uuid
+
+import pytest
+
+models = pytest.importorskip("qdrant_client.models")
+from qdrant_client import AsyncQdrantClient
+
+from stores.vectordb.providers.QdrantDBProvider import QdrantDBProvider
+
+
+def test_stale_records_are_deleted_in_pages():
+    async def scenario():
+        provider = QdrantDBProvider(db_path=None, distance_method="cosine")
+        provider.client = AsyncQdrantClient(location=":memory:")
+        await provider.client.create_collection(
+            "chunks", vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE))
+
+        point_ids = [str(uuid.uuid4()) for _ in range(25)]
+        await provider.client.upsert("chunks", points=[
+            models.PointStruct(id=point_id, vector=[1.0, 0.0],
+                               payload={"asset_id": "rechunked" if i < 20 else "other"})
+            for i, point_id in enumerate(point_ids)
+        ])
+
+        # the current chunks of the asset are its first 5 points
+        await provider.delete_stale_records(collection_name="chunks", field_name="asset_id",
+                                            field_value="rechunked", record_ids=point_ids[:5],
+                                            batch_size=3)
+
+        points, _ = await provider.client.scroll("chunks", limit=100)
+        # the other asset's points are kept too
+        assert {str(point.id) for point in points} == set(point_ids[:5] + point_ids[20:])
+
+    asyncio.run(scenario())
@@ -0,0 +1,45 @@
+import pytest
+
+from helpers.TextChunker import TextChunker
+
+text_splitters = pytest.importorskip("langchain_text_splitters")
+
+TEXTS = [
+    "",
+    "short text",
+    "first paragraph\n\nsecond paragraph\n\nthird paragraph",
+    "\n\nleading and trailing\n\n\n\nrepeated separators\n\n",
+    "  spaced  \n\n  paragraphs \n\n\n  and odd\n\n\nruns  ",
+    "one line\nafter another\nwithout any paragraph break " * 20,
+    "\n\n".join(f"paragraph {index} " + "word " * (index % 17) for index in range(200)),
+]
+
+
+@pytest.mark.parametrize("chunk_size,overlap_size", [(1024, 20), (100, 20), (40, 15), (10, 0), (30, 29)])
+def test_chunks_match_character_text_splitter(chunk_size, overlap_size):
+    text_splitter = text_splitters.CharacterTextSplitter(chunk_size=chunk_size,
+                                                         chunk_overlap=overlap_size)
+    text_chunker = TextChunker(chunk_size=chunk_size, overlap_size=overlap_size)
+
+    for text in TEXTS:
+        assert text_chunker.split_text(text) == text_splitter.split_text(text)
+
+        for chunk_text, start_index, end_index in text_chunker.get_text_chunks(text):
+            if "\n\n\n" not in text:
+                assert text[start_index:end_index] == chunk_text
+
+
+@pytest.mark.parametrize("chunk_size,overlap_size", [(100, 20), (25, 10), (5, 0)])
+def test_recursive_chunks_match_recursive_character_text_splitter(chunk_size, overlap_size):
+    separators = ["\n\n", "\n", " ", ""]
+    text_splitter = text_splitters.RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=overlap_size,
+        separators=separators,
+        keep_separator=False,
+    )
+    text_chunker = TextChunker(chunk_size=chunk_size, overlap_size=overlap_size,
+                               separators=separators)
+
+    for text in TEXTS:
+        assert text_chunker.split_text(text) == text_splitter.split_text(text)
@@ -0,0 +1,34 @@
+import io
+import zipfile
+
+from fastapi.testclient import TestClient
+
+
+def make_archive(prefix, count):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        for index in range(count):
+            zip_file.writestr(f"{prefix}_{index}.txt", f"{prefix} file {index}\n")
+    return archive.getvalue()
+
+
+def test_archive_members_share_one_file_budget(app, monkeypatch):
+    from helpers.config import get_settings
+    monkeypatch.setattr(get_settings(), "UPLOAD_BATCH_MAX_FILES", 5)
+
+    client = TestClient(app)
+    response = client.post("/api/v1/data/upload/batch/batches", files=[
+        ("files", ("plain.txt", b"a plain file\n", "text/plain")),
+        ("files", ("first.zip", make_archive("first", 3), "application/zip")),
+        ("files", ("second.zip", make_archive("second", 3), "application/zip")),
+    ])
+
+    # the plain file and 4 of the 6 archive members fit in the budget of 5
+    assert response.status_code == 201
+    body = response.json()
+    assert body["uploaded_files"] == 5
+    assert body["failed_files"] >= 1
+    assert all(
+        file_status["Signals"] == "BATCH_TOO_MANY_FILES"
+        for file_status in body["files"] if "file_id" not in file_status
+    )
@@ -0,0 +1,183 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi.testclient import TestClient
+
+
+def test_failed_commit_restores_the_upload(app, monkeypatch, tmp_path):
+    content = b"some uploaded text\n" * 10
+    client = TestClient(app)
+
+    response = client.post("/api/v1/data/upload/session/uploads", json={
+        "file_name": "notes.txt",
+        "content_type": "text/plain",
+        "file_size": len(content),
+    })
+    assert response.status_code == 201
+    upload_id = response.json()["upload_id"]
+
+    response = client.put(f"/api/v1/data/upload/session/{upload_id}/parts/1",
+                          params={"offset": 0}, content=content)
+    assert response.status_code == 200
+
+    async def failing_create_asset(asset):
+        raise Exception("database unavailable")
+
+    # the asset can not be created once the file was moved to the blob store
+    with monkeypatch.context() as patch:
+        patch.setattr(app.asset_model, "create_asset", failing_create_asset)
+        response = client.post(f"/api/v1/data/upload/session/{upload_id}/complete")
+
+    assert response.status_code == 500
+    assert client.get(f"/api/v1/data/upload/session/{upload_id}").json()["status"] == "uploading"
+    assert os.listdir(tmp_path / "files" / "uploads") == []
+
+    # the retry commits the same received file
+    response = client.post(f"/api/v1/data/upload/session/{upload_id}/complete")
+    assert response.status_code == 201
+
+    file_name = response.json()["file_name"]
+    with open(tmp_path / "files" / "uploads" / file_name, "rb") as f:
+        assert f.read() == content
+    assert client.get(f"/api/v1/data/upload/session/{upload_id}").json()["status"] == "completed"
+
+
+def test_concurrent_parts_at_the_same_offset(app, monkeypatch, tmp_path):
+    first_content = b"a" * 64
+    second_content = b"b" * 64
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/v1/data/upload/session/uploads", json={
+                "file_name": "notes.txt",
+                "content_type": "text/plain",
+                "file_size": len(first_content),
+            })
+            upload_id = response.json()["upload_id"]
+
+            # both parts are written before either of them is recorded
+            add_upload_part = app.upload_session_model.add_upload_part
+            both_written = asyncio.Barrier(2)
+
+            async def add_upload_part_after_both_writes(**kwargs):
+                await both_written.wait()
+                return await add_upload_part(**kwargs)
+
+            with monkeypatch.context() as patch:
+                patch.setattr(app.upload_session_model, "add_upload_part",
+                              add_upload_part_after_both_writes)
+
+                responses = await asyncio.gather(*[
+                    client.put(f"/api/v1/data/upload/session/{upload_id}/parts/1",
+                               params={"offset": 0}, content=content)
+                    for content in (first_content, second_content)
+                ])
+
+            assert sorted(response.status_code for response in responses) == [200, 409]
+            stored_content = first_content if responses[0].status_code == 200 else second_content
+
+            response = await client.post(f"/api/v1/data/upload/session/{upload_id}/complete")
+            assert response.status_code == 201
+            return response.json()["file_name"], stored_content
+
+    file_name, stored_content = asyncio.run(scenario())
+
+    # the recorded part is committed, not the bytes of the rejected one
+    with open(tmp_path / "files" / "uploads" / file_name, "rb") as f:
+        assert f.read() == stored_content
+    assert os.listdir(tmp_path / "blobs" / "tmp") == []
+
+
+def test_short_part_file_is_not_committed(app, tmp_path):
+    first_part, second_part = b"first part\n" * 4, b"second part\n" * 4
+    client = TestClient(app)
+
+    response = client.post("/api/v1/data/upload/session/uploads", json={
+        "file_name": "notes.txt",
+        "content_type": "text/plain",
+        "file_size": len(first_part) + len(second_part),
+    })
+    upload_id = response.json()["upload_id"]
+
+    client.put(f"/api/v1/data/upload/session/{upload_id}/parts/1",
+               params={"offset": 0}, content=first_part)
+    response = client.put(f"/api/v1/data/upload/session/{upload_id}/parts/2",
+                          params={"offset": len(first_part)}, content=second_part)
+    part_file = response.json()["parts"][1]["part_file"]
+
+    # the second part file lost bytes after it was recorded
+    with open(tmp_path / "blobs" / "tmp" / part_file, "r+b") as f:
+        f.truncate(5)
+
+    response = client.post(f"/api/v1/data/upload/session/{upload_id}/complete")
+    assert response.status_code == 409
+    assert response.json()["Signals"] == "UPLOAD_SIZE_MISMATCH"
+    assert response.json()["received_size"] == len(first_part)
+    assert client.get(f"/api/v1/data/upload/session/{upload_id}").json()["status"] == "uploading"
+    assert list((tmp_path / "files").rglob("*.txt")) == []
+
+    # the upload resumes from the last part stored intact
+    client.put(f"/api/v1/data/upload/session/{upload_id}/parts/2",
+               params={"offset": len(first_part)}, content=second_part)
+    response = client.post(f"/api/v1/data/upload/session/{upload_id}/complete")
+    assert response.status_code == 201
+
+    with open(tmp_path / "files" / "uploads" / response.json()["file_name"], "rb") as f:
+        assert f.read() == first_part + second_part
+
+
+def test_stale_upload_sessions_are_removed(app, tmp_path):
+    content = b"some uploaded text\n" * 10
+    client = TestClient(app)
+
+    def create_session():
+        response = client.post("/api/v1/data/upload/session/uploads", json={
+            "file_name": "notes.txt",
+            "content_type": "text/plain",
+            "file_size": len(content) * 2,
+        })
+        upload_id = response.json()["upload_id"]
+        client.put(f"/api/v1/data/upload/session/{upload_id}/parts/1",
+                   params={"offset": 0}, content=content)
+        return upload_id
+
+    stale_id, active_id = create_session(), create_session()
+
+    # the first session was abandoned two days ago
+    asyncio.run(app.upload_session_model.collection.update_one(
+        {"_id": app.upload_session_model.to_object_id(stale_id)},
+        {"$set": {"upload_updated_at": datetime.utcnow() - timedelta(days=2)}},
+    ))
+
+    create_session()
+
+    assert client.get(f"/api/v1/data/upload/session/{stale_id}").status_code == 404
+    assert client.get(f"/api/v1/data/upload/session/{active_id}").status_code == 200
+
+    part_files = os.listdir(tmp_path / "blobs" / "tmp")
+    assert not any(file_name.startswith(stale_id) for file_name in part_files)
+    assert any(file_name.startswith(active_id) for file_name in part_files)
+
+
+def test_first_part_must_match_the_declared_type(app, tmp_path):
+    client = TestClient(app)
+
+    for content_type, content in (("application/pdf", b"plain text, not a pdf\n"),
+                                  ("text/plain", b"\x7fELF\x02\x01\x01\x00\x00\x00")):
+        response = client.post("/api/v1/data/upload/session/uploads", json={
+            "file_name": "notes.txt",
+            "content_type": content_type,
+            "file_size": len(content),
+        })
+        upload_id = response.json()["upload_id"]
+
+        response = client.put(f"/api/v1/data/upload/session/{upload_id}/parts/1",
+                              params={"offset": 0}, content=content)
+        assert response.status_code == 409
+        assert response.json()["Signals"] == "FILE_TYPE_NOT_SUPPORTED"
+        assert client.get(f"/api/v1/data/upload/session/{upload_id}").json()["received_size"] == 0
+
+    assert os.listdir(tmp_path / "blobs" / "tmp") == []